@@ -0,0 +1,30 @@
+"""
+Per-student GPA, class rankings, course statistics and histograms for a
+100k-student cohort, vectorized (CohortGrades) against `Student.gpa`.
+"""
+import time
+
+from f3re.academic.analytics import CohortGrades
+
+from common import make_students, measure, report
+
+
+def main(n: int = 100_000):
+    start = time.perf_counter()
+    students = make_students(n, grades_per_student=12, n_courses=400, n_classes=200)
+    print(f"built {n:,} students in {time.perf_counter() - start:.1f} s")
+
+    cohort = CohortGrades.from_students(students)
+    assert cohort.gpa().tolist() == [s.gpa for s in students]
+
+    report('Student.gpa (per object)', n, measure(lambda: [s.gpa for s in students], repeat=1), 'students')
+    report('CohortGrades.from_students', n, measure(lambda: CohortGrades.from_students(students), repeat=1),
+           'students')
+    report('CohortGrades.gpa', n, measure(cohort.gpa), 'students')
+    report('CohortGrades.rank(by=class)', n, measure(lambda: cohort.rank('class')), 'students')
+    report('CohortGrades.course_stats', len(cohort.score), measure(cohort.course_stats), 'grades')
+    report('CohortGrades.histogram', len(cohort.score), measure(cohort.histogram), 'grades')
+
+
+if __name__ == '__main__':
+    main()
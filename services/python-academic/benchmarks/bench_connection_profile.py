@@ -0,0 +1,73 @@
+"""
+Mixed read/write throughput of StudentStore under the rollback-journal
+profile (SQLite's defaults) and the WAL profile: reader threads look up
+students while one writer thread keeps re-uploading grades.
+"""
+import os
+import random
+import tempfile
+import threading
+import time
+
+from f3re.academic.model.models import Grade
+from f3re.academic.store.connection import DEFAULT_PROFILE, ROLLBACK_PROFILE, ConnectionManager
+from f3re.academic.store.db_mapper import StudentStore
+
+from common import make_students
+
+
+def run(path, profile, students, readers: int, seconds: float):
+    ids = [s.student_id for s in students]
+    stop = threading.Event()
+    reads, latencies, writes = [0] * readers, [[] for _ in range(readers)], [0]
+    connections = ConnectionManager(path, profile, readers=readers)
+
+    def read(i):
+        rng = random.Random(i)
+        with StudentStore(path, connections=connections) as store:
+            while not stop.is_set():
+                start = time.perf_counter()
+                assert store.find_by_id(rng.choice(ids)) is not None
+                latencies[i].append(time.perf_counter() - start)
+                reads[i] += 1
+
+    def write():
+        rng = random.Random(-1)
+        with StudentStore(path, connections=connections) as store:
+            while not stop.is_set():
+                student = rng.choice(students)
+                student.grades = [Grade(course=g.course, score=float(rng.randint(40, 100))) for g in student.grades]
+                store.update(student)
+                writes[0] += 1
+
+    threads = [threading.Thread(target=read, args=(i,)) for i in range(readers)]
+    threads.append(threading.Thread(target=write))
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    connections.close()
+
+    latency = sorted(t for per_reader in latencies for t in per_reader)
+    p99 = latency[int(len(latency) * 0.99)] * 1e3 if latency else float('nan')
+    print(f"{'reads':>8}: {sum(reads) / seconds:>10,.0f} /s   p99 {p99:7.2f} ms")
+    print(f"{'writes':>8}: {writes[0] / seconds:>10,.0f} /s")
+
+
+def main(n: int = 2_000, readers: int = 4, seconds: float = 3.0):
+    students = make_students(n, grades_per_student=12)
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, profile in (('rollback journal', ROLLBACK_PROFILE), ('wal', DEFAULT_PROFILE)):
+            path = os.path.join(tmp, f'{name}.sqlite')
+            with StudentStore(path, profile=profile) as store:
+                store.create_table()
+                for student in students:
+                    store.create(student)
+            print(f"{name} ({readers} readers, 1 writer):")
+            run(path, profile, students, readers, seconds)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+GPA reads and class rankings from StudentStore: hydrating students and
+computing Student.gpa, against the stored aggregates, plus the cost of the
+incremental update on each grade write.
+"""
+import os
+import random
+import tempfile
+
+from f3re.academic.model import Grade
+from f3re.academic.store.db_mapper import StudentStore
+
+from common import make_students, measure, report
+
+
+def main(n: int = 5_000, class_id: int = 3):
+    students = make_students(n, grades_per_student=24, n_classes=20)
+    ids = [s.student_id for s in students]
+    in_class = [s.student_id for s in students if s.class_id == class_id]
+    with tempfile.TemporaryDirectory() as tmp:
+        with StudentStore(os.path.join(tmp, 'gpa.sqlite')) as store:
+            store.create_table()
+            for student in students:
+                store.create(student)
+
+            def hydrated_ranking():
+                gpas = sorted(((s.gpa, s.student_id) for s in store.find_many(in_class).values()),
+                              key=lambda pair: (-pair[0], pair[1]))
+                return [student_id for _, student_id in gpas]
+
+            assert [s.student_id for _, s in store.rank_students(class_id=class_id)] == hydrated_ranking()
+            report('gpa via find_by_id', 500, measure(lambda: [store.find_by_id(i).gpa for i in ids[:500]]))
+            report('gpa via find_summary', 500, measure(lambda: [store.find_summary(i).gpa for i in ids[:500]]))
+            report(f'class ranking, hydrated ({len(in_class)})', 1, measure(hydrated_ranking), 'rankings')
+            report('class ranking, rank_students', 1,
+                   measure(lambda: store.rank_students(class_id=class_id), repeat=20), 'rankings')
+            report('class top 10, rank_students', 1,
+                   measure(lambda: store.rank_students(class_id=class_id, limit=10), repeat=20), 'rankings')
+
+            rng = random.Random(0)
+            course = students[0].grades[0].course
+            report('add_grade', 500, measure(lambda: [store.add_grade(rng.choice(ids), Grade(course=course, score=80.0))
+                                                      for _ in range(500)], repeat=1), 'writes')
+            report('update_grade', 500,
+                   measure(lambda: [store.update_grade(rng.choice(ids), Grade(course=course, score=70.0))
+                                    for _ in range(500)], repeat=1), 'writes')
+            assert store.check_aggregates() == []
+            report('check_aggregates (all students)', n, measure(store.check_aggregates, repeat=1), 'students')
+
+
+if __name__ == '__main__':
+    main()
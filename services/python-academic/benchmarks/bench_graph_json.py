@@ -0,0 +1,49 @@
+"""
+Payload size, decode time and decode memory of a class-wide export encoded
+per student (`student_to_json`) versus as one shared-object graph
+(`students_to_graph_json`).
+"""
+import tracemalloc
+
+from f3re.academic.store.json_mapper import (
+    student_from_json,
+    student_to_json,
+    students_from_graph_json,
+    students_to_graph_json,
+)
+
+from common import make_students, measure, report
+
+
+def peak_memory(fn) -> int:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main(n: int = 2_000):
+    students = make_students(n, n_courses=60)
+
+    inline = [student_to_json(s) for s in students]
+    graph = students_to_graph_json(students)
+    assert students_from_graph_json(graph) == students
+
+    def decode_inline():
+        return [student_from_json(p) for p in inline]
+
+    def decode_graph():
+        return students_from_graph_json(graph)
+
+    print(f"{'payload (inline)':<40} {sum(map(len, inline)):>14,} bytes")
+    print(f"{'payload (graph)':<40} {len(graph):>14,} bytes")
+    print(f"{'decode peak memory (inline)':<40} {peak_memory(decode_inline):>14,} bytes")
+    print(f"{'decode peak memory (graph)':<40} {peak_memory(decode_graph):>14,} bytes")
+    report('decode (inline)', n, measure(decode_inline))
+    report('decode (graph)', n, measure(decode_graph))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Import cost of the academic packages, measured in fresh interpreters with
+``python -X importtime``, and the heavier dependencies each import pulls in.
+
+Run from the service root: ``PYTHONPATH=src python benchmarks/bench_import_time.py``.
+Pass ``--max-ms N`` to exit with status 1 when any median exceeds N ms, e.g. in CI.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+TARGETS = [
+    'f3re.academic',
+    'f3re.academic.store',
+    'f3re.academic.model',
+    'f3re.academic.store.json_mapper',
+    'f3re.academic.store.db_mapper',
+]
+# Modules that `import f3re.academic` and `import f3re.academic.store` should not load.
+HEAVY = ['dotenv', 'sqlite3', 'csv', 'gzip', 'json', 'numpy', 'f3re.academic.store.db_mapper']
+
+
+def import_time_us(module: str) -> int:
+    """Cumulative import time of `module` as reported by -X importtime, in microseconds."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            capture_output=True, text=True, env=os.environ, check=True)
+    for line in reversed(result.stderr.splitlines()):
+        _, _, cumulative, name = (part.strip() for part in line.replace('|', ':', 2).split(':'))
+        if name == module:
+            return int(cumulative)
+    raise RuntimeError(f'{module} missing from -X importtime output')
+
+
+def loaded_heavy(module: str):
+    code = f'import sys, {module}; print(" ".join(m for m in {HEAVY!r} if m in sys.modules))'
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, env=os.environ, check=True)
+    return result.stdout.split()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--max-ms', type=float, default=None)
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in TARGETS:
+        median_ms = statistics.median(import_time_us(module) for _ in range(args.runs)) / 1000
+        heavy = loaded_heavy(module)
+        print(f"{module:<36} {median_ms:>8.1f} ms  loads: {', '.join(heavy) or '-'}")
+        if args.max_ms is not None and median_ms > args.max_ms:
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,38 @@
+"""
+Students/sec for reading a whole StudentRepository table: one serial
+SELECT + decode, against iter_students_parallel and
+iter_student_tables_parallel with an increasing number of worker processes.
+"""
+import os
+import tempfile
+
+from f3re.academic.store.class_based_demo import StudentRepository
+from f3re.academic.store.parallel import iter_student_tables_parallel, iter_students_parallel
+
+from common import make_students, measure, report
+
+
+def main(n: int = 10_000, chunk_size: int = 500):
+    students = make_students(n, grades_per_student=12)
+    cpus = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'students.sqlite')
+        with StudentRepository(path) as repo:
+            repo.create_tables()
+            repo.add_many(students)
+
+        def serial():
+            with StudentRepository(path) as repo, repo.connections.reader() as conn:
+                return [repo._from_row(row) for row in conn.execute('SELECT * FROM students')]
+
+        report('serial', n, measure(serial, repeat=1))
+        assert list(iter_students_parallel(path, workers=min(cpus, 2), chunk_size=chunk_size)) == students
+        for workers in sorted({1, 2, cpus // 2, cpus} - {0}):
+            report(f'iter_students_parallel ({workers} workers)', n,
+                   measure(lambda: sum(1 for _ in iter_students_parallel(path, workers, chunk_size)), repeat=1))
+            report(f'iter_student_tables_parallel ({workers} workers)', n,
+                   measure(lambda: sum(map(len, iter_student_tables_parallel(path, workers, chunk_size))), repeat=1))
+
+
+if __name__ == '__main__':
+    main()
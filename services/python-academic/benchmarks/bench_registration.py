@@ -0,0 +1,115 @@
+"""
+Load test of the course registration engine: thousands of students rush a
+few popular courses from many threads, then from several processes on one
+database, and half of the enrolled students drop again so their seats go to
+the waitlists. After each phase the seats, rosters and waitlists are checked
+for overbooking, wrong counters and time slot conflicts.
+"""
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import itertools
+import os
+import random
+import tempfile
+import time
+
+from f3re.academic.schedule import slots_conflict
+from f3re.academic.store.db_mapper import StudentStore
+from f3re.academic.store.registration import Registrar
+
+from common import make_courses, make_students
+
+_registrar = None
+
+
+def _open(path: str):
+    # Each worker process registers through its own connections; the store stays open until the process exits.
+    global _registrar
+    _registrar = Registrar(StudentStore(path).__enter__())
+
+
+def _register(requests):
+    return [_registrar.register(student_id, course_id).status for student_id, course_id in requests]
+
+
+def _setup(store: StudentStore, students, courses, capacity: int) -> Registrar:
+    registrar = Registrar(store)
+    store.create_table()
+    registrar.create_table()
+    for course in courses:
+        store.save_course(course)
+        registrar.offer(course.course_id, capacity)
+    for student in students:
+        store.create(student)
+    return registrar
+
+
+def _verify(registrar: Registrar, students, courses):
+    assert registrar.check_seats() == []
+    by_id = {course.course_id: course for course in courses}
+    for course in courses:
+        seats = registrar.seats(course.course_id)
+        assert len(registrar.roster(course.course_id)) == seats.enrolled <= seats.capacity
+        assert seats.available == 0 or seats.waitlisted == 0, seats
+    for student in students:
+        enrolled = [by_id[course_id] for course_id in registrar.enrolled_courses(student.student_id)]
+        for a, b in itertools.combinations(enrolled, 2):
+            assert not any(slots_conflict(x, y) for x in a.time_slots for y in b.time_slots), (student, a, b)
+
+
+def _report(label: str, outcomes, seconds: float):
+    counts = Counter(status.name for status in outcomes)
+    print(f"{label:<32} {len(outcomes) / seconds:>10,.0f} requests/s  "
+          + ', '.join(f"{name.lower()} {count}" for name, count in sorted(counts.items())))
+
+
+def main(n: int = 5_000, n_courses: int = 40, hot: int = 8, capacity: int = 60, per_student: int = 4,
+         threads: int = 32, processes: int = 4):
+    students = make_students(n, grades_per_student=0)
+    courses = make_courses(n_courses)
+    rng = random.Random(1)
+    # Most students want the same few courses.
+    weights = [10 if course.course_id <= hot else 1 for course in courses]
+    requests = []
+    for student in students:
+        wanted = set()
+        while len(wanted) < per_student:
+            wanted.add(rng.choices(courses, weights)[0].course_id)
+        requests += [(student.student_id, course_id) for course_id in wanted]
+    rng.shuffle(requests)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with StudentStore(os.path.join(tmp, 'threads.sqlite')) as store, ThreadPoolExecutor(threads) as pool:
+            registrar = _setup(store, students, courses, capacity)
+            start = time.perf_counter()
+            outcomes = list(pool.map(lambda request: registrar.register(*request).status, requests))
+            _report(f'register, {threads} threads', outcomes, time.perf_counter() - start)
+            _verify(registrar, students, courses)
+
+            enrolled = [(student.student_id, course_id) for student in students
+                        for course_id in registrar.enrolled_courses(student.student_id)]
+            drops = rng.sample(enrolled, len(enrolled) // 2)
+            waiting = sum(registrar.seats(course.course_id).waitlisted for course in courses)
+            start = time.perf_counter()
+            assert all(pool.map(lambda request: registrar.drop(*request), drops))
+            seconds = time.perf_counter() - start
+            promoted = waiting - sum(registrar.seats(course.course_id).waitlisted for course in courses)
+            print(f"{'drop, ' + str(threads) + ' threads':<32} {len(drops) / seconds:>10,.0f} requests/s  "
+                  f"{promoted} promoted or dropped from waitlists")
+            _verify(registrar, students, courses)
+
+        path = os.path.join(tmp, 'processes.sqlite')
+        chunks = [requests[i::processes * 8] for i in range(processes * 8)]
+        with StudentStore(path) as store:
+            registrar = _setup(store, students, courses, capacity)
+            with ProcessPoolExecutor(processes, initializer=_open, initargs=(path,)) as pool:
+                start = time.perf_counter()
+                outcomes = [status for chunk in pool.map(_register, chunks) for status in chunk]
+                _report(f'register, {processes} processes', outcomes, time.perf_counter() - start)
+            _verify(registrar, students, courses)
+    print(f"{len(requests):,} requests from {n:,} students for {n_courses} courses of {capacity} seats: "
+          "no overbooking, counters and rosters agree, no conflicting enrollments")
+
+
+if __name__ == '__main__':
+    main()
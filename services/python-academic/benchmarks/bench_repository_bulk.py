@@ -0,0 +1,67 @@
+"""
+Rows/sec of StudentRepository.add/get_by_id (one statement and, for writes,
+one commit per student) against add_many/get_many, and of the function-based
+demo's insert_student against insert_students.
+
+Writes are measured under the WAL profile, where a commit does not sync and
+the batched path mostly saves encoding work, and under the rollback-journal
+profile (SQLite's defaults), where every per-row commit waits for a sync.
+"""
+import os
+import sqlite3
+import tempfile
+
+from f3re.academic.store import demo
+from f3re.academic.store.class_based_demo import StudentRepository
+from f3re.academic.store.connection import DEFAULT_PROFILE, ROLLBACK_PROFILE
+
+from common import make_students, measure, report
+
+
+def main(n: int = 3_000):
+    students = make_students(n, grades_per_student=8)
+    ids = [s.student_id for s in students]
+    with tempfile.TemporaryDirectory() as tmp:
+        def fresh_path(name):
+            path = os.path.join(tmp, name)
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+            return path
+
+        for label, profile in (('wal', DEFAULT_PROFILE), ('rollback journal', ROLLBACK_PROFILE)):
+            def add_each():
+                with StudentRepository(fresh_path('each.sqlite'), profile=profile) as repo:
+                    repo.create_tables()
+                    for student in students:
+                        repo.add(student)
+
+            def add_bulk():
+                with StudentRepository(fresh_path('bulk.sqlite'), profile=profile) as repo:
+                    repo.create_tables()
+                    repo.add_many(students)
+
+            report(f'add (per row), {label}', n, measure(add_each, repeat=1), 'rows')
+            report(f'add_many, {label}', n, measure(add_bulk, repeat=1), 'rows')
+
+        def demo_insert(insert):
+            conn = sqlite3.connect(fresh_path('demo.sqlite'))
+            try:
+                demo.create_tables(conn)
+                insert(conn)
+            finally:
+                conn.close()
+
+        report('demo insert_student (sqlite3 defaults)', n, measure(lambda: demo_insert(
+            lambda conn: [demo.insert_student(conn, student) for student in students]), repeat=1), 'rows')
+        report('demo insert_students (sqlite3 defaults)', n, measure(lambda: demo_insert(
+            lambda conn: demo.insert_students(conn, students)), repeat=1), 'rows')
+
+        with StudentRepository(os.path.join(tmp, 'bulk.sqlite')) as repo:
+            assert repo.get_many(ids) == {s.student_id: s for s in students}
+            report('get_by_id (per row)', n, measure(lambda: [repo.get_by_id(i) for i in ids]), 'rows')
+            report('get_many', n, measure(lambda: repo.get_many(ids)), 'rows')
+
+
+if __name__ == '__main__':
+    main()
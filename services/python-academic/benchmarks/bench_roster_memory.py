@@ -0,0 +1,46 @@
+"""
+Retained memory of a roster held as a list of Student objects versus a
+StudentTable, plus the per-instance saving of the slotted value objects.
+"""
+from dataclasses import dataclass
+import gc
+import tracemalloc
+
+from f3re.academic.model import StudentTable, contact
+
+from common import make_students
+
+
+@dataclass(frozen=True)
+class DictPhone:
+    value: str
+
+
+def traced(fn):
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    result = fn()
+    gc.collect()
+    return result, tracemalloc.get_traced_memory()[0] - before
+
+
+def main(n: int = 50_000):
+    tracemalloc.start()
+    numbers = [f"139{i:08d}" for i in range(n)]
+    _, dict_phones = traced(lambda: [DictPhone(v) for v in numbers])
+    _, slot_phones = traced(lambda: [contact.Phone(v) for v in numbers])
+    print(f"{'Phone with __dict__':<40} {dict_phones / n:>10.1f} bytes/instance")
+    print(f"{'Phone with __slots__':<40} {slot_phones / n:>10.1f} bytes/instance")
+
+    students, as_objects = traced(lambda: make_students(n, grades_per_student=12))
+    del students
+    # Built from a temporary list, so only the table and the courses it shares stay alive.
+    table, as_table = traced(lambda: StudentTable(make_students(n, grades_per_student=12)))
+    tracemalloc.stop()
+    assert len(table) == n
+    print(f"{'list[Student]':<40} {as_objects / 2 ** 20:>10.1f} MiB ({as_objects / n:,.0f} bytes/student)")
+    print(f"{'StudentTable':<40} {as_table / 2 ** 20:>10.1f} MiB ({as_table / n:,.0f} bytes/student)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+"""
+Query latency of ScheduleIndex for course, room and class conflict checks
+over a few thousand courses.
+"""
+import time
+
+from f3re.academic.schedule import ScheduleIndex
+
+from common import make_courses
+
+
+def per_query_us(fn, items) -> float:
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    return (time.perf_counter() - start) / len(items) * 1e6
+
+
+def main(n: int = 5_000):
+    courses = make_courses(n, n_classes=300)
+    start = time.perf_counter()
+    index = ScheduleIndex(courses)
+    print(f"{'build index':<40} {(time.perf_counter() - start) * 1000:>10.1f} ms")
+    print(f"{'conflicts_with':<40} {per_query_us(index.conflicts_with, courses):>10.1f} us/query")
+    print(f"{'is_room_free':<40} {per_query_us(lambda c: index.is_room_free(c.location, c.time_slots[0], c.course_id), courses):>10.1f} us/query")
+    print(f"{'is_class_free':<40} {per_query_us(lambda c: index.is_class_free(min(c.class_id), c.time_slots[0], c.course_id), courses):>10.1f} us/query")
+    start = time.perf_counter()
+    pairs = index.double_booked_classes()
+    print(f"{'double_booked_classes':<40} {(time.perf_counter() - start) * 1000:>10.1f} ms ({len(pairs):,} pairs)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+"""
+Stored size and records/sec of the JSON and binary serializers for full
+Student records, both on their own and through StudentRepository.
+"""
+import os
+import tempfile
+
+from f3re.academic.store.class_based_demo import StudentRepository
+from f3re.academic.store.serializer import SERIALIZERS
+
+from common import make_students, measure, report
+
+
+def main(n: int = 2_000):
+    students = make_students(n)
+    ids = [s.student_id for s in students]
+    for name, serializer in SERIALIZERS.items():
+        blobs = [serializer.dumps(s) for s in students]
+        assert [serializer.loads(b) for b in blobs] == students
+        print(f"{name}: {sum(map(len, blobs)) / n:,.0f} bytes/student")
+        report(f'{name} dumps', n, measure(lambda: [serializer.dumps(s) for s in students]))
+        report(f'{name} loads', n, measure(lambda: [serializer.loads(b) for b in blobs]))
+        report(f'{name} loads (trusted)', n, measure(lambda: [serializer.loads(b, trusted=True) for b in blobs]))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in SERIALIZERS:
+            path = os.path.join(tmp, f'{name}.sqlite')
+            with StudentRepository(path, serializer=name) as repo:
+                repo.create_tables()
+                report(f'add_many ({name})', n, measure(lambda: repo.add_many(students), repeat=1), 'rows')
+                assert repo.get_many(ids) == {s.student_id: s for s in students}
+                report(f'get_many ({name})', n, measure(lambda: repo.get_many(ids)), 'rows')
+            print(f"{name}: database file {os.path.getsize(path) / 1024:,.0f} KiB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Time to list one class roster page from StudentStore as the table grows:
+hydrating every student and filtering in Python, against query_page, and
+the cost of a deep page with keyset pagination against ``offset``.
+"""
+import os
+import tempfile
+
+from f3re.academic.model import Status
+from f3re.academic.store.db_mapper import StudentStore
+from f3re.academic.store.query import StudentFilter, select_ids
+
+from common import make_students, measure
+
+ROSTER = dict(class_id=3, major=3, status=Status.ACTIVE)
+
+
+def _offset_page(conn, offset: int, limit: int):
+    sql, params = select_ids(StudentFilter(**ROSTER), None, limit)
+    return conn.execute(sql.replace('limit ?', 'limit ? offset ?'), params + [offset]).fetchall()
+
+
+def main(sizes=(4_000, 16_000), limit: int = 20):
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            students = make_students(n, grades_per_student=2, n_classes=20)
+            path = os.path.join(tmp, f'{n}.sqlite')
+            with StudentStore(path) as store:
+                store.create_table()
+                for student in students:
+                    store.create(student)
+                matching = [s for s in students if s.class_id == 3 and s.major[0] == 3 and s.status is Status.ACTIVE]
+                assert list(store.query(page_size=limit, **ROSTER)) == matching
+                ids = [s.student_id for s in students]
+                last_after = matching[-limit - 1].student_id
+
+                def scan():
+                    return [s for s in store.find_many(ids).values()
+                            if s.class_id == 3 and s.major[0] == 3 and s.status is Status.ACTIVE][:limit]
+
+                with store.connections.reader() as conn:
+                    offset = measure(lambda: _offset_page(conn, len(matching) - limit, limit), repeat=20)
+                    keyset = measure(lambda: conn.execute(*select_ids(StudentFilter(**ROSTER), last_after, limit))
+                                     .fetchall(), repeat=20)
+                print(f"{n:,} students, {len(matching)} in the roster:")
+                print(f"  {'full scan + filter':<28} {measure(scan, repeat=1) * 1e3:9.2f} ms")
+                print(f"  {'query_page (first page)':<28} "
+                      f"{measure(lambda: store.query_page(limit=limit, **ROSTER), repeat=20) * 1e3:9.2f} ms")
+                print(f"  {'last page ids, offset':<28} {offset * 1e3:9.3f} ms")
+                print(f"  {'last page ids, keyset':<28} {keyset * 1e3:9.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Weekly class timetables from StudentStore with and without TimetableCache,
+and a streamed iCalendar export for many students with its peak memory.
+"""
+import datetime as dt
+import os
+import tempfile
+import tracemalloc
+
+from f3re.academic.schedule import Semester, TimetableCache, write_student_calendars
+from f3re.academic.store.db_mapper import StudentStore
+
+from common import make_students, measure, report
+
+
+class _Counter:
+    """Unseekable sink that only counts bytes."""
+
+    def __init__(self):
+        self.size = 0
+
+    def write(self, data) -> int:
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+
+def main(n: int = 10_000, n_classes: int = 100):
+    students = make_students(n, grades_per_student=4, n_courses=1_000, n_classes=n_classes)
+    semester = Semester(dt.date(2025, 2, 24), weeks=18)
+    classes = range(1, n_classes + 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        with StudentStore(os.path.join(tmp, 'timetable.sqlite')) as store:
+            store.create_table()
+            for student in students:
+                store.create(student)
+
+            def uncached():
+                return [semester.week(store.find_courses_by_class(c), 7) for c in classes]
+
+            timetables = TimetableCache(semester)
+            cached = lambda: [timetables.class_week(c, 7, lambda: store.find_courses_by_class(c)) for c in classes]
+            assert cached() == uncached()
+            report('class week, load + expand', n_classes, measure(uncached), 'timetables')
+            report('class week, TimetableCache', n_classes, measure(cached), 'timetables')
+            occurrences = sum(len(semester.week(store.find_courses_by_class(c), w))
+                              for c in classes for w in range(1, semester.weeks + 1))
+            print(f"{occurrences:,} dated meetings in the semester")
+
+            sink = _Counter()
+            tracemalloc.start()
+            seconds = measure(lambda: write_student_calendars(
+                store.query(page_size=500), timetables, store.find_courses_by_class, sink), repeat=1)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            report('iCalendar export (zip)', n, seconds, 'students')
+            print(f"archive {sink.size / 1024:,.0f} KiB, peak traced memory {peak / 1024 / 1024:.1f} MiB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Shared fixtures for the academic benchmarks.
+
+Run any benchmark from the service root, e.g.
+``PYTHONPATH=src python benchmarks/bench_json_codec.py``.
+"""
+import datetime as dt
+import random
+import time
+from typing import Callable, List
+
+from f3re.academic.model import constants, contact, models
+
+PROVINCES = sorted(constants.CHINA_PROVINCES)
+
+
+def make_courses(n: int, n_classes: int = 20, seed: int = 0) -> List[models.Course]:
+    """Build `n` courses taught by n // 4 teachers, each with one or two time slots."""
+    rng = random.Random(seed)
+    teachers = [
+        models.Teacher(
+            teacher_id=t, name=f"Teacher {t}", sex=rng.choice(list(constants.Sex)),
+            department=f"Department {t % 7}",
+            phone=contact.Phone(f"138{t:08d}"), email=contact.Email(f"teacher{t}@example.com"),
+        )
+        for t in range(1, max(n // 4, 1) + 1)
+    ]
+    courses = []
+    for c in range(1, n + 1):
+        start = rng.randrange(8, 19)
+        slots = tuple(
+            models.TimeSlot(
+                day=rng.choice(list(constants.DayOfWeek)),
+                start_time=dt.time(start, 0), end_time=dt.time(start + 1, 45),
+                repetition=rng.choice(list(constants.Repetition)),
+            )
+            for _ in range(rng.randint(1, 2))
+        )
+        courses.append(models.Course(
+            course_id=c, name=f"Course {c}", teacher=teachers[c % len(teachers)],
+            location=f"Building {c % 9}, Room {100 + c % 50}", credit=rng.randint(1, 5),
+            class_id=frozenset(rng.sample(range(1, n_classes + 1), 2)), time_slots=slots,
+        ))
+    return courses
+
+
+def make_students(n: int, grades_per_student: int = 24, n_courses: int = 200,
+                  n_classes: int = 20, seed: int = 0) -> List[models.Student]:
+    """Build `n` students sharing a pool of `n_courses` courses."""
+    rng = random.Random(seed)
+    courses = make_courses(n_courses, n_classes=n_classes, seed=seed)
+    students = []
+    for i in range(n):
+        student_id = 2020000000 + i
+        students.append(models.Student(
+            student_id=student_id, name=f"Student {i}", sex=rng.choice(list(constants.Sex)),
+            birthdate=dt.date(2000 + i % 6, 1 + i % 12, 1 + i % 28), enroll_year=2020 + i % 5,
+            major=(1 + i % 10, f"Major {1 + i % 10}"), class_id=1 + i % n_classes,
+            phone=contact.Phone(f"139{i % 10 ** 8:08d}"), email=contact.Email(f"s{student_id}@example.com"),
+            address=models.Address(province=PROVINCES[i % len(PROVINCES)], city=f"City {i % 50}"),
+            family_members=[
+                models.FamilyMember(name=f"Parent {i}", relationship="Mother",
+                                    phone=contact.Phone(f"137{i % 10 ** 8:08d}")),
+            ],
+            status=rng.choice(list(constants.Status)),
+            grades=[
+                models.Grade(course=course, score=float(rng.randint(40, 100)))
+                for course in rng.sample(courses, min(grades_per_student, len(courses)))
+            ],
+        ))
+    return students
+
+
+def measure(fn: Callable[[], object], repeat: int = 3) -> float:
+    """Return the best wall-clock time of `repeat` calls to `fn`, in seconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(label: str, count: int, seconds: float, unit: str = 'objects') -> None:
+    print(f"{label:<40} {count / seconds:>14,.0f} {unit}/sec  ({seconds * 1000:.1f} ms)")
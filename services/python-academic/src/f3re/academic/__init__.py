@@ -1,5 +1,16 @@
-from .model import models, constants, contact
-from .store import db_mapper, json_mapper, utils
+from ._lazy import lazy_modules
+
+# Submodules are imported on first access, so importing one of them does not load the rest.
+__getattr__, __dir__ = lazy_modules(__name__, {
+    "models": ".model.models",
+    "constants": ".model.constants",
+    "contact": ".model.contact",
+    "db_mapper": ".store.db_mapper",
+    "json_mapper": ".store.json_mapper",
+    "utils": ".store.utils",
+    "model": ".model",
+    "store": ".store",
+})
 
 __all__ = [
     "models",
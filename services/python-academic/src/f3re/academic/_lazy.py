@@ -0,0 +1,41 @@
+import importlib
+import sys
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+
+def _hooks(package: str, targets: Dict[str, Tuple[str, Optional[str]]]) -> Tuple[Callable, Callable]:
+    namespace = sys.modules[package].__dict__
+
+    def __getattr__(name: str):
+        target = targets.get(name)
+        if target is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        module_name, attr = target
+        value = importlib.import_module(module_name, package)
+        if attr is not None:
+            value = getattr(value, attr)
+        # Later lookups find the name directly and skip this hook.
+        namespace[name] = value
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(namespace) | set(targets))
+
+    return __getattr__, __dir__
+
+
+def lazy_attributes(package: str, modules: Dict[str, Sequence[str]]) -> Tuple[Callable, Callable]:
+    """
+    PEP 562 `__getattr__`/`__dir__` for `package` that import each name from
+    its module on first access.
+
+    Args:
+        package: ``__name__`` of the package.
+        modules: Relative module name -> names it exports.
+    """
+    return _hooks(package, {name: (module, name) for module, names in modules.items() for name in names})
+
+
+def lazy_modules(package: str, modules: Dict[str, str]) -> Tuple[Callable, Callable]:
+    """Like `lazy_attributes`, for names that are themselves modules (name -> relative module name)."""
+    return _hooks(package, {name: (module, None) for name, module in modules.items()})
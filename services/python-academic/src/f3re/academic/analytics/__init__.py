@@ -0,0 +1,12 @@
+# ruff: noqa: F401
+"""
+Batch analytics over whole cohorts.
+
+Requires NumPy, installed with the ``analytics`` extra.
+"""
+
+from .gpa import CohortGrades
+
+__all__ = [
+    "CohortGrades",
+]
@@ -0,0 +1,155 @@
+from __future__ import annotations
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..model.models import Student
+from ..store.db_mapper import StudentStore
+
+
+def _round_like_python(values: np.ndarray, ndigits: int) -> np.ndarray:
+    """
+    Apply the builtin ``round`` elementwise. ``np.round`` scales by 10**ndigits
+    and can disagree with ``round`` on values that are not exactly representable,
+    so each distinct value is rounded by Python and broadcast back.
+    """
+    unique, inverse = np.unique(values, return_inverse=True)
+    rounded = np.fromiter((round(v, ndigits) for v in unique.tolist()), dtype=np.float64, count=len(unique))
+    return rounded[inverse.reshape(values.shape)]
+
+
+def _group_bounds(sorted_keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Start offsets and lengths of the runs of equal keys in a sorted array."""
+    if not len(sorted_keys):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    return starts, np.diff(np.r_[starts, len(sorted_keys)])
+
+
+class CohortGrades:
+    """
+    Columnar view of a cohort's grades.
+
+    Student-level columns (`student_id`, `class_id`, `major_id`) have one entry
+    per student; grade-level columns (`student_index`, `course_id`, `credit`,
+    `score`) have one entry per grade, with `student_index` pointing into the
+    student columns. `gpa` reproduces `Student.gpa` bit for bit.
+    """
+
+    def __init__(self, student_id: np.ndarray, class_id: np.ndarray, major_id: np.ndarray,
+                 student_index: np.ndarray, course_id: np.ndarray, credit: np.ndarray, score: np.ndarray):
+        self.student_id = np.asarray(student_id, dtype=np.int64)
+        self.class_id = np.asarray(class_id, dtype=np.int64)
+        self.major_id = np.asarray(major_id, dtype=np.int64)
+        self.student_index = np.asarray(student_index, dtype=np.int64)
+        self.course_id = np.asarray(course_id, dtype=np.int64)
+        self.credit = np.asarray(credit, dtype=np.int64)
+        self.score = np.asarray(score, dtype=np.float64)
+        if not len(self.student_id) == len(self.class_id) == len(self.major_id):
+            raise ValueError('Student columns must have the same length.')
+        if not len(self.student_index) == len(self.course_id) == len(self.credit) == len(self.score):
+            raise ValueError('Grade columns must have the same length.')
+
+    @classmethod
+    def from_students(cls, students: Iterable[Student]) -> CohortGrades:
+        student_id, class_id, major_id = [], [], []
+        student_index, course_id, credit, score = [], [], [], []
+        for i, student in enumerate(students):
+            student_id.append(student.student_id)
+            class_id.append(student.class_id)
+            major_id.append(student.major[0])
+            for grade in student.grades:
+                student_index.append(i)
+                course_id.append(grade.course.course_id)
+                credit.append(grade.course.credit)
+                score.append(grade.score)
+        return cls(student_id, class_id, major_id, student_index, course_id, credit, score)
+
+    @classmethod
+    def from_store(cls, store: StudentStore) -> CohortGrades:
+        """Load every student and grade of a `StudentStore` without hydrating models."""
+        if store.connections is None:
+            raise ConnectionError('Cannot load grades')
+        # One read transaction, so students and grades come from the same snapshot.
+        with store.connections.reader() as conn:
+            students = np.array(conn.execute(
+                'select Student_Id, Class_Id, Major_Id from Students_Academic order by Student_Id').fetchall(),
+                dtype=np.int64).reshape(-1, 3)
+            grades = conn.execute('''
+                select g.Student_Id, g.Course_Id, c.Credit, g.Score
+                from Grades g join Courses c on c.Course_Id = g.Course_Id
+                order by g.Student_Id, g.Grade_No
+            ''').fetchall()
+        grade_cols = np.array(grades, dtype=np.float64).reshape(-1, 4)
+        student_index = np.searchsorted(students[:, 0], grade_cols[:, 0].astype(np.int64))
+        return cls(students[:, 0], students[:, 1], students[:, 2],
+                   student_index, grade_cols[:, 1], grade_cols[:, 2], grade_cols[:, 3])
+
+    @property
+    def grade_point(self) -> np.ndarray:
+        return _round_like_python(self.score / 20, 1)
+
+    def gpa(self) -> np.ndarray:
+        """Per-student GPA aligned with `student_id`, with `Student.gpa` semantics."""
+        n = len(self.student_id)
+        # Quality points in tenths are integers, so their float64 sums are exact, as in Student.gpa.
+        tenths = np.bincount(self.student_index, weights=np.rint(self.grade_point * 10) * self.credit, minlength=n)
+        credits = np.bincount(self.student_index, weights=self.credit, minlength=n)
+        gpa = np.divide(tenths / 10, credits, out=np.zeros(n), where=credits > 0)
+        return _round_like_python(gpa, 1)
+
+    def rank(self, by: Optional[str] = None, values: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Competition rank (1 = best, ties share the lower rank) of each student.
+        Args:
+            by: ``'class'``, ``'major'`` or None to rank the whole cohort.
+            values: Per-student values to rank on; defaults to `gpa`.
+        """
+        values = self.gpa() if values is None else np.asarray(values)
+        groups = {None: np.zeros(len(self.student_id), dtype=np.int64),
+                  'class': self.class_id, 'major': self.major_id}[by]
+        order = np.lexsort((-values, groups))
+        g, v = groups[order], values[order]
+        idx = np.arange(len(order))
+        new_group = np.r_[True, g[1:] != g[:-1]]
+        new_value = new_group | np.r_[True, v[1:] != v[:-1]]
+        group_start = np.maximum.accumulate(np.where(new_group, idx, 0))
+        value_start = np.maximum.accumulate(np.where(new_value, idx, 0))
+        ranks = np.empty(len(order), dtype=np.int64)
+        ranks[order] = value_start - group_start + 1
+        return ranks
+
+    def course_stats(self, percentiles: Sequence[float] = (25, 50, 75)) -> Dict[str, np.ndarray]:
+        """
+        Returns:
+            dict: ``course_id``, ``count``, ``mean``, ``std`` (population) and one
+            ``p<q>`` column per percentile, with `np.percentile`'s linear interpolation.
+        """
+        order = np.lexsort((self.score, self.course_id))
+        course, score = self.course_id[order], self.score[order]
+        starts, counts = _group_bounds(course)
+        group = np.repeat(np.arange(len(starts)), counts)
+        mean = np.bincount(group, weights=score) / counts
+        std = np.sqrt(np.bincount(group, weights=(score - mean[group]) ** 2) / counts)
+        stats = {'course_id': course[starts], 'count': counts, 'mean': mean, 'std': std}
+        for q in percentiles:
+            pos = starts + (counts - 1) * (q / 100)
+            lo = np.floor(pos).astype(np.int64)
+            hi = np.minimum(lo + 1, starts + counts - 1)
+            stats[f'p{q:g}'] = score[lo] + (score[hi] - score[lo]) * (pos - lo)
+        return stats
+
+    def histogram(self, bins: Sequence[float] = (0, 60, 70, 80, 90, 100)) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score histogram per course. Bins are half-open except the last, as in `np.histogram`.
+        Returns:
+            tuple: (course_ids, counts) where ``counts[i, j]`` is the number of grades of
+            ``course_ids[i]`` in bin ``j``.
+        """
+        edges = np.asarray(bins, dtype=np.float64)
+        courses, group = np.unique(self.course_id, return_inverse=True)
+        nbins = len(edges) - 1
+        bin_idx = np.clip(np.searchsorted(edges, self.score, side='right') - 1, 0, nbins - 1)
+        inside = (self.score >= edges[0]) & (self.score <= edges[-1])
+        counts = np.bincount(group[inside] * nbins + bin_idx[inside], minlength=len(courses) * nbins)
+        return courses, counts.reshape(len(courses), nbins)
@@ -0,0 +1,374 @@
+from contextlib import asynccontextmanager
+import datetime as dt
+import json
+import os
+import sqlite3
+from typing import Iterable, Optional
+
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+
+from .model import Course, Grade, Student
+from .schedule.ical import course_events, iter_calendar
+from .schedule.timetable import Semester, TimetableCache
+from .store.cache import CachedStudentStore, StudentCache
+from .store.connection import ConnectionManager
+from .store.db_mapper import StudentStore, load_settings
+from .store.identity import IdentityMap
+from .store.json_mapper import EnhancedJSONDecoder, EnhancedJSONEncoder
+from .store.pool import StorePool
+from .store.reference import get_reference_data
+from .store.registration import Registrar, RegistrationStatus
+
+DB_PATH = os.getenv('ACADEMIC_DB') or load_settings()['STUDENT_DB'] or 'academic.sqlite'
+POOL_SIZE = int(os.getenv('ACADEMIC_POOL_SIZE', '8'))
+CACHE_SIZE = int(os.getenv('ACADEMIC_CACHE_SIZE', '10000'))
+CACHE_TTL = float(os.getenv('ACADEMIC_CACHE_TTL', '300'))
+READERS = int(os.getenv('ACADEMIC_READERS', str(POOL_SIZE)))
+# First day of teaching; defaults to the Monday of the current week.
+SEMESTER_START = os.getenv('ACADEMIC_SEMESTER_START')
+SEMESTER_WEEKS = int(os.getenv('ACADEMIC_SEMESTER_WEEKS', '18'))
+TIMETABLE_CACHE_SIZE = int(os.getenv('ACADEMIC_TIMETABLE_CACHE_SIZE', '4096'))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    cache = StudentCache(maxsize=CACHE_SIZE, ttl=CACHE_TTL)
+    course_map, teacher_map = IdentityMap(), IdentityMap()
+    # Pooled stores share one writer connection and a pool of WAL readers.
+    connections = ConnectionManager(DB_PATH, readers=READERS)
+    pool = StorePool(lambda: CachedStudentStore(DB_PATH, cache=cache, connections=connections,
+                                                course_map=course_map, teacher_map=teacher_map),
+                     size=POOL_SIZE)
+    await pool.run(lambda store: store.create_table())
+    reference = get_reference_data()
+    await pool.run(lambda store: store.sync_reference_data(reference))
+    today = dt.date.today()
+    start = dt.date.fromisoformat(SEMESTER_START) if SEMESTER_START else today - dt.timedelta(days=today.weekday())
+    timetables = TimetableCache(Semester(start, SEMESTER_WEEKS), maxsize=TIMETABLE_CACHE_SIZE)
+    # Registrations are serialized by the writer connection, so one registrar serves every request.
+    registrar_store = StudentStore(DB_PATH, connections=connections, course_map=course_map, teacher_map=teacher_map)
+    registrar = Registrar(registrar_store.__enter__())
+    await pool.run(lambda store: registrar.create_table())
+    app.state.pool, app.state.cache, app.state.timetables = pool, cache, timetables
+    app.state.registrar = registrar
+    try:
+        yield
+    finally:
+        pool.close()
+        registrar_store.__exit__(None, None, None)
+        connections.close()
+
+
+app = FastAPI(
+    title="F3re Academic Data Service",
+    description="Serves student, course and grade records.",
+    version="0.1.0",
+    lifespan=lifespan,
+)
+
+
+def _json_response(obj, status_code: int = 200) -> Response:
+    return Response(json.dumps(obj, cls=EnhancedJSONEncoder, separators=(',', ':')),
+                    status_code=status_code, media_type='application/json')
+
+
+async def _decode_body(request: Request, expected: type):
+    try:
+        obj = json.loads(await request.body(), cls=EnhancedJSONDecoder)
+    except (ValueError, TypeError, KeyError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if not isinstance(obj, expected):
+        raise HTTPException(status_code=422, detail=f"Body must encode a {expected.__name__} object.")
+    return obj
+
+
+def _integrity_error(e: sqlite3.IntegrityError, duplicate: str) -> HTTPException:
+    """409 for a primary key or unique violation, 422 for any other constraint (foreign key, check, not null)."""
+    # sqlite_errorname is only set from Python 3.11 on; older versions just have the message.
+    name = getattr(e, 'sqlite_errorname', None)
+    if name in ('SQLITE_CONSTRAINT_PRIMARYKEY', 'SQLITE_CONSTRAINT_UNIQUE') or (
+            name is None and str(e).startswith('UNIQUE constraint failed')):
+        return HTTPException(status_code=409, detail=duplicate)
+    return HTTPException(status_code=422, detail=str(e))
+
+
+@app.get("/")
+def read_root():
+    return {"message": "F3re Academic Data Service is running"}
+
+
+@app.get("/metrics/cache")
+def cache_metrics(request: Request):
+    return request.app.state.cache.stats()
+
+
+@app.get("/metrics/timetables")
+def timetable_metrics(request: Request):
+    return request.app.state.timetables.stats()
+
+
+def _week(timetables: TimetableCache, week: Optional[int]) -> int:
+    if week is None:
+        week = timetables.semester.week_of(dt.date.today())
+        if week is None:
+            raise HTTPException(status_code=422, detail="The semester is not in session; pass a week.")
+    if not 1 <= week <= timetables.semester.weeks:
+        raise HTTPException(status_code=422, detail=f"Week must be between 1 and {timetables.semester.weeks}.")
+    return week
+
+
+def _timetable_response(week: int, occurrences) -> Response:
+    return _json_response({"week": week, "occurrences": [{
+        "course_id": o.course.course_id, "name": o.course.name, "location": o.course.location,
+        "teacher": o.course.teacher.name, "start": o.start.isoformat(), "end": o.end.isoformat(),
+    } for o in occurrences]})
+
+
+async def _find_student(request: Request, student_id: int) -> Student:
+    student = await request.app.state.pool.run(lambda store: store.find_by_id(student_id))
+    if student is None:
+        raise HTTPException(status_code=404, detail="Student not found")
+    return student
+
+
+def _invalidate_timetables(request: Request, courses: Iterable[Course]):
+    """Drop the timetables of courses a student write added to the database."""
+    for course in courses:
+        request.app.state.timetables.invalidate_course(course.course_id, course)
+
+
+async def _class_courses(request: Request, class_id: int):
+    timetables = request.app.state.timetables
+    return await request.app.state.pool.run(
+        lambda store: timetables.class_courses(class_id, lambda: store.find_courses_by_class(class_id)))
+
+
+@app.get("/classes/{class_id}/timetable")
+async def get_class_timetable(class_id: int, request: Request, week: Optional[int] = None):
+    timetables = request.app.state.timetables
+    week = _week(timetables, week)
+    occurrences = await request.app.state.pool.run(
+        lambda store: timetables.class_week(class_id, week, lambda: store.find_courses_by_class(class_id)))
+    return _timetable_response(week, occurrences)
+
+
+@app.get("/teachers/{teacher_id}/timetable")
+async def get_teacher_timetable(teacher_id: int, request: Request, week: Optional[int] = None):
+    timetables = request.app.state.timetables
+    week = _week(timetables, week)
+    occurrences = await request.app.state.pool.run(
+        lambda store: timetables.teacher_week(teacher_id, week, lambda: store.find_courses_by_teacher(teacher_id)))
+    return _timetable_response(week, occurrences)
+
+
+@app.get("/students/{student_id}/timetable")
+async def get_student_timetable(student_id: int, request: Request, week: Optional[int] = None):
+    student = await _find_student(request, student_id)
+    return await get_class_timetable(student.class_id, request, week)
+
+
+@app.get("/classes/{class_id}/calendar.ics")
+async def get_class_calendar(class_id: int, request: Request):
+    courses = await _class_courses(request, class_id)
+    events = course_events(courses, request.app.state.timetables.semester)
+    return StreamingResponse(iter_calendar(events, f"Class {class_id}"), media_type='text/calendar')
+
+
+@app.get("/students/{student_id}/calendar.ics")
+async def get_student_calendar(student_id: int, request: Request):
+    student = await _find_student(request, student_id)
+    courses = await _class_courses(request, student.class_id)
+    events = course_events(courses, request.app.state.timetables.semester)
+    return StreamingResponse(iter_calendar(events, f"{student.name} ({student_id})"), media_type='text/calendar')
+
+
+@app.get("/students")
+async def list_students(request: Request, class_id: Optional[int] = None, major: Optional[int] = None,
+                        enroll_year: Optional[int] = None, status: Optional[str] = None,
+                        province: Optional[str] = None, sex: Optional[str] = None,
+                        after: Optional[int] = None, limit: int = Query(50, ge=1, le=500)):
+    filters = dict(class_id=class_id, major=major, enroll_year=enroll_year, status=status, province=province, sex=sex)
+    try:
+        page = await request.app.state.pool.run(lambda store: store.query_page(after, limit, **filters))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return _json_response({"students": page.students, "next_after": page.next_after})
+
+
+@app.get("/students/{student_id}")
+async def get_student(student_id: int, request: Request):
+    student = await request.app.state.pool.run(lambda store: store.find_by_id(student_id))
+    if student is None:
+        raise HTTPException(status_code=404, detail="Student not found")
+    return _json_response(student)
+
+
+@app.get("/students/{student_id}/grades")
+async def get_student_grades(student_id: int, request: Request):
+    student = await request.app.state.pool.run(lambda store: store.find_by_id(student_id))
+    if student is None:
+        raise HTTPException(status_code=404, detail="Student not found")
+    return _json_response({"student_id": student_id, "gpa": student.gpa, "grades": student.grades})
+
+
+@app.post("/students/{student_id}/grades", status_code=201)
+async def add_grade(student_id: int, request: Request):
+    grade = await _decode_body(request, Grade)
+    try:
+        added = await request.app.state.pool.run(lambda store: store.add_grade(student_id, grade))
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Student not found")
+    _invalidate_timetables(request, added)
+    return _json_response(grade, status_code=201)
+
+
+@app.put("/students/{student_id}/grades/{course_id}")
+async def update_grade(student_id: int, course_id: int, request: Request):
+    grade = await _decode_body(request, Grade)
+    if grade.course.course_id != course_id:
+        raise HTTPException(status_code=422, detail="Course id does not match the path")
+    if not await request.app.state.pool.run(lambda store: store.update_grade(student_id, grade)):
+        raise HTTPException(status_code=404, detail="Grade not found")
+    return _json_response(grade)
+
+
+@app.delete("/students/{student_id}/grades/{course_id}", status_code=204)
+async def remove_grade(student_id: int, course_id: int, request: Request):
+    if not await request.app.state.pool.run(lambda store: store.remove_grade(student_id, course_id)):
+        raise HTTPException(status_code=404, detail="Grade not found")
+    return Response(status_code=204)
+
+
+@app.get("/students/{student_id}/gpa")
+async def get_student_gpa(student_id: int, request: Request):
+    summary = await request.app.state.pool.run(lambda store: store.find_summary(student_id))
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Student not found")
+    return summary._asdict()
+
+
+@app.get("/rankings")
+async def get_ranking(request: Request, class_id: Optional[int] = None, major: Optional[int] = None,
+                      limit: int = Query(50, ge=1, le=1000)):
+    ranking = await request.app.state.pool.run(lambda store: store.rank_students(class_id, major, limit))
+    return [{"rank": rank, **summary._asdict()} for rank, summary in ranking]
+
+
+@app.post("/students", status_code=201)
+async def create_student(request: Request):
+    student = await _decode_body(request, Student)
+    try:
+        added = await request.app.state.pool.run(lambda store: store.create(student))
+    except sqlite3.IntegrityError as e:
+        raise _integrity_error(e, "Student already exists")
+    _invalidate_timetables(request, added)
+    return _json_response(student, status_code=201)
+
+
+@app.put("/students/{student_id}")
+async def update_student(student_id: int, request: Request):
+    student = await _decode_body(request, Student)
+    if student.student_id != student_id:
+        raise HTTPException(status_code=422, detail="Student id does not match the path")
+    try:
+        added = await request.app.state.pool.run(lambda store: store.update(student))
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Student not found")
+    except sqlite3.IntegrityError as e:
+        raise _integrity_error(e, "Student conflicts with a stored record")
+    _invalidate_timetables(request, added)
+    return _json_response(student)
+
+
+@app.delete("/students/{student_id}", status_code=204)
+async def delete_student(student_id: int, request: Request):
+    registrar = request.app.state.registrar
+    await request.app.state.pool.run(lambda store: registrar.withdraw_student(student_id))
+    if not await request.app.state.pool.run(lambda store: store.delete(student_id)):
+        raise HTTPException(status_code=404, detail="Student not found")
+    return Response(status_code=204)
+
+
+@app.get("/courses/{course_id}")
+async def get_course(course_id: int, request: Request):
+    course = await request.app.state.pool.run(lambda store: store.find_course(course_id))
+    if course is None:
+        raise HTTPException(status_code=404, detail="Course not found")
+    return _json_response(course)
+
+
+@app.put("/courses/{course_id}")
+async def save_course(course_id: int, request: Request):
+    course = await _decode_body(request, Course)
+    if course.course_id != course_id:
+        raise HTTPException(status_code=422, detail="Course id does not match the path")
+    await request.app.state.pool.run(lambda store: store.save_course(course))
+    request.app.state.timetables.invalidate_course(course_id, course)
+    request.app.state.registrar.invalidate_course(course_id)
+    return _json_response(course)
+
+
+@app.get("/courses/{course_id}/grades")
+async def get_course_grades(course_id: int, request: Request):
+    grades = await request.app.state.pool.run(lambda store: store.find_grades_by_course(course_id))
+    return _json_response([{"student_id": student_id, "score": grade.score} for student_id, grade in grades])
+
+
+@app.put("/courses/{course_id}/seats")
+async def offer_course(course_id: int, request: Request, capacity: int = Query(..., ge=0)):
+    registrar = request.app.state.registrar
+    try:
+        promoted = await request.app.state.pool.run(lambda store: registrar.offer(course_id, capacity))
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Course not found")
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"course_id": course_id, "capacity": capacity, "promoted": promoted}
+
+
+@app.get("/courses/{course_id}/seats")
+async def get_seats(course_id: int, request: Request):
+    registrar = request.app.state.registrar
+    seats = await request.app.state.pool.run(lambda store: registrar.seats(course_id))
+    if seats is None:
+        raise HTTPException(status_code=404, detail="Course is not offered")
+    return {**seats._asdict(), "available": seats.available}
+
+
+@app.get("/students/{student_id}/registrations")
+async def get_registrations(student_id: int, request: Request):
+    registrar = request.app.state.registrar
+    return await request.app.state.pool.run(lambda store: {
+        "enrolled": registrar.enrolled_courses(student_id),
+        "waitlisted": registrar.waitlisted_courses(student_id),
+    })
+
+
+# FULL and CONFLICT are refused with 409.
+_REGISTRATION_CODES = {
+    RegistrationStatus.ENROLLED: 201,
+    RegistrationStatus.ALREADY_ENROLLED: 200,
+    RegistrationStatus.WAITLISTED: 202,
+    RegistrationStatus.ALREADY_WAITLISTED: 202,
+}
+
+
+@app.post("/students/{student_id}/registrations/{course_id}", status_code=201)
+async def register(student_id: int, course_id: int, request: Request, waitlist: bool = True):
+    registrar = request.app.state.registrar
+    try:
+        result = await request.app.state.pool.run(lambda store: registrar.register(student_id, course_id, waitlist))
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    body = {"status": result.status.name, "course_id": course_id, "position": result.position,
+            "conflicts": sorted(result.conflicts)}
+    return _json_response(body, status_code=_REGISTRATION_CODES.get(result.status, 409))
+
+
+@app.delete("/students/{student_id}/registrations/{course_id}", status_code=204)
+async def drop_registration(student_id: int, course_id: int, request: Request):
+    registrar = request.app.state.registrar
+    if not await request.app.state.pool.run(lambda store: registrar.drop(student_id, course_id)):
+        raise HTTPException(status_code=404, detail="Registration not found")
+    return Response(status_code=204)
@@ -26,6 +26,7 @@ from .models import (
     Teacher,
     TimeSlot,
 )
+from .roster import StudentTable
 
 __all__ = [
     # from constants.py
@@ -45,4 +46,6 @@ __all__ = [
     "Student",
     "Teacher",
     "TimeSlot",
+    # from roster.py
+    "StudentTable",
 ]
@@ -0,0 +1,65 @@
+from dataclasses import MISSING, fields
+from typing import Callable
+
+_FACTORY = object()
+
+
+def _compile_trusted(cls: type) -> Callable:
+    """
+    Generate a keyword-only constructor for dataclass `cls` that assigns the
+    fields and fills defaults, in the same way the dataclass ``__init__`` does,
+    but never calls ``__post_init__``.
+    """
+    frozen = cls.__dataclass_params__.frozen
+    namespace = {'_new': object.__new__, '_setattr': object.__setattr__, '_FACTORY': _FACTORY}
+    params, lines = [], ['    obj = _new(cls)']
+    for f in fields(cls):
+        if f.default_factory is not MISSING:
+            namespace[f'_factory_{f.name}'] = f.default_factory
+            params.append(f'{f.name}=_FACTORY')
+            lines.append(f'    if {f.name} is _FACTORY: {f.name} = _factory_{f.name}()')
+        elif f.default is not MISSING:
+            namespace[f'_default_{f.name}'] = f.default
+            params.append(f'{f.name}=_default_{f.name}')
+        else:
+            params.append(f.name)
+        lines.append(f"    _setattr(obj, '{f.name}', {f.name})" if frozen else f'    obj.{f.name} = {f.name}')
+    lines.append('    return obj')
+    source = f"def trusted(cls, *, {', '.join(params)}):\n" + '\n'.join(lines) + '\n'
+    exec(source, namespace)
+    return namespace['trusted']
+
+
+class Trusted:
+    """
+    Adds `trusted`, a constructor for values that were already validated, e.g.
+    rows read back from a store. It sets the fields directly and skips the
+    checks in ``__post_init__``; never use it on user input.
+
+    The constructor is generated for each class on first use and installed on
+    that class, so models using this base are not meant to be subclassed.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def trusted(cls, **values):
+        constructor = _compile_trusted(cls)
+        cls.trusted = classmethod(constructor)
+        return constructor(cls, **values)
+
+
+class FrozenSlots(Trusted):
+    """
+    Base for frozen dataclasses that declare ``__slots__``.
+
+    Instances have no ``__dict__``; pickling goes through these hooks because the
+    default slot restore assigns attributes, which frozen dataclasses reject.
+    """
+    __slots__ = ()
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            object.__setattr__(self, name, value)
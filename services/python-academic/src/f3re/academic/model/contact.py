@@ -1,25 +1,32 @@
 from dataclasses import dataclass
 import re
 
+from .base import FrozenSlots
+
+# A simple check for Chinese mobile phone numbers
+_PHONE_PATTERN = re.compile(r"^\d{11}$")
+_EMAIL_PATTERN = re.compile(r"^[\w.-]+@[\w.-]+\.\w+$")
+
 
 @dataclass(frozen=True)
-class Phone:
+class Phone(FrozenSlots):
+    __slots__ = ('value',)
     value: str
 
     def __post_init__(self):
         if not isinstance(self.value, str):
             raise TypeError('Initial value must be a string.')
-        # A simple check for Chinese mobile phone numbers
-        if not re.match(r"^\d{11}$", self.value):
+        if not _PHONE_PATTERN.match(self.value):
             raise ValueError("Invalid phone number format. Expected 11 digits.")
 
 
 @dataclass(frozen=True)
-class Email:
+class Email(FrozenSlots):
+    __slots__ = ('value',)
     value: str
 
     def __post_init__(self):
         if not isinstance(self.value, str):
             raise TypeError('Initial value must be a string.')
-        if not re.match(r"^[\w.-]+@[\w.-]+\.\w+$", self.value):
+        if not _EMAIL_PATTERN.match(self.value):
             raise ValueError('Invalid email format.')
@@ -4,10 +4,12 @@ import datetime as dt
 
 from . import constants as cst
 from .contact import Phone, Email
+from .base import FrozenSlots, Trusted
 
 
 @dataclass(frozen=True)
-class Address:
+class Address(FrozenSlots):
+    __slots__ = ('province', 'city')
     province: str
     city: str
 
@@ -19,7 +21,8 @@ class Address:
 
 
 @dataclass(frozen=True)
-class FamilyMember:
+class FamilyMember(FrozenSlots):
+    __slots__ = ('name', 'relationship', 'phone')
     name: str
     relationship: str
     phone: Phone
@@ -27,7 +30,8 @@ class FamilyMember:
 
 
 @dataclass(frozen=True)
-class TimeSlot:
+class TimeSlot(FrozenSlots):
+    __slots__ = ('day', 'start_time', 'end_time', 'repetition')
     day: cst.DayOfWeek
     start_time: dt.time
     end_time: dt.time
@@ -41,7 +45,7 @@ class TimeSlot:
 
 
 @dataclass(eq=True, unsafe_hash=True)
-class Teacher:
+class Teacher(Trusted):
     teacher_id: int
     name: str
     sex: cst.Sex
@@ -52,7 +56,8 @@ class Teacher:
 
 
 @dataclass(frozen=True)
-class Course:
+class Course(FrozenSlots):
+    __slots__ = ('course_id', 'name', 'teacher', 'location', 'credit', 'class_id', 'time_slots')
     course_id: int
     name: str
     teacher: Teacher
@@ -68,8 +73,21 @@ class Course:
             raise ValueError("At least one time slot must be provided.")
 
 
+def quality_tenths(score: float, credit: int) -> int:
+    """
+    Quality points of a grade in tenths of a point. Grade points have one
+    decimal, so sums of these are exact, whatever order they are added in.
+    """
+    return round(round(score / 20, 1) * 10) * credit
+
+
+def gpa_from_totals(total_credits: int, total_quality_tenths: int) -> float:
+    return round(total_quality_tenths / 10 / total_credits, 1) if total_credits > 0 else 0.0
+
+
 @dataclass(frozen=True)
-class Grade:
+class Grade(FrozenSlots):
+    __slots__ = ('course', 'score')
     course: Course
     score: float
 
@@ -89,7 +107,7 @@ class Grade:
 
 
 @dataclass
-class Student:
+class Student(Trusted):
     student_id: int
     name: str
     sex: cst.Sex
@@ -112,16 +130,17 @@ class Student:
 
     @property
     def gpa(self) -> float:
-        if not self.grades:
-            return 0.0
-        total_quality_points = total_credits = 0.0
+        # Summed in exact tenths: a float sum of quality points depends on the order of the
+        # grades and can tip a GPA that ends in 5 either way when it is rounded.
+        total_quality_tenths = total_credits = 0
         for grade in self.grades:
-            total_quality_points += grade.quality_point
+            total_quality_tenths += quality_tenths(grade.score, grade.course.credit)
             total_credits += grade.course.credit
-        return round(total_quality_points / total_credits, 1) if total_credits > 0 else 0.0
+        return gpa_from_totals(total_credits, total_quality_tenths)
 
     def __post_init__(self):
-        if self.enroll_year > dt.date.today().year:
+        this_year = dt.date.today().year
+        if self.enroll_year > this_year:
             raise ValueError("Enroll year cannot be in the future.")
-        if not (1900 <= self.birthdate.year <= dt.date.today().year):
-            raise ValueError(f"Birth year {self.birthdate.year} must be between 1900 and {dt.date.today().year}.")
+        if not (1900 <= self.birthdate.year <= this_year):
+            raise ValueError(f"Birth year {self.birthdate.year} must be between 1900 and {this_year}.")
@@ -0,0 +1,150 @@
+from __future__ import annotations
+from array import array
+import datetime as dt
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional
+
+from . import constants as cst
+from .contact import Email, Phone
+from .models import Address, Course, FamilyMember, Grade, Student
+
+
+class _Interned:
+    """Stores each distinct value once and refers to it by position."""
+
+    def __init__(self):
+        self.values: List[Hashable] = []
+        self._index: Dict[Hashable, int] = {}
+
+    def index(self, value: Hashable) -> int:
+        i = self._index.get(value)
+        if i is None:
+            i = self._index[value] = len(self.values)
+            self.values.append(value)
+        return i
+
+
+class StudentTable:
+    """
+    Struct-of-arrays roster: every Student field is kept in a column, numeric
+    and enum fields in compact `array` columns, repeated values (majors,
+    provinces, cities, courses) interned once. `Student` objects are only
+    materialized, unchecked, when a row is read, so large rosters cost a few
+    dozen bytes per student plus the shared strings and courses.
+    """
+
+    def __init__(self, students: Iterable[Student] = ()):
+        self.student_id = array('q')
+        self.name: List[str] = []
+        self.sex = array('b')
+        self.birthdate = array('l')
+        self.enroll_year = array('h')
+        self.major = array('l')
+        self.class_id = array('l')
+        self.phone: List[str] = []
+        self.email: List[str] = []
+        self.province = array('b')
+        self.city = array('l')
+        self.status = array('b')
+        # Family members of row i are member_*[member_start[i]:member_start[i + 1]].
+        self.member_start = array('q', [0])
+        self.member_name: List[str] = []
+        self.member_relationship = array('l')
+        self.member_phone: List[str] = []
+        # Grades of row i are grade_course/grade_score[grade_start[i]:grade_start[i + 1]].
+        self.grade_start = array('q', [0])
+        self.grade_course = array('l')
+        self.grade_score = array('d')
+        self._majors = _Interned()
+        self._provinces = _Interned()
+        self._cities = _Interned()
+        self._courses = _Interned()
+        self._relationships = _Interned()
+        self._rows: Dict[int, int] = {}
+        self.extend(students)
+
+    def __len__(self) -> int:
+        return len(self.student_id)
+
+    def __contains__(self, student_id: int) -> bool:
+        return student_id in self._rows
+
+    def append(self, student: Student):
+        if student.student_id in self._rows:
+            raise ValueError(f"Student {student.student_id} is already in the table.")
+        self._rows[student.student_id] = len(self.student_id)
+        self.student_id.append(student.student_id)
+        self.name.append(student.name)
+        self.sex.append(student.sex.value)
+        self.birthdate.append(student.birthdate.toordinal())
+        self.enroll_year.append(student.enroll_year)
+        self.major.append(self._majors.index(tuple(student.major)))
+        self.class_id.append(student.class_id)
+        self.phone.append(student.phone.value)
+        self.email.append(student.email.value)
+        self.province.append(self._provinces.index(student.address.province))
+        self.city.append(self._cities.index(student.address.city))
+        self.status.append(student.status.value)
+        for member in student.family_members:
+            self.member_name.append(member.name)
+            self.member_relationship.append(self._relationships.index(member.relationship))
+            self.member_phone.append(member.phone.value)
+        self.member_start.append(len(self.member_name))
+        for grade in student.grades:
+            self.grade_course.append(self._courses.index(grade.course))
+            self.grade_score.append(grade.score)
+        self.grade_start.append(len(self.grade_score))
+
+    def extend(self, students: Iterable[Student]):
+        for student in students:
+            self.append(student)
+
+    def row_of(self, student_id: int) -> Optional[int]:
+        return self._rows.get(student_id)
+
+    def grades_of(self, row: int) -> List[Grade]:
+        courses = self._courses.values
+        start, end = self.grade_start[row], self.grade_start[row + 1]
+        return [Grade.trusted(course=courses[c], score=s)
+                for c, s in zip(self.grade_course[start:end], self.grade_score[start:end])]
+
+    def family_members_of(self, row: int) -> List[FamilyMember]:
+        relationships = self._relationships.values
+        return [FamilyMember.trusted(name=self.member_name[i],
+                                     relationship=relationships[self.member_relationship[i]],
+                                     phone=Phone.trusted(value=self.member_phone[i]))
+                for i in range(self.member_start[row], self.member_start[row + 1])]
+
+    def __getitem__(self, row: int) -> Student:
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError('StudentTable index out of range')
+        return Student.trusted(
+            student_id=self.student_id[row],
+            name=self.name[row],
+            sex=cst.Sex(self.sex[row]),
+            birthdate=dt.date.fromordinal(self.birthdate[row]),
+            enroll_year=self.enroll_year[row],
+            major=self._majors.values[self.major[row]],
+            class_id=self.class_id[row],
+            phone=Phone.trusted(value=self.phone[row]),
+            email=Email.trusted(value=self.email[row]),
+            address=Address.trusted(province=self._provinces.values[self.province[row]],
+                                    city=self._cities.values[self.city[row]]),
+            family_members=self.family_members_of(row),
+            status=cst.Status(self.status[row]),
+            grades=self.grades_of(row),
+        )
+
+    def get(self, student_id: int) -> Optional[Student]:
+        row = self._rows.get(student_id)
+        return None if row is None else self[row]
+
+    def __iter__(self) -> Iterator[Student]:
+        for row in range(len(self)):
+            yield self[row]
+
+    @property
+    def courses(self) -> List[Course]:
+        """Distinct courses referenced by the grades, in first-seen order."""
+        return list(self._courses.values)
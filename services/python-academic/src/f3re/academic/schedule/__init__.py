@@ -0,0 +1,30 @@
+# ruff: noqa: F401
+"""
+Scheduling utilities built on the course time slots.
+"""
+
+from .conflicts import (
+    ScheduleIndex,
+    slots_conflict,
+)
+from .ical import (
+    course_events,
+    iter_calendar,
+    write_student_calendars,
+)
+from .timetable import (
+    Occurrence,
+    Semester,
+    TimetableCache,
+)
+
+__all__ = [
+    "ScheduleIndex",
+    "slots_conflict",
+    "course_events",
+    "iter_calendar",
+    "write_student_calendars",
+    "Occurrence",
+    "Semester",
+    "TimetableCache",
+]
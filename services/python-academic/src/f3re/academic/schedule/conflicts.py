@@ -0,0 +1,189 @@
+from __future__ import annotations
+from bisect import bisect_left, bisect_right
+from collections import Counter
+import datetime as dt
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from ..model.constants import DayOfWeek, Repetition
+from ..model.models import Course, TimeSlot
+
+# Week parities a slot occupies: weekly slots take both, biweekly slots one.
+_PARITIES = {
+    Repetition.WEEKLY: (Repetition.BIWEEKLY_ODD, Repetition.BIWEEKLY_EVEN),
+    Repetition.BIWEEKLY_ODD: (Repetition.BIWEEKLY_ODD,),
+    Repetition.BIWEEKLY_EVEN: (Repetition.BIWEEKLY_EVEN,),
+}
+
+
+def _seconds(t: dt.time) -> int:
+    return t.hour * 3600 + t.minute * 60 + t.second
+
+
+def slots_conflict(a: TimeSlot, b: TimeSlot) -> bool:
+    """Whether two slots overlap on the same day in at least one week; touching slots do not."""
+    return (a.day == b.day
+            and a.start_time < b.end_time and b.start_time < a.end_time
+            and not set(_PARITIES[a.repetition]).isdisjoint(_PARITIES[b.repetition]))
+
+
+class _SlotIndex:
+    """Intervals kept sorted by start time, one list per (day, week parity)."""
+
+    def __init__(self):
+        self._entries: Dict[Tuple[DayOfWeek, Repetition], List[Tuple[int, int, int]]] = {}
+        self._starts: Dict[Tuple[DayOfWeek, Repetition], List[int]] = {}
+        # Interval lengths currently indexed, so the longest one can shrink again on removal.
+        self._lengths: Counter = Counter()
+        self._max_length = 0
+        self.members: Set[int] = set()
+
+    def __bool__(self) -> bool:
+        return bool(self.members)
+
+    def add(self, course_id: int, slot: TimeSlot):
+        start, end = _seconds(slot.start_time), _seconds(slot.end_time)
+        self._lengths[end - start] += 1
+        self._max_length = max(self._max_length, end - start)
+        self.members.add(course_id)
+        for parity in _PARITIES[slot.repetition]:
+            entries = self._entries.setdefault((slot.day, parity), [])
+            entry = (start, end, course_id)
+            i = bisect_left(entries, entry)
+            entries.insert(i, entry)
+            self._starts.setdefault((slot.day, parity), []).insert(i, start)
+
+    def remove(self, course_id: int, slot: TimeSlot):
+        self.members.discard(course_id)
+        start, end = _seconds(slot.start_time), _seconds(slot.end_time)
+        entry = (start, end, course_id)
+        removed = False
+        for parity in _PARITIES[slot.repetition]:
+            entries = self._entries.get((slot.day, parity), [])
+            i = bisect_left(entries, entry)
+            if i < len(entries) and entries[i] == entry:
+                del entries[i]
+                del self._starts[(slot.day, parity)][i]
+                removed = True
+        if removed:
+            self._lengths[end - start] -= 1
+            if not self._lengths[end - start]:
+                del self._lengths[end - start]
+                # A narrower window keeps later queries from scanning past the removed long interval.
+                if end - start == self._max_length:
+                    self._max_length = max(self._lengths, default=0)
+
+    def overlapping(self, slot: TimeSlot) -> Set[int]:
+        """Ids of the courses with an interval overlapping `slot`."""
+        start, end = _seconds(slot.start_time), _seconds(slot.end_time)
+        found = set()
+        for parity in _PARITIES[slot.repetition]:
+            key = (slot.day, parity)
+            starts = self._starts.get(key)
+            if not starts:
+                continue
+            entries = self._entries[key]
+            # An interval can only reach `start` if it begins less than the longest interval before it.
+            lo = bisect_right(starts, start - self._max_length)
+            hi = bisect_left(starts, end)
+            found.update(course_id for _, e_end, course_id in entries[lo:hi] if e_end > start)
+        return found
+
+
+class ScheduleIndex:
+    """
+    Conflict index over course time slots, respecting biweekly parity.
+
+    Slots are indexed for all courses and separately per class, per teacher and
+    per location, so each query only scans the intervals that can overlap.
+    """
+
+    def __init__(self, courses: Iterable[Course] = ()):
+        self._courses: Dict[int, Course] = {}
+        self._all = _SlotIndex()
+        self._by_class: Dict[int, _SlotIndex] = {}
+        self._by_teacher: Dict[int, _SlotIndex] = {}
+        self._by_room: Dict[str, _SlotIndex] = {}
+        for course in courses:
+            self.add(course)
+
+    def __len__(self) -> int:
+        return len(self._courses)
+
+    def __contains__(self, course_id: int) -> bool:
+        return course_id in self._courses
+
+    def get(self, course_id: int) -> Optional[Course]:
+        return self._courses.get(course_id)
+
+    def _indexes(self, course: Course) -> List[_SlotIndex]:
+        indexes = [self._all,
+                   self._by_teacher.setdefault(course.teacher.teacher_id, _SlotIndex()),
+                   self._by_room.setdefault(course.location, _SlotIndex())]
+        indexes.extend(self._by_class.setdefault(class_id, _SlotIndex()) for class_id in course.class_id)
+        return indexes
+
+    def add(self, course: Course):
+        """Index a course, replacing any course with the same id."""
+        if course.course_id in self._courses:
+            self.remove(course.course_id)
+        self._courses[course.course_id] = course
+        for index in self._indexes(course):
+            for slot in course.time_slots:
+                index.add(course.course_id, slot)
+
+    def remove(self, course_id: int) -> Optional[Course]:
+        course = self._courses.pop(course_id, None)
+        if course is not None:
+            for index in self._indexes(course):
+                for slot in course.time_slots:
+                    index.remove(course_id, slot)
+        return course
+
+    @staticmethod
+    def _overlapping(index: Optional[_SlotIndex], slots: Iterable[TimeSlot], exclude: Optional[int]) -> Set[int]:
+        found = set()
+        if index:
+            for slot in slots:
+                found |= index.overlapping(slot)
+        found.discard(exclude)
+        return found
+
+    def conflicts_with(self, course: Course, among: Optional[Iterable[int]] = None) -> Set[int]:
+        """
+        Ids of indexed courses whose slots overlap `course`.
+        Args:
+            course: The course to check; it does not need to be indexed.
+            among: Restrict the answer to these course ids, e.g. a student's enrollments.
+        """
+        found = self._overlapping(self._all, course.time_slots, course.course_id)
+        return found if among is None else found.intersection(among)
+
+    def is_room_free(self, location: str, slot: TimeSlot, exclude: Optional[int] = None) -> bool:
+        """Whether no indexed course other than `exclude` uses `location` during `slot`."""
+        return not self._overlapping(self._by_room.get(location), (slot,), exclude)
+
+    def is_teacher_free(self, teacher_id: int, slot: TimeSlot, exclude: Optional[int] = None) -> bool:
+        return not self._overlapping(self._by_teacher.get(teacher_id), (slot,), exclude)
+
+    def is_class_free(self, class_id: int, slot: TimeSlot, exclude: Optional[int] = None) -> bool:
+        return not self._overlapping(self._by_class.get(class_id), (slot,), exclude)
+
+    def _double_booked(self, indexes: Dict[Hashable, _SlotIndex]) -> List[Tuple[Hashable, int, int]]:
+        pairs = []
+        for key, index in indexes.items():
+            for course_id in sorted(index.members):
+                overlapping = self._overlapping(index, self._courses[course_id].time_slots, course_id)
+                pairs.extend((key, course_id, other) for other in sorted(overlapping) if other > course_id)
+        return pairs
+
+    def double_booked_classes(self) -> List[Tuple[int, int, int]]:
+        """(class_id, course_id, other_course_id) for every pair of a class's courses that overlap."""
+        return self._double_booked(self._by_class)
+
+    def double_booked_teachers(self) -> List[Tuple[int, int, int]]:
+        """(teacher_id, course_id, other_course_id) for every pair of a teacher's courses that overlap."""
+        return self._double_booked(self._by_teacher)
+
+    def double_booked_rooms(self) -> List[Tuple[str, int, int]]:
+        """(location, course_id, other_course_id) for every pair of courses sharing a room at the same time."""
+        return self._double_booked(self._by_room)
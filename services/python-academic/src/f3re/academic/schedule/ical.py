@@ -0,0 +1,105 @@
+"""
+iCalendar (RFC 5545) export of course timetables.
+
+Each time slot of a course becomes one recurring event (a weekly or
+biweekly RRULE over the semester), so a calendar stays a few kilobytes
+however long the semester is, and is produced line by line.
+"""
+import datetime as dt
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, Optional
+import zipfile
+
+from ..model.constants import Repetition
+from ..model.models import Course, Student
+from .timetable import Semester, TimetableCache
+
+_CRLF = '\r\n'
+
+
+def _escape(text: str) -> str:
+    return (text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def _fold(line: str) -> str:
+    """Fold a content line into chunks of at most 75 octets, as RFC 5545 requires."""
+    data = line.encode('utf-8')
+    if len(data) <= 75:
+        return line + _CRLF
+    parts, start, limit = [], 0, 75
+    while start < len(data):
+        end = min(start + limit, len(data))
+        # Do not split a UTF-8 sequence: continuation bytes are 0b10xxxxxx.
+        while end < len(data) and data[end] & 0xC0 == 0x80:
+            end -= 1
+        parts.append(data[start:end].decode('utf-8'))
+        start, limit = end, 74  # Continuation lines start with a space.
+    return (_CRLF + ' ').join(parts) + _CRLF
+
+
+def _datetime(value: dt.datetime) -> str:
+    return value.strftime('%Y%m%dT%H%M%S')
+
+
+def course_events(courses: Iterable[Course], semester: Semester, stamp: Optional[dt.datetime] = None) -> Iterator[str]:
+    """
+    Yield one VEVENT block per time slot of `courses`, repeating over `semester`.
+    Times are floating local times; `stamp` (UTC, default now) is the DTSTAMP.
+    """
+    stamp = _datetime(stamp or dt.datetime.now(dt.timezone.utc)) + 'Z'
+    for course in courses:
+        for slot_no, slot in enumerate(course.time_slots):
+            first, count = semester.occurrences_of(slot)
+            if not count:
+                continue
+            occurrence = semester.occurrence(course, slot, first)
+            lines = [
+                'BEGIN:VEVENT',
+                f'UID:course-{course.course_id}-slot-{slot_no}@f3re',
+                f'DTSTAMP:{stamp}',
+                f'DTSTART:{_datetime(occurrence.start)}',
+                f'DTEND:{_datetime(occurrence.end)}',
+            ]
+            if count > 1:
+                interval = '' if slot.repetition is Repetition.WEEKLY else ';INTERVAL=2'
+                lines.append(f'RRULE:FREQ=WEEKLY{interval};COUNT={count}')
+            lines += [
+                f'SUMMARY:{_escape(course.name)}',
+                f'LOCATION:{_escape(course.location)}',
+                f'DESCRIPTION:{_escape(f"{course.teacher.name}, {course.credit} credits")}',
+                'END:VEVENT',
+            ]
+            yield ''.join(map(_fold, lines))
+
+
+def iter_calendar(events: Iterable[str], name: str) -> Iterator[str]:
+    """Wrap VEVENT blocks in a VCALENDAR, yielding it piece by piece (e.g. for a streaming response)."""
+    yield ''.join(map(_fold, ['BEGIN:VCALENDAR', 'VERSION:2.0', 'PRODID:-//F3re//Academic Timetable//EN',
+                              'CALSCALE:GREGORIAN', f'X-WR-CALNAME:{_escape(name)}']))
+    yield from events
+    yield 'END:VCALENDAR' + _CRLF
+
+
+def write_student_calendars(students: Iterable[Student], timetables: TimetableCache,
+                            load_class: Callable[[int], Iterable[Course]], out: BinaryIO) -> int:
+    """
+    Write a ``<student_id>.ics`` calendar per student into a zip archive on `out`.
+
+    `students` is consumed lazily (e.g. `StudentStore.query`) and `out` may be
+    unseekable, so the archive is streamed. A student's calendar is their
+    class's timetable; the events are rendered once per class.
+    Returns:
+        int: The number of calendars written.
+    """
+    rendered: Dict[int, str] = {}
+    count = 0
+    with zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for student in students:
+            events = rendered.get(student.class_id)
+            if events is None:
+                courses = timetables.class_courses(student.class_id, lambda: load_class(student.class_id))
+                events = rendered[student.class_id] = ''.join(course_events(courses, timetables.semester))
+            archive.writestr(f'{student.student_id}.ics',
+                             ''.join(iter_calendar((events,), f'{student.name} ({student.student_id})')))
+            count += 1
+    return count
@@ -0,0 +1,243 @@
+from __future__ import annotations
+from collections import OrderedDict
+from dataclasses import dataclass
+import datetime as dt
+import threading
+from typing import Callable, Dict, Hashable, Iterable, Iterator, NamedTuple, Optional, Set, Tuple
+
+from ..model.constants import Repetition
+from ..model.models import Course, TimeSlot
+
+CourseLoader = Callable[[], Iterable[Course]]
+
+
+class Occurrence(NamedTuple):
+    """One dated meeting of a course."""
+    start: dt.datetime
+    end: dt.datetime
+    week: int
+    course: Course
+    slot: TimeSlot
+
+    @property
+    def date(self) -> dt.date:
+        return self.start.date()
+
+
+def _sort_key(occurrence: Occurrence):
+    return occurrence.start, occurrence.course.course_id
+
+
+@dataclass(frozen=True)
+class Semester:
+    """
+    Teaching weeks starting on the week of `start`. Week 1 is odd, so
+    BIWEEKLY_ODD slots meet in weeks 1, 3, ... and BIWEEKLY_EVEN ones in 2, 4, ...
+    Days of week 1 before `start` have no classes.
+    """
+    start: dt.date
+    weeks: int = 18
+
+    def __post_init__(self):
+        if self.weeks < 1:
+            raise ValueError('A semester has at least one week.')
+
+    @property
+    def first_monday(self) -> dt.date:
+        return self.start - dt.timedelta(days=self.start.weekday())
+
+    @property
+    def end(self) -> dt.date:
+        """Last day of the semester (the Sunday of the last week)."""
+        return self.first_monday + dt.timedelta(weeks=self.weeks, days=-1)
+
+    def week_of(self, date: dt.date) -> Optional[int]:
+        """Teaching week of a date, or None outside the semester."""
+        if not self.start <= date <= self.end:
+            return None
+        return (date - self.first_monday).days // 7 + 1
+
+    def _check_week(self, week: int):
+        if not 1 <= week <= self.weeks:
+            raise ValueError(f"Week must be between 1 and {self.weeks}.")
+
+    @staticmethod
+    def meets_in(slot: TimeSlot, week: int) -> bool:
+        """Whether a slot meets in a week, by its repetition."""
+        if slot.repetition is Repetition.WEEKLY:
+            return True
+        return (slot.repetition is Repetition.BIWEEKLY_ODD) == (week % 2 == 1)
+
+    def occurrence(self, course: Course, slot: TimeSlot, week: int) -> Optional[Occurrence]:
+        """The meeting of `slot` in `week`, or None if it does not meet that week."""
+        if not self.meets_in(slot, week):
+            return None
+        date = self.first_monday + dt.timedelta(weeks=week - 1, days=slot.day.value - 1)
+        if date < self.start:
+            return None
+        return Occurrence(dt.datetime.combine(date, slot.start_time), dt.datetime.combine(date, slot.end_time),
+                          week, course, slot)
+
+    def week(self, courses: Iterable[Course], week: int) -> Tuple[Occurrence, ...]:
+        """Every meeting of `courses` in one week, in chronological order."""
+        self._check_week(week)
+        found = []
+        for course in courses:
+            for slot in course.time_slots:
+                occurrence = self.occurrence(course, slot, week)
+                if occurrence is not None:
+                    found.append(occurrence)
+        found.sort(key=_sort_key)
+        return tuple(found)
+
+    def expand(self, courses: Iterable[Course], weeks: Optional[Iterable[int]] = None) -> Iterator[Occurrence]:
+        """
+        Lazily yield the meetings of `courses` week by week (every week by
+        default), in chronological order; only one week is expanded at a time.
+        """
+        courses = tuple(courses)
+        for week in range(1, self.weeks + 1) if weeks is None else weeks:
+            yield from self.week(courses, week)
+
+    def occurrences_of(self, slot: TimeSlot) -> Tuple[Optional[int], int]:
+        """(first week the slot meets in, number of meetings) over the semester."""
+        first, count = None, 0
+        for week in range(1, self.weeks + 1):
+            if self.meets_in(slot, week):
+                date = self.first_monday + dt.timedelta(weeks=week - 1, days=slot.day.value - 1)
+                if date >= self.start:
+                    first = week if first is None else first
+                    count += 1
+        return first, count
+
+
+class TimetableCache:
+    """
+    Weekly timetables of classes and teachers for one semester, expanded on
+    demand and kept in an LRU cache, thread-safe and shared across stores.
+
+    The courses of a class or teacher come from the `load` callable passed
+    with each lookup (e.g. `StudentStore.find_courses_by_class`) and are cached
+    with the timetables. `invalidate_course` must be called when a course is
+    saved or deleted; it drops everything built from the old or new version.
+    A student's timetable is their class's, so it is shared by the class.
+    """
+
+    def __init__(self, semester: Semester, maxsize: int = 4096):
+        if maxsize < 1:
+            raise ValueError('Maxsize must be positive.')
+        self.semester = semester
+        self.maxsize = maxsize
+        # (owner, week) -> timetable, owner being ('class', id) or ('teacher', id); week None holds the courses.
+        self._entries: 'OrderedDict[Tuple[Hashable, Optional[int]], tuple]' = OrderedDict()
+        self._keys: Dict[Hashable, Set[Optional[int]]] = {}
+        self._owners: Dict[int, Set[Hashable]] = {}
+        self._lock = threading.Lock()
+        # Bumped by every invalidation, so a timetable built from courses loaded before it is not cached.
+        self._generation = 0
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _get(self, key) -> Tuple[Optional[tuple], int]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return value, self._generation
+
+    def _put(self, key, value: tuple, generation: int):
+        with self._lock:
+            if generation != self._generation:
+                return
+            owner, week = key
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._keys.setdefault(owner, set()).add(week)
+            if week is None:
+                for course in value:
+                    self._owners.setdefault(course.course_id, set()).add(owner)
+            while len(self._entries) > self.maxsize:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _drop(self, key):
+        owner, week = key
+        if week is None:
+            # The weeks of an owner are only valid with its courses.
+            self._drop_owner(owner)
+        else:
+            self._entries.pop(key, None)
+            self._keys.get(owner, set()).discard(week)
+
+    def _drop_owner(self, owner: Hashable) -> bool:
+        weeks = self._keys.pop(owner, ())
+        for week in weeks:
+            self._entries.pop((owner, week), None)
+        return bool(weeks)
+
+    def _courses(self, owner: Hashable, load: CourseLoader) -> Tuple[Course, ...]:
+        courses, generation = self._get((owner, None))
+        if courses is None:
+            courses = tuple(load())
+            self._put((owner, None), courses, generation)
+        return courses
+
+    def _week(self, owner: Hashable, week: int, load: CourseLoader) -> Tuple[Occurrence, ...]:
+        timetable, generation = self._get((owner, week))
+        if timetable is None:
+            timetable = self.semester.week(self._courses(owner, load), week)
+            self._put((owner, week), timetable, generation)
+        return timetable
+
+    def class_courses(self, class_id: int, load: CourseLoader) -> Tuple[Course, ...]:
+        return self._courses(('class', class_id), load)
+
+    def teacher_courses(self, teacher_id: int, load: CourseLoader) -> Tuple[Course, ...]:
+        return self._courses(('teacher', teacher_id), load)
+
+    def class_week(self, class_id: int, week: int, load: CourseLoader) -> Tuple[Occurrence, ...]:
+        """What class `class_id` has in `week`; `load` returns the class's courses on a miss."""
+        return self._week(('class', class_id), week, load)
+
+    def teacher_week(self, teacher_id: int, week: int, load: CourseLoader) -> Tuple[Occurrence, ...]:
+        return self._week(('teacher', teacher_id), week, load)
+
+    def invalidate_course(self, course_id: int, course: Optional[Course] = None):
+        """
+        Drop the timetables that include course `course_id`, and, if the saved
+        `course` is given, those of the classes and teacher it now belongs to.
+        """
+        with self._lock:
+            owners = self._owners.pop(course_id, set())
+            if course is not None:
+                owners.update(('class', class_id) for class_id in course.class_id)
+                owners.add(('teacher', course.teacher.teacher_id))
+            self._generation += 1
+            for owner in owners:
+                if self._drop_owner(owner):
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._keys.clear()
+            self._owners.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
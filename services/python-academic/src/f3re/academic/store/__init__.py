@@ -1,25 +1,102 @@
-from .json_mapper import (
-    EnhancedJSONDecoder,
-    student_from_json,
-    EnhancedJSONEncoder,
-    student_to_json,
-)
-from .db_mapper import (
-    StudentStore,
-    STUDENT_DB,
-    MAJOR_TABLE,
-    COURSE_TABLE,
-)
-from .utils import CLASS_REGISTRY
+from .._lazy import lazy_attributes
+
+# Each name is imported from its module on first access (PEP 562).
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    ".json_mapper": (
+        "EnhancedJSONDecoder",
+        "student_from_json",
+        "EnhancedJSONEncoder",
+        "student_to_json",
+        "GraphJSONDecoder",
+        "GraphJSONEncoder",
+        "students_from_graph_json",
+        "students_to_graph_json",
+        "iter_students_from_ndjson",
+        "write_students_ndjson",
+    ),
+    ".aggregates": ("GradeSummary",),
+    ".codec": ("Codec", "get_codec"),
+    ".connection": (
+        "ConnectionManager",
+        "SQLiteProfile",
+        "DEFAULT_PROFILE",
+        "ROLLBACK_PROFILE",
+    ),
+    ".db_mapper": (
+        "StudentStore",
+        "STUDENT_DB",
+        "MAJOR_TABLE",
+        "COURSE_TABLE",
+    ),
+    ".cache": (
+        "CachedStudentRepository",
+        "CachedStudentStore",
+        "StudentCache",
+    ),
+    ".query": ("StudentFilter", "StudentPage"),
+    ".registration": (
+        "Registrar",
+        "Registration",
+        "RegistrationStatus",
+        "Seats",
+    ),
+    ".reference": (
+        "CourseInfo",
+        "ReferenceData",
+        "get_reference_data",
+    ),
+    ".parallel": (
+        "iter_student_tables_parallel",
+        "iter_students_parallel",
+    ),
+    ".serializer": (
+        "BinarySerializer",
+        "JSONSerializer",
+        "Serializer",
+        "get_serializer",
+    ),
+    ".utils": ("CLASS_REGISTRY",),
+})
 
 __all__ = [
     "EnhancedJSONDecoder",
     "student_from_json",
     "EnhancedJSONEncoder",
     "student_to_json",
+    "GraphJSONDecoder",
+    "GraphJSONEncoder",
+    "students_from_graph_json",
+    "students_to_graph_json",
+    "iter_students_from_ndjson",
+    "write_students_ndjson",
+    "GradeSummary",
+    "Codec",
+    "get_codec",
+    "ConnectionManager",
+    "SQLiteProfile",
+    "DEFAULT_PROFILE",
+    "ROLLBACK_PROFILE",
     "StudentStore",
     "STUDENT_DB",
     "MAJOR_TABLE",
     "COURSE_TABLE",
+    "CachedStudentRepository",
+    "CachedStudentStore",
+    "StudentCache",
+    "StudentFilter",
+    "StudentPage",
+    "Registrar",
+    "Registration",
+    "RegistrationStatus",
+    "Seats",
+    "CourseInfo",
+    "ReferenceData",
+    "get_reference_data",
+    "iter_student_tables_parallel",
+    "iter_students_parallel",
+    "BinarySerializer",
+    "JSONSerializer",
+    "Serializer",
+    "get_serializer",
     "CLASS_REGISTRY",
 ]
@@ -0,0 +1,137 @@
+"""
+Materialized GPA aggregates of the students in a `StudentStore` database.
+
+Students_Academic keeps each student's total credits, quality points and
+GPA. The store adjusts them on every grade or credit change; this module
+holds those adjustments and a consistency check that recomputes everything
+from the Grades table:
+
+    python -m f3re.academic.store.aggregates academic.sqlite --repair
+"""
+import argparse
+import sqlite3
+import sys
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from ..model.models import gpa_from_totals, quality_tenths
+
+# Aggregate columns of Students_Academic, added to databases created before them.
+COLUMNS = (
+    ('Total_Credits', 'integer not null default 0'),
+    ('Quality_Tenths', 'integer not null default 0'),
+    ('GPA', 'real not null default 0'),
+)
+INDEXES = '''
+    create index if not exists Idx_Students_Academic_GPA on Students_Academic (GPA desc);
+    create index if not exists Idx_Students_Academic_Class_GPA on Students_Academic (Class_Id, GPA desc);
+    create index if not exists Idx_Students_Academic_Major_GPA on Students_Academic (Major_Id, GPA desc);
+'''
+
+# (credits, quality points in tenths) of a student, or a change to them. Kept in tenths,
+# totals are exact and never drift from a recomputation however often they are adjusted.
+_Totals = Tuple[int, int]
+
+
+class GradeSummary(NamedTuple):
+    student_id: int
+    total_credits: int
+    quality_points: float
+    gpa: float
+
+
+def summary(row: tuple) -> GradeSummary:
+    """GradeSummary of a (Student_Id, Total_Credits, Quality_Tenths, GPA) row."""
+    student_id, credits, tenths, gpa = row
+    return GradeSummary(student_id, credits, tenths / 10, gpa)
+
+
+def add_columns(conn: sqlite3.Connection) -> bool:
+    """Add missing aggregate columns; returns True if any were added, after which `recompute` must run."""
+    existing = {row[1] for row in conn.execute('pragma table_info(Students_Academic)')}
+    missing = [(name, decl) for name, decl in COLUMNS if name not in existing]
+    for name, decl in missing:
+        conn.execute(f'alter table Students_Academic add column {name} {decl}')
+    return bool(missing)
+
+
+def set_totals(c: sqlite3.Cursor, totals: Dict[int, _Totals]):
+    c.executemany('update Students_Academic set Total_Credits = ?, Quality_Tenths = ?, GPA = ? where Student_Id = ?',
+                  [(credits, tenths, gpa_from_totals(credits, tenths), student_id)
+                   for student_id, (credits, tenths) in totals.items()])
+
+
+def adjust(c: sqlite3.Cursor, deltas: Dict[int, _Totals]):
+    """Add (credits, quality tenths) deltas to the stored totals of each student."""
+    totals = {}
+    for student_id, (credits, tenths) in deltas.items():
+        row = c.execute('select Total_Credits, Quality_Tenths from Students_Academic where Student_Id = ?',
+                        (student_id,)).fetchone()
+        if row is not None:
+            totals[student_id] = (row[0] + credits, row[1] + tenths)
+    set_totals(c, totals)
+
+
+def credit_deltas(c: sqlite3.Cursor, changes: Dict[int, int]) -> Dict[int, _Totals]:
+    """Per-student deltas for changing the credit of each course in `changes` (course id -> new - old credit)."""
+    deltas: Dict[int, _Totals] = {}
+    for course_id, diff in changes.items():
+        for student_id, score in c.execute('select Student_Id, Score from Grades where Course_Id = ?', (course_id,)):
+            credits, tenths = deltas.get(student_id, (0, 0))
+            deltas[student_id] = (credits + diff, tenths + quality_tenths(score, diff))
+    return deltas
+
+
+def recompute(c: sqlite3.Cursor, student_ids: Optional[Iterable[int]] = None) -> Dict[int, _Totals]:
+    """Totals of the given students (every student if None) computed from their grades."""
+    if student_ids is None:
+        totals = {student_id: (0, 0) for (student_id,) in c.execute('select Student_Id from Students_Academic')}
+        rows = c.execute('select g.Student_Id, g.Score, c.Credit from Grades g '
+                         'join Courses c on c.Course_Id = g.Course_Id').fetchall()
+    else:
+        totals, rows = {}, []
+        for student_id in student_ids:
+            totals[student_id] = (0, 0)
+            rows += c.execute('select g.Student_Id, g.Score, c.Credit from Grades g '
+                              'join Courses c on c.Course_Id = g.Course_Id where g.Student_Id = ?', (student_id,))
+    for student_id, score, credit in rows:
+        credits, tenths = totals[student_id]
+        totals[student_id] = (credits + credit, tenths + quality_tenths(score, credit))
+    return totals
+
+
+def check(c: sqlite3.Cursor) -> List[Tuple[GradeSummary, GradeSummary]]:
+    """
+    Recompute every student's aggregates from scratch.
+    Returns:
+        list: (stored, expected) pairs of the students whose stored aggregates are wrong.
+    """
+    expected = recompute(c)
+    mismatches = []
+    for row in c.execute('select Student_Id, Total_Credits, Quality_Tenths, GPA from Students_Academic'):
+        credits, tenths = expected[row[0]]
+        right = (row[0], credits, tenths, gpa_from_totals(credits, tenths))
+        if row != right:
+            mismatches.append((summary(row), summary(right)))
+    return mismatches
+
+
+def main(argv: Optional[List[str]] = None):
+    from .db_mapper import StudentStore
+
+    parser = argparse.ArgumentParser(description='Check the stored GPA aggregates against the grades.')
+    parser.add_argument('db_path', help='StudentStore SQLite database')
+    parser.add_argument('--repair', action='store_true', help='Overwrite wrong aggregates')
+    args = parser.parse_args(argv)
+
+    with StudentStore(args.db_path) as store:
+        mismatches = store.check_aggregates(repair=args.repair)
+    for stored, expected in mismatches:
+        print(f"{stored.student_id}: stored {stored.total_credits} credits, {stored.quality_points:g} points, "
+              f"GPA {stored.gpa}; expected {expected.total_credits}, {expected.quality_points:g}, {expected.gpa}")
+    print(f"{len(mismatches)} students with wrong aggregates{' repaired' if args.repair else ''}", file=sys.stderr)
+    if mismatches and not args.repair:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
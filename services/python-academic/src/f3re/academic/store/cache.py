@@ -0,0 +1,222 @@
+from collections import OrderedDict
+import threading
+import time
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from ..model.models import Course, Grade, Student
+from .class_based_demo import StudentRepository
+from .db_mapper import StudentStore
+
+
+class StudentCache:
+    """
+    Size-bounded LRU cache with a per-entry time to live, shared across store
+    connections. Counters are cumulative and can be scraped through `stats`.
+
+    Cached students are returned as-is; callers must not mutate them.
+    """
+
+    def __init__(self, maxsize: int = 10_000, ttl: Optional[float] = 300.0,
+                 clock: Callable[[], float] = time.monotonic):
+        if maxsize < 1:
+            raise ValueError('Maxsize must be positive.')
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: 'OrderedDict[Hashable, Tuple[Student, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every invalidation, so a value loaded before one is not cached after it.
+        self._generation = 0
+        self.hits = self.misses = self.evictions = self.expirations = 0
+        self.loads = 0
+        self.load_seconds = 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Student]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at >= self._clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+    @property
+    def generation(self) -> int:
+        """Changes whenever entries are invalidated; pass the value read before a load to `put`."""
+        return self._generation
+
+    def put(self, key: Hashable, value: Student, generation: Optional[int] = None):
+        """Cache `value`, unless `generation` is given and an invalidation happened since it was read."""
+        expires_at = self._clock() + self.ttl if self.ttl is not None else float('inf')
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def load(self, key: Hashable, loader: Callable[[], Optional[Student]]) -> Optional[Student]:
+        """Return the cached value for `key`, calling `loader` on a miss. None results are not cached."""
+        generation = self._generation
+        value = self.get(key)
+        if value is None:
+            value = self._timed(loader)
+            if value is not None:
+                self.put(key, value, generation)
+        return value
+
+    def load_many(self, keys: Iterable[Hashable],
+                  loader: Callable[[list], Dict[Hashable, Student]]) -> Dict[Hashable, Student]:
+        """Like `load`, but fetches every missing key with one `loader` call."""
+        generation = self._generation
+        found, missing = {}, []
+        for key in dict.fromkeys(keys):
+            value = self.get(key)
+            if value is None:
+                missing.append(key)
+            else:
+                found[key] = value
+        if missing:
+            loaded = self._timed(lambda: loader(missing))
+            for key, value in loaded.items():
+                self.put(key, value, generation)
+            found.update(loaded)
+        return found
+
+    def _timed(self, loader):
+        start = time.perf_counter()
+        try:
+            return loader()
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.loads += 1
+                self.load_seconds += elapsed
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'loads': self.loads,
+                'load_seconds_total': self.load_seconds,
+            }
+
+
+class CachedStudentRepository(StudentRepository):
+    """StudentRepository with read-through caching of get_by_id/get_many."""
+
+    def __init__(self, db_path: str, cache: Optional[StudentCache] = None, **kwargs):
+        super().__init__(db_path, **kwargs)
+        self.cache = cache if cache is not None else StudentCache()
+
+    def add(self, student: Student):
+        try:
+            super().add(student)
+        finally:
+            self.cache.invalidate(student.student_id)
+
+    def add_many(self, students: Iterable[Student], chunk_size: int = 1000) -> int:
+        def invalidated():
+            for student in students:
+                self.cache.invalidate(student.student_id)
+                yield student
+        return super().add_many(invalidated(), chunk_size)
+
+    def get_by_id(self, student_id: int) -> Optional[Student]:
+        load = super().get_by_id
+        return self.cache.load(student_id, lambda: load(student_id))
+
+    def get_many(self, student_ids: Iterable[int], batch_size: int = 500) -> Dict[int, Student]:
+        load = super().get_many
+        return self.cache.load_many(student_ids, lambda ids: load(ids, batch_size))
+
+
+class CachedStudentStore(StudentStore):
+    """StudentStore with read-through caching of find_by_id/find_many."""
+
+    def __init__(self, db_path: str, cache: Optional[StudentCache] = None, **kwargs):
+        super().__init__(db_path, **kwargs)
+        self.cache = cache if cache is not None else StudentCache()
+
+    def create(self, stu: Student) -> List[Course]:
+        try:
+            return super().create(stu)
+        finally:
+            self.cache.invalidate(stu.student_id)
+
+    def update(self, stu: Student) -> List[Course]:
+        try:
+            return super().update(stu)
+        finally:
+            self.cache.invalidate(stu.student_id)
+
+    def delete(self, student_id: int) -> bool:
+        try:
+            return super().delete(student_id)
+        finally:
+            self.cache.invalidate(student_id)
+
+    def add_grade(self, student_id: int, grade: Grade) -> List[Course]:
+        try:
+            return super().add_grade(student_id, grade)
+        finally:
+            self.cache.invalidate(student_id)
+
+    def update_grade(self, student_id: int, grade: Grade) -> bool:
+        try:
+            return super().update_grade(student_id, grade)
+        finally:
+            self.cache.invalidate(student_id)
+
+    def remove_grade(self, student_id: int, course_id: int) -> bool:
+        try:
+            return super().remove_grade(student_id, course_id)
+        finally:
+            self.cache.invalidate(student_id)
+
+    def save_course(self, course: Course):
+        # Cached students hold the previous course object.
+        try:
+            super().save_course(course)
+        finally:
+            self.cache.clear()
+
+    def sync_reference_data(self, data) -> Tuple[int, int]:
+        try:
+            return super().sync_reference_data(data)
+        finally:
+            self.cache.clear()
+
+    def find_by_id(self, student_id: int) -> Optional[Student]:
+        load = super().find_by_id
+        return self.cache.load(student_id, lambda: load(student_id))
+
+    def find_many(self, student_ids: Iterable[int]) -> Dict[int, Student]:
+        load = super().find_many
+        return self.cache.load_many(student_ids, load)
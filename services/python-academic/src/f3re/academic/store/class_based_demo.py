@@ -1,40 +1,108 @@
+from contextlib import contextmanager
 import datetime as dt
-import json
 import os
 import sqlite3
-from typing import Optional
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Union
 
 from ..model import models, constants, contact
-from .json_mapper import EnhancedJSONEncoder, EnhancedJSONDecoder
+from .connection import DEFAULT_PROFILE, ConnectionManager, SQLiteProfile
+from .serializer import Serializer, get_serializer, load_value
 
 DB_FILE = 'student_demo_class.sqlite'
 
+_INSERT_STUDENT = '''
+    INSERT INTO students (
+        student_id, name, sex, birthdate, enroll_year, major, class_id,
+        phone, email, address, family_members, status, grades
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+def student_from_row(row: tuple) -> models.Student:
+    """Reconstruct a student from a row of the students table, in either serializer format."""
+    (
+        student_id, name, sex, birthdate, enroll_year, major_data, class_id,
+        phone_data, email_data, address_data, family_members_data, status, grades_data
+    ) = row
+
+    # Deserialize the nested fields and reconstruct the Student object.
+    # Rows were validated when they were added, so the objects are rebuilt unchecked.
+    return models.Student.trusted(
+        student_id=student_id,
+        name=name,
+        sex=constants.Sex[sex],
+        birthdate=dt.date.fromisoformat(birthdate),
+        enroll_year=enroll_year,
+        major=tuple(load_value(major_data)),
+        class_id=class_id,
+        phone=load_value(phone_data, trusted=True),
+        email=load_value(email_data, trusted=True),
+        address=load_value(address_data, trusted=True),
+        family_members=load_value(family_members_data, trusted=True),
+        status=constants.Status[status],
+        grades=load_value(grades_data, trusted=True),
+    )
+
 
 class StudentRepository:
     """
     A repository class for handling database operations for Student objects.
     This encapsulates the database connection and queries.
+
+    Nested fields are written with `serializer` ('json' text, the default, or
+    compact 'binary' blobs); rows in either format can be read back, so a
+    table can be switched over without migrating existing rows.
+
+    Connections come from a `ConnectionManager`: writes use its writer and
+    reads its reader pool. Pass `connections` to share one manager between
+    repositories; otherwise one is opened with `profile` on entering.
     """
 
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, serializer: Union[str, Serializer] = 'json',
+                 connections: Optional[ConnectionManager] = None, profile: SQLiteProfile = DEFAULT_PROFILE):
         self._db_path = db_path
-        self._conn: Optional[sqlite3.Connection] = None
+        self._profile = profile
+        self.connections = connections
+        self._owns_connections = False
+        self.serializer = get_serializer(serializer)
 
     def __enter__(self):
         """Enable usage with 'with' statements."""
-        self._conn = sqlite3.connect(self._db_path)
+        if self.connections is None:
+            self.connections = ConnectionManager(self._db_path, self._profile, readers=1)
+            self._owns_connections = True
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        """Enable usage with 'with' statements, ensuring connection is closed."""
-        if self._conn:
-            self._conn.close()
+        """Enable usage with 'with' statements, ensuring connections are closed."""
+        if self._owns_connections:
+            self.connections.close()
+            self.connections = None
+            self._owns_connections = False
+
+    @contextmanager
+    def _writer(self) -> Iterator[sqlite3.Connection]:
+        if self.connections is None:
+            raise ConnectionError("Database connection is not open.")
+        with self.connections.writer() as conn:
+            yield conn
+
+    @contextmanager
+    def _reader(self) -> Iterator[sqlite3.Connection]:
+        if self.connections is None:
+            raise ConnectionError("Database connection is not open.")
+        with self.connections.reader() as conn:
+            yield conn
 
     def create_tables(self):
         """Create database tables for students."""
-        if not self._conn:
-            raise ConnectionError("Database connection is not open.")
-        c = self._conn.cursor()
+        with self._writer() as conn:
+            self._create_tables(conn)
+
+    @staticmethod
+    def _create_tables(conn: sqlite3.Connection):
+        c = conn.cursor()
         c.execute('''
             CREATE TABLE IF NOT EXISTS students (
                 Student_id INTEGER PRIMARY KEY,
@@ -52,79 +120,80 @@ class StudentRepository:
                 grades TEXT NOT NULL
             )
         ''')
-        self._conn.commit()
+        conn.commit()
+
+    def _to_row(self, student: models.Student, dumps: Optional[Callable[[Any], Union[str, bytes]]] = None) -> tuple:
+        """Serialize a student into a row of the students table, with `dumps` or the serializer's."""
+        dumps = dumps or self.serializer.dumps
+        return (
+            student.student_id,
+            student.name,
+            student.sex.name,
+            student.birthdate.isoformat(),
+            student.enroll_year,
+            dumps(student.major),
+            student.class_id,
+            dumps(student.phone),
+            dumps(student.email),
+            dumps(student.address),
+            dumps(student.family_members),
+            student.status.name,
+            dumps(student.grades),
+        )
 
     def add(self, student: models.Student):
         """Adds a student object to the database."""
-        if not self._conn:
-            raise ConnectionError("Database connection is not open.")
-        c = self._conn.cursor()
-
-        # Serialize complex objects to JSON
-        major_json = json.dumps(student.major, cls=EnhancedJSONEncoder)
-        phone_json = json.dumps(student.phone, cls=EnhancedJSONEncoder)
-        email_json = json.dumps(student.email, cls=EnhancedJSONEncoder)
-        address_json = json.dumps(student.address, cls=EnhancedJSONEncoder)
-        family_members_json = json.dumps(student.family_members, cls=EnhancedJSONEncoder)
-        grades_json = json.dumps(student.grades, cls=EnhancedJSONEncoder)
-
-        c.execute(
-            '''
-            INSERT INTO students (
-                student_id, name, sex, birthdate, enroll_year, major, class_id,
-                phone, email, address, family_members, status, grades
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''',
-            (
-                student.student_id,
-                student.name,
-                student.sex.name,
-                student.birthdate.isoformat(),
-                student.enroll_year,
-                major_json,
-                student.class_id,
-                phone_json,
-                email_json,
-                address_json,
-                family_members_json,
-                student.status.name,
-                grades_json,
-            )
-        )
-        self._conn.commit()
+        row = self._to_row(student)
+        with self._writer() as conn, conn:
+            conn.execute(_INSERT_STUDENT, row)
+
+    def add_many(self, students: Iterable[models.Student], chunk_size: int = 1000) -> int:
+        """
+        Adds students in a single transaction, inserting `chunk_size` rows per executemany call.
+        The iterable is consumed lazily, so at most one chunk of rows is held in memory.
+        Nothing is written if any insert fails.
+        Returns:
+            int: The number of students inserted.
+        """
+        if chunk_size < 1:
+            raise ValueError("Chunk size must be positive.")
+        students = iter(students)
+        count = 0
+        with self._writer() as conn, conn:
+            c = conn.cursor()
+            while chunk := list(islice(students, chunk_size)):
+                # One batch encoder per chunk: courses shared by the chunk's grades are encoded once.
+                dumps = self.serializer.batch()
+                c.executemany(_INSERT_STUDENT, [self._to_row(student, dumps) for student in chunk])
+                count += len(chunk)
+        return count
 
     def get_by_id(self, student_id: int) -> Optional[models.Student]:
         """Retrieves a student from the database by student_id."""
-        if not self._conn:
-            raise ConnectionError("Database connection is not open.")
-        c = self._conn.cursor()
-        c.execute('SELECT * FROM students WHERE student_id = ?', (student_id,))
-        row = c.fetchone()
-
-        if row:
-            (
-                student_id, name, sex, birthdate, enroll_year, major_json, class_id,
-                phone_json, email_json, address_json, family_members_json, status, grades_json
-            ) = row
-
-            # Deserialize JSON fields and reconstruct the Student object
-            student_data = {
-                'student_id': student_id,
-                'name': name,
-                'sex': constants.Sex[sex],
-                'birthdate': dt.date.fromisoformat(birthdate),
-                'enroll_year': enroll_year,
-                'major': tuple(json.loads(major_json)),
-                'class_id': class_id,
-                'phone': json.loads(phone_json, cls=EnhancedJSONDecoder),
-                'email': json.loads(email_json, cls=EnhancedJSONDecoder),
-                'address': json.loads(address_json, cls=EnhancedJSONDecoder),
-                'family_members': json.loads(family_members_json, cls=EnhancedJSONDecoder),
-                'status': constants.Status[status],
-                'grades': json.loads(grades_json, cls=EnhancedJSONDecoder)
-            }
-            return models.Student(**student_data)
-        return None
+        with self._reader() as conn:
+            row = conn.execute('SELECT * FROM students WHERE student_id = ?', (student_id,)).fetchone()
+        return student_from_row(row) if row else None
+
+    def get_many(self, student_ids: Iterable[int], batch_size: int = 500) -> Dict[int, models.Student]:
+        """
+        Retrieves students by id, querying `batch_size` ids per SELECT ... IN (...).
+        Returns:
+            dict: Students keyed by student_id; ids that are not found are omitted.
+        """
+        # SQLite builds before 3.32 allow at most 999 bound parameters per statement.
+        if not 0 < batch_size <= 999:
+            raise ValueError("Batch size must be between 1 and 999.")
+        ids = iter(dict.fromkeys(student_ids))
+        students = {}
+        with self._reader() as conn:
+            c = conn.cursor()
+            while batch := list(islice(ids, batch_size)):
+                placeholders = ', '.join('?' * len(batch))
+                c.execute(f'SELECT * FROM students WHERE student_id IN ({placeholders})', batch)
+                for row in c.fetchall():
+                    student = student_from_row(row)
+                    students[student.student_id] = student
+        return students
 
 
 def main():
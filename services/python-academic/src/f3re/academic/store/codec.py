@@ -0,0 +1,155 @@
+from dataclasses import fields
+import datetime as dt
+from enum import Enum
+from typing import Any, Callable, Dict, NamedTuple, Optional, get_args, get_origin, get_type_hints
+
+from . import utils
+
+
+class Codec(NamedTuple):
+    """
+    Specialized functions converting one dataclass to and from JSON-ready dicts.
+    `decode_trusted` builds the object through `Trusted.trusted`, skipping validation.
+    """
+    encode: Callable[[Any], dict]
+    decode: Callable[[dict], Any]
+    decode_trusted: Callable[[dict], Any]
+
+
+_CODECS: Dict[str, Codec] = {}
+
+
+def _encode_enum(value: Enum) -> str:
+    return value.name.upper()
+
+
+def _encode_isoformat(value) -> str:
+    return value.isoformat()
+
+
+def _value_encoder(field_type) -> Optional[Callable[[Any], Any]]:
+    if isinstance(field_type, type):
+        if issubclass(field_type, Enum):
+            return _encode_enum
+        if issubclass(field_type, (dt.date, dt.time)):
+            return _encode_isoformat
+    if get_origin(field_type) in (frozenset, set):
+        return list
+    return None
+
+
+def _value_decoder(field_type) -> Optional[Callable[[Any], Any]]:
+    if isinstance(field_type, type):
+        if issubclass(field_type, Enum):
+            return field_type.__getitem__
+        if field_type is dt.datetime:
+            return dt.datetime.fromisoformat
+        if field_type is dt.date:
+            return dt.date.fromisoformat
+        if field_type is dt.time:
+            return dt.time.fromisoformat
+    origin = get_origin(field_type)
+    if origin in (frozenset, set, tuple):
+        return origin
+    return None
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _type_check(field_type) -> Optional[Callable[[Any], bool]]:
+    """A test that a decoded value has the declared type (nested objects already decoded), or None."""
+    if field_type is float:
+        return _is_number
+    if field_type is int:
+        return _is_int
+    if isinstance(field_type, type):
+        return lambda value: isinstance(value, field_type)
+    origin, args = get_origin(field_type), get_args(field_type)
+    if origin in (list, set, frozenset) or (origin is tuple and len(args) == 2 and args[1] is Ellipsis):
+        item = _type_check(args[0]) if args else None
+        return lambda value: isinstance(value, origin) and (item is None or all(map(item, value)))
+    if origin is tuple:
+        items = [_type_check(arg) for arg in args]
+        return lambda value: (isinstance(value, tuple) and len(value) == len(items)
+                               and all(check is None or check(v) for check, v in zip(items, value)))
+    return None
+
+
+def _type_name(field_type) -> str:
+    return field_type.__name__ if isinstance(field_type, type) else str(field_type).replace('typing.', '')
+
+
+def _compile(cls: type) -> Codec:
+    """
+    Resolve the type hints of `cls` once and build its encode/decode functions.
+
+    Fields declared with ``compare=False`` (such as ``Teacher.courses``) are
+    back-references rather than data and are left out of the encoding.
+    Nested dataclasses are returned as-is so that the JSON encoder recurses
+    into them and tags each level with its own ``__type__``. Validated decodes
+    check every field against its declared type (nested objects must have been
+    tagged), raising TypeError, since the models only check some of them.
+    """
+    type_name = cls.__name__
+    field_types = get_type_hints(cls)
+    data_fields = [f.name for f in fields(cls) if f.compare]
+    encoders = tuple((name, _value_encoder(field_types[name])) for name in data_fields)
+    decoders = tuple(
+        (name, converter)
+        for name in data_fields
+        if (converter := _value_decoder(field_types[name])) is not None
+    )
+
+    def encode(obj) -> dict:
+        dct = {}
+        for name, converter in encoders:
+            value = getattr(obj, name)
+            dct[name] = value if converter is None else converter(value)
+        dct['__type__'] = type_name
+        return dct
+
+    def convert(dct: dict) -> dict:
+        for name, converter in decoders:
+            if name in dct:
+                dct[name] = converter(dct[name])
+        return dct
+
+    checks = tuple(
+        (name, check, _type_name(field_types[name]))
+        for name in data_fields
+        if (check := _type_check(field_types[name])) is not None
+    )
+
+    def decode(dct: dict):
+        convert(dct)
+        for name, check, expected in checks:
+            if name in dct and not check(dct[name]):
+                raise TypeError(f"{type_name}.{name} must be {expected}, not {type(dct[name]).__name__}.")
+        return cls(**dct)
+
+    def decode_trusted(dct: dict):
+        return cls.trusted(**convert(dct))
+
+    return Codec(encode, decode, decode_trusted)
+
+
+def get_codec(type_name: str) -> Optional[Codec]:
+    """
+    Args:
+        type_name: Name of a class registered in `utils.CLASS_REGISTRY`.
+    Returns:
+        The cached codec for that class, or None if the class is not registered.
+    """
+    codec = _CODECS.get(type_name)
+    if codec is None:
+        cls = utils.CLASS_REGISTRY.get(type_name)
+        if cls is None:
+            return None
+        codec = _CODECS[type_name] = _compile(cls)
+    return codec
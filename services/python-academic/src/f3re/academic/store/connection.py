@@ -0,0 +1,154 @@
+from contextlib import contextmanager
+from dataclasses import dataclass
+import queue
+import sqlite3
+import threading
+from typing import Iterator, List, Optional
+
+_JOURNAL_MODES = {'delete', 'truncate', 'persist', 'memory', 'wal', 'off'}
+_SYNCHRONOUS = {'off', 'normal', 'full', 'extra'}
+_TEMP_STORES = {'default', 'file', 'memory'}
+
+
+@dataclass(frozen=True)
+class SQLiteProfile:
+    """
+    Settings applied to every connection a `ConnectionManager` opens.
+
+    The default uses WAL, where readers never block the writer (or each other)
+    and ``synchronous = normal`` is still crash-safe, only the last commits
+    before a power loss may be rolled back. `cached_statements` is the size of
+    the per-connection prepared statement cache.
+    """
+    journal_mode: str = 'wal'
+    synchronous: str = 'normal'
+    mmap_size: int = 256 * 1024 * 1024
+    cache_size_kib: int = 64 * 1024
+    temp_store: str = 'memory'
+    busy_timeout_ms: int = 5000
+    cached_statements: int = 512
+    foreign_keys: bool = True
+
+    def __post_init__(self):
+        if self.journal_mode not in _JOURNAL_MODES:
+            raise ValueError(f"Invalid journal mode: {self.journal_mode}.")
+        if self.synchronous not in _SYNCHRONOUS:
+            raise ValueError(f"Invalid synchronous level: {self.synchronous}.")
+        if self.temp_store not in _TEMP_STORES:
+            raise ValueError(f"Invalid temp store: {self.temp_store}.")
+
+    def pragmas(self, readonly: bool = False) -> List[str]:
+        statements = [
+            f'pragma busy_timeout = {int(self.busy_timeout_ms)}',
+            f'pragma synchronous = {self.synchronous}',
+            f'pragma mmap_size = {int(self.mmap_size)}',
+            f'pragma cache_size = {-int(self.cache_size_kib)}',
+            f'pragma temp_store = {self.temp_store}',
+            f"pragma foreign_keys = {'on' if self.foreign_keys else 'off'}",
+        ]
+        # The journal mode is stored in the database file, so only the writer sets it.
+        statements.append('pragma query_only = on' if readonly else f'pragma journal_mode = {self.journal_mode}')
+        return statements
+
+
+DEFAULT_PROFILE = SQLiteProfile()
+# SQLite's and the sqlite3 module's own defaults: rollback journal, full sync, no mmap.
+ROLLBACK_PROFILE = SQLiteProfile(journal_mode='delete', synchronous='full', mmap_size=0, cache_size_kib=2000,
+                                 temp_store='default', cached_statements=128)
+
+
+def connect(db_path: str, profile: SQLiteProfile = DEFAULT_PROFILE, readonly: bool = False) -> sqlite3.Connection:
+    """
+    Open a connection with `profile` applied. Read-only connections are opened
+    with ``query_only`` rather than ``mode=ro``, which cannot create the WAL
+    index of a database no writer has opened yet.
+    """
+    # Connections are used by one thread at a time, but pooled connections move between threads.
+    conn = sqlite3.connect(db_path, timeout=profile.busy_timeout_ms / 1000,
+                           cached_statements=profile.cached_statements, check_same_thread=False)
+    for statement in profile.pragmas(readonly):
+        conn.execute(statement)
+    return conn
+
+
+def _is_memory(db_path: str) -> bool:
+    return db_path in ('', ':memory:') or db_path.startswith('file::memory:')
+
+
+class ConnectionManager:
+    """
+    One writer connection plus a bounded pool of reader connections to a
+    SQLite database, shared by any number of stores and threads.
+
+    `writer` hands out the single writer connection to one caller at a time.
+    `reader` hands out up to `readers` connections, each inside a read
+    transaction, so every statement in the block sees the same snapshot. In
+    WAL mode readers proceed while a write is in progress. An in-memory
+    database only exists on its own connection, so its reads use the writer.
+    """
+
+    def __init__(self, db_path: str, profile: SQLiteProfile = DEFAULT_PROFILE, readers: int = 4):
+        if readers < 1:
+            raise ValueError('At least one reader is required.')
+        self.db_path = db_path
+        self.profile = profile
+        self.readers = readers
+        self._writer: Optional[sqlite3.Connection] = None
+        self._write_lock = threading.RLock()
+        self._idle: 'queue.LifoQueue[sqlite3.Connection]' = queue.LifoQueue()
+        self._reader_slots = threading.BoundedSemaphore(readers)
+        self._opened: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _writer_conn(self) -> sqlite3.Connection:
+        if self._closed:
+            raise ConnectionError('Connection manager is closed.')
+        if self._writer is None:
+            self._writer = connect(self.db_path, self.profile)
+        return self._writer
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """The writer connection, held exclusively for the duration of the block."""
+        with self._write_lock:
+            yield self._writer_conn()
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """A reader connection inside a read transaction that ends with the block."""
+        if _is_memory(self.db_path):
+            with self.writer() as conn:
+                yield conn
+            return
+        if self._writer is None:
+            # The writer sets the journal mode before the first reader opens.
+            with self.writer():
+                pass
+        with self._reader_slots:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = connect(self.db_path, self.profile, readonly=True)
+                with self._lock:
+                    self._opened.append(conn)
+            try:
+                conn.execute('begin')
+                try:
+                    yield conn
+                finally:
+                    conn.rollback()
+            finally:
+                self._idle.put(conn)
+
+    def close(self):
+        """Close the writer and every reader; call it once no store is using the manager."""
+        self._closed = True
+        with self._write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        with self._lock:
+            readers, self._opened = self._opened, []
+        for conn in readers:
+            conn.close()
@@ -1,111 +1,638 @@
-import csv
-from dataclasses import is_dataclass, asdict
+from contextlib import contextmanager
 import datetime as dt
-from dotenv import load_dotenv
-from enum import Enum
+from functools import lru_cache
 import os
 import sqlite3 as sql
-from typing import Optional, get_type_hints
+from itertools import islice
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple
 
-from f3re.academic.model import Student, Email, Phone
-import utils
+from f3re.academic.model import (
+    Address, Course, DayOfWeek, Email, FamilyMember, Grade, Phone, Repetition, Sex, Status, Student, Teacher,
+    TimeSlot,
+)
+from . import aggregates, utils
+from .aggregates import GradeSummary
+from .connection import DEFAULT_PROFILE, ConnectionManager, SQLiteProfile
+from .identity import IdentityMap
+from .query import StudentFilter, StudentPage, select_ids
 
-load_dotenv('../static/.env')
-STUDENT_DB = os.getenv('DB')
-MAJOR_TABLE = os.getenv('MAJOR')
-COURSE_TABLE = os.getenv('COURSE')
+if TYPE_CHECKING:
+    from .reference import ReferenceData
+
+ENV_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'static', '.env')
+_SETTINGS = {'STUDENT_DB': 'DB', 'MAJOR_TABLE': 'MAJOR', 'COURSE_TABLE': 'COURSE'}
+
+
+@lru_cache(maxsize=None)
+def load_settings() -> Dict[str, Optional[str]]:
+    """
+    Read static/.env on first use; variables already set in the environment take precedence.
+    Returns:
+        dict: STUDENT_DB, MAJOR_TABLE and COURSE_TABLE (None when unset).
+    """
+    from dotenv import load_dotenv
+    load_dotenv(ENV_FILE)
+    return {name: os.getenv(var) for name, var in _SETTINGS.items()}
+
+
+def __getattr__(name: str):
+    # STUDENT_DB, MAJOR_TABLE and COURSE_TABLE are resolved lazily so that importing
+    # this module does not read the .env file.
+    if name in _SETTINGS:
+        return load_settings()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# SQLite builds before 3.32 allow at most 999 bound parameters per statement.
+_MAX_PARAMS = 900
+
+_ADD_TEACHER = '''
+    insert into Teachers (Teacher_Id, Teacher_Name, Sex, Department, Phone, Email) values (?, ?, ?, ?, ?, ?)
+    on conflict (Teacher_Id) do nothing
+'''
+_UPSERT_TEACHER = _ADD_TEACHER.replace('do nothing', '''do update set
+        Teacher_Name = excluded.Teacher_Name, Sex = excluded.Sex, Department = excluded.Department,
+        Phone = excluded.Phone, Email = excluded.Email''')
+_ADD_COURSE = '''
+    insert into Courses (Course_Id, Course_Name, Teacher_Id, Location, Credit) values (?, ?, ?, ?, ?)
+    on conflict (Course_Id) do nothing
+'''
+_UPSERT_COURSE = _ADD_COURSE.replace('do nothing', '''do update set
+        Course_Name = excluded.Course_Name, Teacher_Id = excluded.Teacher_Id,
+        Location = excluded.Location, Credit = excluded.Credit''')
+
+
+def _batches(ids: Iterable[int], size: int = _MAX_PARAMS) -> Iterator[List[int]]:
+    it = iter(ids)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+def _placeholders(n: int) -> str:
+    return ', '.join('?' * n)
 
 
 class StudentStore:
-    def __init__(self, db_path: str = STUDENT_DB):
-        self._db_path = db_path
-        self.conn: Optional[sql.Connection] = None
+    """
+    Normalized relational store for Student objects.
+
+    Students are split across Students_Profile/Students_Academic, with grades
+    and family members in child tables; courses, their teachers, classes and
+    time slots are stored once and shared by every grade that references them.
+    Hydrated courses and teachers are kept in LRU-bounded identity maps, so
+    students loaded through the same store share those objects. Stores on
+    different connections can share the maps by passing `course_map` and
+    `teacher_map`, so a course saved through one is invalidated for all.
+
+    Writes go through the writer connection of a `ConnectionManager` and reads
+    through its readers. Entering the store opens a manager with `profile`
+    unless a shared one is passed as `connections`, which is left open.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, identity_map_size: int = 1024,
+                 course_map: Optional[IdentityMap[Course]] = None,
+                 teacher_map: Optional[IdentityMap[Teacher]] = None,
+                 connections: Optional[ConnectionManager] = None, profile: SQLiteProfile = DEFAULT_PROFILE):
+        self._db_path = db_path if db_path is not None else load_settings()['STUDENT_DB']
+        self._profile = profile
+        self.connections = connections
+        self._owns_connections = False
+        self._courses = course_map if course_map is not None else IdentityMap(identity_map_size)
+        self._teachers = teacher_map if teacher_map is not None else IdentityMap(identity_map_size)
 
     def __enter__(self):
-        self.conn = sql.connect(self._db_path)
+        if self.connections is None:
+            self.connections = ConnectionManager(self._db_path, self._profile, readers=1)
+            self._owns_connections = True
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        if self.conn:
-            self.conn.close()
+        if self._owns_connections:
+            self.connections.close()
+            self.connections = None
+            self._owns_connections = False
+
+    @contextmanager
+    def _writing(self, action: str) -> Iterator[sql.Cursor]:
+        """Cursor on the writer connection, in one transaction."""
+        if self.connections is None:
+            raise ConnectionError(f'Cannot {action}')
+        with self.connections.writer() as conn, conn:
+            yield conn.cursor()
+
+    @contextmanager
+    def _reading(self, action: str) -> Iterator[sql.Cursor]:
+        """Cursor on a reader connection; all reads in the block see one snapshot."""
+        if self.connections is None:
+            raise ConnectionError(f'Cannot {action}')
+        with self.connections.reader() as conn:
+            yield conn.cursor()
 
     def create_table(self):
-        if not self.conn:
+        if self.connections is None:
             raise ConnectionError('Cannot create table')
-        c = self.conn.cursor()
-        c.execute('''
-                  create table if not exists Students_Profile (
-                      Student_Id   integer primary key,
-                      Student_Name varchar(255) not null,
-                      Sex          varchar(10)  not null,
-                      Birthdate    date         not null,
-                      Age          integer      not null,
-                      Phone        integer      not null,
-                      Email        varchar(255),
-                      Status       varchar(20)  not null
-                      );
-                  ''')
+        with self.connections.writer() as conn:
+            self._create_schema(conn)
+            if aggregates.add_columns(conn):
+                # A database from before the aggregate columns: fill them in.
+                aggregates.set_totals(conn.cursor(), aggregates.recompute(conn.cursor()))
+                conn.commit()
+            conn.executescript(aggregates.INDEXES)
+
+    @staticmethod
+    def _create_schema(conn: sql.Connection):
+        conn.executescript('''
+            create table if not exists Majors (
+                Major_Id   integer primary key,
+                Major_Name varchar(255) not null
+            );
+            create table if not exists Teachers (
+                Teacher_Id   integer primary key,
+                Teacher_Name varchar(255) not null,
+                Sex          varchar(10)  not null,
+                Department   varchar(255) not null,
+                Phone        varchar(11)  not null,
+                Email        varchar(255) not null
+            );
+            create table if not exists Courses (
+                Course_Id   integer primary key,
+                Course_Name varchar(255) not null,
+                Teacher_Id  integer      not null,
+                Location    varchar(255) not null,
+                Credit      integer      not null,
+                foreign key (Teacher_Id) references Teachers (Teacher_Id)
+            );
+            create index if not exists Idx_Courses_Teacher on Courses (Teacher_Id);
+            create table if not exists Course_Classes (
+                Course_Id integer not null,
+                Class_Id  integer not null,
+                primary key (Course_Id, Class_Id),
+                foreign key (Course_Id) references Courses (Course_Id)
+            );
+            create index if not exists Idx_Course_Classes_Class on Course_Classes (Class_Id);
+            create table if not exists Time_Slots (
+                Course_Id  integer     not null,
+                Slot_No    integer     not null,
+                Day        varchar(10) not null,
+                Start_Time varchar(8)  not null,
+                End_Time   varchar(8)  not null,
+                Repetition varchar(20) not null,
+                primary key (Course_Id, Slot_No),
+                foreign key (Course_Id) references Courses (Course_Id)
+            );
+            create table if not exists Students_Profile (
+                Student_Id   integer primary key,
+                Student_Name varchar(255) not null,
+                Sex          varchar(10)  not null,
+                Birthdate    date         not null,
+                Phone        varchar(11)  not null,
+                Email        varchar(255) not null,
+                Province     varchar(50)  not null,
+                City         varchar(255) not null,
+                Status       varchar(20)  not null
+            );
+            create table if not exists Students_Academic (
+                Student_Id     integer primary key,
+                Enroll_Year    integer not null,
+                Major_Id       integer not null,
+                Class_Id       integer not null,
+                Total_Credits  integer not null default 0,
+                Quality_Tenths integer not null default 0,
+                GPA            real    not null default 0,
+                foreign key (Student_Id) references Students_Profile (Student_Id),
+                foreign key (Major_Id) references Majors (Major_Id)
+            );
+            create index if not exists Idx_Students_Academic_Class on Students_Academic (Class_Id);
+            create index if not exists Idx_Students_Academic_Major on Students_Academic (Major_Id);
+            create index if not exists Idx_Students_Academic_Year on Students_Academic (Enroll_Year);
+            create index if not exists Idx_Students_Profile_Status on Students_Profile (Status);
+            create index if not exists Idx_Students_Profile_Province on Students_Profile (Province);
+            create index if not exists Idx_Students_Profile_Sex on Students_Profile (Sex);
+            create table if not exists Grades (
+                Student_Id integer not null,
+                Grade_No   integer not null,
+                Course_Id  integer not null,
+                Score      real    not null,
+                primary key (Student_Id, Grade_No),
+                foreign key (Student_Id) references Students_Profile (Student_Id),
+                foreign key (Course_Id) references Courses (Course_Id)
+            );
+            create index if not exists Idx_Grades_Course on Grades (Course_Id);
+            create table if not exists Family_Members (
+                Student_Id   integer      not null,
+                Member_No    integer      not null,
+                Member_Name  varchar(255) not null,
+                Relationship varchar(50)  not null,
+                Phone        varchar(11)  not null,
+                primary key (Student_Id, Member_No),
+                foreign key (Student_Id) references Students_Profile (Student_Id)
+            );
+        ''')
+        conn.commit()
+
+    def _write_courses(self, c: sql.Cursor, courses: Iterable[Course], replace: bool) -> List[Course]:
+        """
+        Write courses with their teacher, classes and time slots.
+        Unless `replace` is set, courses that already exist are left untouched.
+        Returns:
+            list: The courses that were written.
+        """
+        written = []
+        teacher_sql, course_sql = (_UPSERT_TEACHER, _UPSERT_COURSE) if replace else (_ADD_TEACHER, _ADD_COURSE)
+        for course in courses:
+            teacher = course.teacher
+            c.execute(teacher_sql, (teacher.teacher_id, teacher.name, teacher.sex.name, teacher.department,
+                                    teacher.phone.value, teacher.email.value))
+            c.execute(course_sql, (course.course_id, course.name, teacher.teacher_id, course.location, course.credit))
+            if not replace and c.rowcount == 0:
+                continue
+            written.append(course)
+            c.execute('delete from Course_Classes where Course_Id = ?', (course.course_id,))
+            c.execute('delete from Time_Slots where Course_Id = ?', (course.course_id,))
+            c.executemany('insert into Course_Classes (Course_Id, Class_Id) values (?, ?)',
+                          [(course.course_id, class_id) for class_id in sorted(course.class_id)])
+            c.executemany('''
+                          insert into Time_Slots (Course_Id, Slot_No, Day, Start_Time, End_Time, Repetition)
+                          values (?, ?, ?, ?, ?, ?)
+                          ''', [(course.course_id, no, slot.day.name, slot.start_time.isoformat(),
+                                 slot.end_time.isoformat(), slot.repetition.name)
+                                for no, slot in enumerate(course.time_slots)])
+        return written
+
+    def _write_student(self, c: sql.Cursor, stu: Student) -> List[Course]:
+        added = self._write_courses(c, {g.course.course_id: g.course for g in stu.grades}.values(), replace=False)
+        # Only adds majors the reference data does not know yet; `sync_reference_data` owns the names.
         c.execute('''
-                  create table if not exists Majors (
-                      Major_Id   integer primary key,
-                      Major_Name varchar(255) not null
-                      )
-                  ''')
+                  insert into Majors (Major_Id, Major_Name) values (?, ?)
+                  on conflict (Major_Id) do nothing
+                  ''', stu.major)
         c.execute('''
-                  create table if not exists Courses (
-                      Course_Id   integer primary key,
-                      Course_Name varchar(255) not null
-                      )
-                  ''')
+                  insert into Students_Profile (Student_Id, Student_Name, Sex, Birthdate, Phone, Email,
+                                                Province, City, Status)
+                  values (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                  ''', (stu.student_id, stu.name, stu.sex.name, stu.birthdate.isoformat(), stu.phone.value,
+                        stu.email.value, stu.address.province, stu.address.city, stu.status.name))
         c.execute('''
-                  create table if not exists Students_Academic (
-                      Student_Id  integer primary key,
-                      Enroll_Year integer      not null,
-                      Major_Id    integer      not null,
-                      Major_Name  varchar(255) not null,
-                      Class_Id    integer      not null,
-                      Course_Id   integer      not null,
-                      Course_Name varchar(255) not null,
-                      Score       integer      not null,
-                      foreign key (Student_Id) references Students_Profile (Student_Id),
-                      foreign key (Major_Id) references Majors (Major_Id),
-                      foreign key (Course_Id) references Courses (Course_Id)
-                      )
-                  ''')
-        self.conn.commit()
-
-    def create(self, stu: Student):
-        if not self.conn:
-            raise ConnectionError('Cannot create student')
-        c = self.conn.cursor()
-        try:
+                  insert into Students_Academic (Student_Id, Enroll_Year, Major_Id, Class_Id)
+                  values (?, ?, ?, ?)
+                  ''', (stu.student_id, stu.enroll_year, stu.major[0], stu.class_id))
+        c.executemany('''
+                      insert into Grades (Student_Id, Grade_No, Course_Id, Score) values (?, ?, ?, ?)
+                      ''', [(stu.student_id, no, g.course.course_id, g.score) for no, g in enumerate(stu.grades)])
+        c.executemany('''
+                      insert into Family_Members (Student_Id, Member_No, Member_Name, Relationship, Phone)
+                      values (?, ?, ?, ?, ?)
+                      ''', [(stu.student_id, no, m.name, m.relationship, m.phone.value)
+                            for no, m in enumerate(stu.family_members)])
+        # Grades count with the stored course credits, which can differ from those of `stu`.
+        aggregates.set_totals(c, aggregates.recompute(c, (stu.student_id,)))
+        return added
+
+    def _delete_student(self, c: sql.Cursor, student_id: int) -> bool:
+        for table in ('Grades', 'Family_Members', 'Students_Academic'):
+            c.execute(f'delete from {table} where Student_Id = ?', (student_id,))
+        c.execute('delete from Students_Profile where Student_Id = ?', (student_id,))
+        return c.rowcount > 0
+
+    def create(self, stu: Student) -> List[Course]:
+        """
+        Insert a student with its grades and family members in one transaction.
+        Courses, teachers and the major referenced by the student are added if
+        missing; existing ones are kept as stored (use `save_course` and
+        `sync_reference_data` to change them).
+        Returns:
+            list: The courses that were added, whose timetables are now stale.
+        """
+        with self._writing('create student') as c:
+            return self._write_student(c, stu)
+
+    def update(self, stu: Student) -> List[Course]:
+        """Replace the stored student, grades and family members with `stu`; returns the courses added."""
+        with self._writing('update student') as c:
+            if not self._delete_student(c, stu.student_id):
+                raise KeyError(f'Student {stu.student_id} not found')
+            return self._write_student(c, stu)
+
+    def delete(self, student_id: int) -> bool:
+        """Delete a student; returns False if it did not exist."""
+        with self._writing('delete student') as c:
+            return self._delete_student(c, student_id)
+
+    @staticmethod
+    def _latest_grade(c: sql.Cursor, student_id: int, course_id: int) -> Optional[Tuple[int, float, int]]:
+        """(Grade_No, Score, Credit) of the student's latest grade in a course."""
+        return c.execute('''
+                         select g.Grade_No, g.Score, c.Credit from Grades g
+                         join Courses c on c.Course_Id = g.Course_Id
+                         where g.Student_Id = ? and g.Course_Id = ? order by g.Grade_No desc limit 1
+                         ''', (student_id, course_id)).fetchone()
+
+    def add_grade(self, student_id: int, grade: Grade) -> List[Course]:
+        """
+        Append a grade to a student and add it to the student's aggregates.
+        The course is added if missing, like in `create`.
+        Returns:
+            list: The grade's course if it was added, else an empty list.
+        """
+        with self._writing('add grade') as c:
+            if c.execute('select 1 from Students_Academic where Student_Id = ?', (student_id,)).fetchone() is None:
+                raise KeyError(f'Student {student_id} not found')
+            added = self._write_courses(c, (grade.course,), replace=False)
             c.execute('''
-                      insert into Students_Profile (Student_Id, Student_Name, Sex, Birthdate, Phone, Email, Status) value (?, ?, ?, ?, ?, ?, ?)
-                      ''', (stu.student_id, stu.name, stu.sex, stu.birthdate, stu.phone, stu.email, stu.status))
-            self.conn.commit()
-        except Exception as e:
-            self.conn.rollback()
-            raise e
+                      insert into Grades (Student_Id, Grade_No, Course_Id, Score)
+                      select ?, coalesce(max(Grade_No) + 1, 0), ?, ? from Grades where Student_Id = ?
+                      ''', (student_id, grade.course.course_id, grade.score, student_id))
+            (credit,) = c.execute('select Credit from Courses where Course_Id = ?',
+                                  (grade.course.course_id,)).fetchone()
+            aggregates.adjust(c, {student_id: (credit, aggregates.quality_tenths(grade.score, credit))})
+            return added
+
+    def update_grade(self, student_id: int, grade: Grade) -> bool:
+        """
+        Set the score of the student's latest grade in `grade.course` to `grade.score`.
+        Returns False if the student has no grade in that course.
+        """
+        with self._writing('update grade') as c:
+            latest = self._latest_grade(c, student_id, grade.course.course_id)
+            if latest is None:
+                return False
+            grade_no, score, credit = latest
+            c.execute('update Grades set Score = ? where Student_Id = ? and Grade_No = ?',
+                      (grade.score, student_id, grade_no))
+            aggregates.adjust(c, {student_id: (0, aggregates.quality_tenths(grade.score, credit)
+                                               - aggregates.quality_tenths(score, credit))})
+            return True
+
+    def remove_grade(self, student_id: int, course_id: int) -> bool:
+        """Remove the student's latest grade in a course; returns False if there is none."""
+        with self._writing('remove grade') as c:
+            latest = self._latest_grade(c, student_id, course_id)
+            if latest is None:
+                return False
+            grade_no, score, credit = latest
+            c.execute('delete from Grades where Student_Id = ? and Grade_No = ?', (student_id, grade_no))
+            aggregates.adjust(c, {student_id: (-credit, -aggregates.quality_tenths(score, credit))})
+            return True
+
+    @staticmethod
+    def _apply_credit_changes(c: sql.Cursor, before: Dict[int, int]):
+        """Adjust the aggregates of students graded in courses whose credit is no longer the one in `before`."""
+        changes = {}
+        for course_id, old in before.items():
+            (new,) = c.execute('select Credit from Courses where Course_Id = ?', (course_id,)).fetchone()
+            if new != old:
+                changes[course_id] = new - old
+        if changes:
+            aggregates.adjust(c, aggregates.credit_deltas(c, changes))
+
+    def save_course(self, course: Course):
+        """
+        Insert or replace a course together with its teacher, classes and time slots.
+        A new credit is applied to the aggregates of every student graded in the course.
+        """
+        try:
+            with self._writing('save course') as c:
+                before = dict(c.execute('select Course_Id, Credit from Courses where Course_Id = ?',
+                                        (course.course_id,)))
+                self._write_courses(c, (course,), replace=True)
+                self._apply_credit_changes(c, before)
+        finally:
+            self._invalidate_course(course)
+
+    def sync_reference_data(self, data: 'ReferenceData') -> Tuple[int, int]:
+        """
+        Write the reference majors and course names/credits to the database.
+
+        Majors are upserted. A course row needs a teacher, so catalogue courses
+        only update the name and credit of courses that already exist; changed
+        credits are applied to the aggregates of the students graded in them.
+        Returns:
+            tuple: (majors written, courses updated)
+        """
+        try:
+            with self._writing('sync reference data') as c:
+                c.executemany('''
+                              insert into Majors (Major_Id, Major_Name) values (?, ?)
+                              on conflict (Major_Id) do update set Major_Name = excluded.Major_Name
+                              ''', data.majors)
+                majors = c.rowcount
+                before = dict(c.execute('select Course_Id, Credit from Courses'))
+                c.executemany('update Courses set Course_Name = ?, Credit = ? where Course_Id = ?',
+                              [(info.name, info.credit, info.course_id) for info in data.courses])
+                courses = c.rowcount
+                self._apply_credit_changes(c, before)
+        finally:
+            self._courses.clear()
+        return max(majors, 0), max(courses, 0)
+
+    def _invalidate_course(self, course: Course):
+        teacher_id = course.teacher.teacher_id
+        self._courses.invalidate(course.course_id)
+        self._teachers.invalidate(teacher_id)
+        self._courses.invalidate_where(lambda cached: cached.teacher.teacher_id == teacher_id)
+
+    def _load_courses(self, c: sql.Cursor, course_ids: Iterable[int]) -> Dict[int, Course]:
+        """Hydrate courses, reusing the instances held in the identity maps."""
+        courses: Dict[int, Course] = {}
+        missing = []
+        for course_id in set(course_ids):
+            course = self._courses.get(course_id)
+            if course is None:
+                missing.append(course_id)
+            else:
+                courses[course_id] = course
+        for batch in _batches(missing):
+            marks = _placeholders(len(batch))
+            classes: Dict[int, List[int]] = {}
+            for course_id, class_id in c.execute(
+                    f'select Course_Id, Class_Id from Course_Classes where Course_Id in ({marks})', batch):
+                classes.setdefault(course_id, []).append(class_id)
+            slots: Dict[int, List[TimeSlot]] = {}
+            for course_id, day, start, end, repetition in c.execute(f'''
+                    select Course_Id, Day, Start_Time, End_Time, Repetition
+                    from Time_Slots where Course_Id in ({marks}) order by Course_Id, Slot_No
+                    ''', batch):
+                slots.setdefault(course_id, []).append(TimeSlot.trusted(
+                    day=DayOfWeek[day], start_time=dt.time.fromisoformat(start),
+                    end_time=dt.time.fromisoformat(end), repetition=Repetition[repetition]))
+            for row in c.execute(f'''
+                    select c.Course_Id, c.Course_Name, c.Location, c.Credit,
+                           t.Teacher_Id, t.Teacher_Name, t.Sex, t.Department, t.Phone, t.Email
+                    from Courses c join Teachers t on t.Teacher_Id = c.Teacher_Id
+                    where c.Course_Id in ({marks})
+                    ''', batch):
+                course_id, name, location, credit, teacher_id = row[:5]
+                teacher = self._teachers.get(teacher_id)
+                if teacher is None:
+                    teacher = self._teachers.add(teacher_id, Teacher.trusted(
+                        teacher_id=teacher_id, name=row[5], sex=Sex[row[6]], department=row[7],
+                        phone=Phone.trusted(value=row[8]), email=Email.trusted(value=row[9])))
+                courses[course_id] = self._courses.add(course_id, Course.trusted(
+                    course_id=course_id, name=name, teacher=teacher, location=location, credit=credit,
+                    class_id=frozenset(classes.get(course_id, ())),
+                    time_slots=tuple(slots.get(course_id, ()))))
+        return courses
+
+    def _load_students(self, c: sql.Cursor, student_ids: Iterable[int]) -> Dict[int, Student]:
+        students: Dict[int, Student] = {}
+        for batch in _batches(student_ids):
+            marks = _placeholders(len(batch))
+            grade_rows: Dict[int, List[Tuple[int, float]]] = {}
+            for student_id, course_id, score in c.execute(f'''
+                    select Student_Id, Course_Id, Score from Grades
+                    where Student_Id in ({marks}) order by Student_Id, Grade_No
+                    ''', batch):
+                grade_rows.setdefault(student_id, []).append((course_id, score))
+            courses = self._load_courses(c, (course_id for rows in grade_rows.values() for course_id, _ in rows))
+            members: Dict[int, List[FamilyMember]] = {}
+            for student_id, name, relationship, phone in c.execute(f'''
+                    select Student_Id, Member_Name, Relationship, Phone from Family_Members
+                    where Student_Id in ({marks}) order by Student_Id, Member_No
+                    ''', batch):
+                members.setdefault(student_id, []).append(
+                    FamilyMember.trusted(name=name, relationship=relationship, phone=Phone.trusted(value=phone)))
+            for row in c.execute(f'''
+                    select p.Student_Id, p.Student_Name, p.Sex, p.Birthdate, p.Phone, p.Email,
+                           p.Province, p.City, p.Status, a.Enroll_Year, a.Major_Id, m.Major_Name, a.Class_Id
+                    from Students_Profile p
+                    join Students_Academic a on a.Student_Id = p.Student_Id
+                    join Majors m on m.Major_Id = a.Major_Id
+                    where p.Student_Id in ({marks})
+                    ''', batch):
+                student_id = row[0]
+                students[student_id] = Student.trusted(
+                    student_id=student_id, name=row[1], sex=Sex[row[2]],
+                    birthdate=dt.date.fromisoformat(row[3]), enroll_year=row[9], major=(row[10], row[11]),
+                    class_id=row[12], phone=Phone.trusted(value=row[4]), email=Email.trusted(value=row[5]),
+                    address=Address.trusted(province=row[6], city=row[7]),
+                    family_members=members.get(student_id, []), status=Status[row[8]],
+                    grades=[Grade.trusted(course=courses[course_id], score=score)
+                            for course_id, score in grade_rows.get(student_id, ())])
+        return students
 
     def find_by_id(self, student_id: int) -> Optional[Student]:
-        if not self.conn:
-            raise ConnectionError('Cannot find student')
-        c = self.conn.cursor()
-        c.execute('select * from Students_Profile where Student_Id = ?', (student_id,))
-        row = c.fetchone()
-        if not row:
-            raise sql.OperationalError('Student not found at profile table')
-        dct = {
-            'student_id': row[0],
-            'name': row[1],
-            'sex': row[2],
-            'birthdate': row[3],
-            'phone': row[5],
-            'email': row[6],
-            'status': row[7]
-        }
-        c.execute('select * from Students_Academic where Student_Id = ?', (student_id,))
-        row = c.fetchone()
-        if not row:
-            raise sql.OperationalError('Student not found at academic table')
-        dct.update({'enroll_year': row[1], 'major': (row[2], row[3]), 'class_id': row[4]})
+        with self._reading('find student') as c:
+            return self._load_students(c, (student_id,)).get(student_id)
+
+    def find_many(self, student_ids: Iterable[int]) -> Dict[int, Student]:
+        """Hydrate several students with batched joins; missing ids are omitted."""
+        with self._reading('find students') as c:
+            return self._load_students(c, dict.fromkeys(student_ids))
+
+    def query_page(self, after: Optional[int] = None, limit: int = 50, **filters) -> StudentPage:
+        """
+        One page of the students matching `filters`, in student id order.
+        Args:
+            after: The `next_after` of the previous page; None for the first page.
+            limit: Maximum number of students on the page.
+            **filters: `StudentFilter` fields (class_id, major, enroll_year, status, province, sex).
+        Returns:
+            StudentPage: The students and the cursor of the next page.
+        """
+        if limit < 1:
+            raise ValueError('Limit must be positive.')
+        query, params = select_ids(StudentFilter(**filters), after, limit + 1)
+        with self._reading('query students') as c:
+            ids = [student_id for (student_id,) in c.execute(query, params)]
+        page_ids = ids[:limit]
+        # Hydrated through find_many, so a caching store serves the page from its cache.
+        students = self.find_many(page_ids)
+        return StudentPage([students[i] for i in page_ids if i in students],
+                           page_ids[-1] if len(ids) > limit else None)
+
+    def query(self, after: Optional[int] = None, page_size: int = 100, **filters) -> Iterator[Student]:
+        """
+        Lazily iterate over the students matching `filters` (see `query_page`),
+        fetching `page_size` students at a time. No connection is held between pages.
+        """
+        while True:
+            page = self.query_page(after, page_size, **filters)
+            yield from page.students
+            if page.next_after is None:
+                return
+            after = page.next_after
+
+    def find_course(self, course_id: int) -> Optional[Course]:
+        with self._reading('find course') as c:
+            return self._load_courses(c, (course_id,)).get(course_id)
+
+    def find_courses_by_class(self, class_id: int) -> List[Course]:
+        """The courses a class takes, by course id, read through the Course_Classes class index."""
+        with self._reading('find courses') as c:
+            ids = [course_id for (course_id,) in c.execute(
+                'select Course_Id from Course_Classes where Class_Id = ? order by Course_Id', (class_id,))]
+            courses = self._load_courses(c, ids)
+        return [courses[course_id] for course_id in ids]
+
+    def find_courses_by_teacher(self, teacher_id: int) -> List[Course]:
+        """The courses a teacher gives, by course id."""
+        with self._reading('find courses') as c:
+            ids = [course_id for (course_id,) in c.execute(
+                'select Course_Id from Courses where Teacher_Id = ? order by Course_Id', (teacher_id,))]
+            courses = self._load_courses(c, ids)
+        return [courses[course_id] for course_id in ids]
+
+    def find_grades_by_course(self, course_id: int) -> List[Tuple[int, Grade]]:
+        """
+        Returns:
+            list: (student_id, Grade) pairs for one course, read through the Grades course index
+            without hydrating the students.
+        """
+        with self._reading('find grades') as c:
+            course = self._load_courses(c, (course_id,)).get(course_id)
+            if course is None:
+                return []
+            rows = c.execute('select Student_Id, Score from Grades where Course_Id = ? order by Student_Id, Grade_No',
+                             (course_id,))
+            return [(student_id, Grade.trusted(course=course, score=score)) for student_id, score in rows]
+
+    def find_summary(self, student_id: int) -> Optional[GradeSummary]:
+        """The stored credit total, quality points and GPA of a student, without loading the grades."""
+        with self._reading('find summary') as c:
+            row = c.execute('''
+                            select Student_Id, Total_Credits, Quality_Tenths, GPA from Students_Academic
+                            where Student_Id = ?
+                            ''', (student_id,)).fetchone()
+        return aggregates.summary(row) if row else None
+
+    def rank_students(self, class_id: Optional[int] = None, major: Optional[int] = None,
+                      limit: Optional[int] = None) -> List[Tuple[int, GradeSummary]]:
+        """
+        Students by descending stored GPA, within a class and/or major, read from the GPA indexes.
+        Returns:
+            list: (rank, summary) pairs; ties share the lower rank, as in `CohortGrades.rank`.
+        """
+        conditions, params = [], []
+        for column, value in (('Class_Id', class_id), ('Major_Id', major)):
+            if value is not None:
+                conditions.append(f'{column} = ?')
+                params.append(value)
+        with self._reading('rank students') as c:
+            rows = c.execute(f'''
+                             select Student_Id, Total_Credits, Quality_Tenths, GPA from Students_Academic
+                             {'where ' + ' and '.join(conditions) if conditions else ''}
+                             order by GPA desc, Student_Id limit ?
+                             ''', params + [-1 if limit is None else limit]).fetchall()
+        ranking, rank = [], 0
+        for i, row in enumerate(rows):
+            if i == 0 or row[3] != rows[i - 1][3]:
+                rank = i + 1
+            ranking.append((rank, aggregates.summary(row)))
+        return ranking
+
+    def check_aggregates(self, repair: bool = False) -> List[Tuple[GradeSummary, GradeSummary]]:
+        """
+        Recompute every student's aggregates from the grades and compare them with the stored ones.
+        Args:
+            repair: Overwrite the wrong aggregates with the recomputed ones.
+        Returns:
+            list: (stored, expected) pairs of the students whose aggregates were wrong.
+        """
+        if not repair:
+            with self._reading('check aggregates') as c:
+                return aggregates.check(c)
+        with self._writing('repair aggregates') as c:
+            mismatches = aggregates.check(c)
+            aggregates.set_totals(c, {expected.student_id: (expected.total_credits,
+                                                            round(expected.quality_points * 10))
+                                      for _, expected in mismatches})
+            return mismatches
@@ -1,13 +1,22 @@
 import datetime as dt
+from itertools import islice
 import json
 import os
 import sqlite3
+from typing import Iterable
 
 from ..model import models, constants, contact
 from .json_mapper import EnhancedJSONEncoder, EnhancedJSONDecoder
 
 DB_FILE = 'student_demo.sqlite'
 
+_INSERT_STUDENT = '''
+    INSERT INTO students (
+        student_id, name, sex, birthdate, enroll_year, major, class_id,
+        phone, email, address, family_members, status, grades
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
 
 def create_tables(conn):
     """Create database tables for students."""
@@ -33,44 +42,51 @@ def create_tables(conn):
     conn.commit()
 
 
+def _student_row(student: models.Student, encoder: json.JSONEncoder) -> tuple:
+    """Serialize complex fields to JSON with `encoder` and build the row."""
+    return (
+        student.student_id,
+        student.name,
+        student.sex.name,
+        student.birthdate.isoformat(),
+        student.enroll_year,
+        encoder.encode(student.major),
+        student.class_id,
+        encoder.encode(student.phone),
+        encoder.encode(student.email),
+        encoder.encode(student.address),
+        encoder.encode(student.family_members),
+        student.status.name,
+        encoder.encode(student.grades),
+    )
+
+
 def insert_student(conn, student: models.Student):
     """Inserts a student object into the database."""
-    c = conn.cursor()
-
-    # Serialize complex objects to JSON using the corrected JSON mapper
-    major_json = json.dumps(student.major, cls=EnhancedJSONEncoder)
-    phone_json = json.dumps(student.phone, cls=EnhancedJSONEncoder)
-    email_json = json.dumps(student.email, cls=EnhancedJSONEncoder)
-    address_json = json.dumps(student.address, cls=EnhancedJSONEncoder)
-    family_members_json = json.dumps(student.family_members, cls=EnhancedJSONEncoder)
-    grades_json = json.dumps(student.grades, cls=EnhancedJSONEncoder)
-
-    c.execute(
-        '''
-        INSERT INTO students (
-            student_id, name, sex, birthdate, enroll_year, major, class_id,
-            phone, email, address, family_members, status, grades
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''',
-        (
-            student.student_id,
-            student.name,
-            student.sex.name,
-            student.birthdate.isoformat(),
-            student.enroll_year,
-            major_json,
-            student.class_id,
-            phone_json,
-            email_json,
-            address_json,
-            family_members_json,
-            student.status.name,
-            grades_json,
-        )
-    )
+    conn.execute(_INSERT_STUDENT, _student_row(student, EnhancedJSONEncoder()))
     conn.commit()
 
 
+def insert_students(conn, students: Iterable[models.Student], chunk_size: int = 1000) -> int:
+    """
+    Inserts students in a single transaction, `chunk_size` rows per executemany call.
+    Nothing is written if any insert fails.
+    Returns:
+        int: The number of students inserted.
+    """
+    if chunk_size < 1:
+        raise ValueError("Chunk size must be positive.")
+    students = iter(students)
+    count = 0
+    with conn:
+        while chunk := list(islice(students, chunk_size)):
+            # Courses shared by the chunk's grades are encoded once.
+            encoder = EnhancedJSONEncoder(memo={})
+            conn.executemany(_INSERT_STUDENT, [_student_row(student, encoder) for student in chunk])
+            count += len(chunk)
+    return count
+
+
 def get_student_by_id(conn, student_id: int) -> models.Student | None:
     """Retrieves a student from the database by student_id."""
     c = conn.cursor()
@@ -0,0 +1,58 @@
+from collections import OrderedDict
+import threading
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+T = TypeVar('T')
+
+
+class IdentityMap(Generic[T]):
+    """
+    Maps an id to the single instance hydrated for it, so repeated loads share
+    one object. The least recently used entries are evicted past `maxsize`.
+    A map is thread-safe and may be shared by stores on different connections.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        if maxsize < 1:
+            raise ValueError('Maxsize must be positive.')
+        self.maxsize = maxsize
+        self._entries: 'OrderedDict[Hashable, T]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable) -> Optional[T]:
+        with self._lock:
+            obj = self._entries.get(key)
+            if obj is not None:
+                self._entries.move_to_end(key)
+            return obj
+
+    def add(self, key: Hashable, obj: T) -> T:
+        """Register `obj` for `key`, returning the instance already mapped if there is one."""
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is not None:
+                self._entries.move_to_end(key)
+                return existing
+            self._entries[key] = obj
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            return obj
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[T], bool]):
+        with self._lock:
+            for key in [k for k, obj in self._entries.items() if predicate(obj)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
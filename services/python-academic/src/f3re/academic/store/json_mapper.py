@@ -1,21 +1,43 @@
-from dataclasses import is_dataclass, asdict
+from contextlib import contextmanager
 import datetime as dt
+import gzip
+import io
 import json
 from enum import Enum
-from typing import get_type_hints
+from typing import IO, Iterable, Iterator, Optional
 
 from ..model.contact import Email, Phone
-from ..model.models import Student
-from . import utils
+from ..model.models import Course, Student, Teacher, TimeSlot
+from .codec import get_codec
+
+GRAPH_FORMAT_VERSION = 1
 
 
 class EnhancedJSONEncoder(json.JSONEncoder):
+    """
+    Encodes registered model objects as dicts tagged with ``__type__``. With a
+    `memo` dict, each object is encoded once per memo, so courses shared by
+    many grades are converted only once; the objects must not change while
+    the memo is in use.
+    """
+
+    def __init__(self, *args, memo: Optional[dict] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._memo = memo
+
     def default(self, o):
-        if is_dataclass(o):
-            if o.__class__.__name__ in utils.CLASS_REGISTRY:
-                dct = asdict(o)
-                dct['__type__'] = o.__class__.__name__
-                return dct
+        memo = self._memo
+        if memo is not None:
+            hit = memo.get(id(o))
+            if hit is not None:
+                return hit[1]
+        codec = get_codec(o.__class__.__name__)
+        if codec is not None:
+            dct = codec.encode(o)
+            if memo is not None:
+                # Keeps `o` alive so that its id is not reused by another object.
+                memo[id(o)] = (o, dct)
+            return dct
         if isinstance(o, (dt.datetime, dt.date, dt.time)):
             return o.isoformat()
         if isinstance(o, Enum):
@@ -26,28 +48,65 @@ class EnhancedJSONEncoder(json.JSONEncoder):
 
 
 class EnhancedJSONDecoder(json.JSONDecoder):
-    def __init__(self, *args, **kwargs):
+    """
+    Decodes objects tagged with ``__type__``. With ``trusted=True`` they are built
+    without re-running validation; only use it for data this service wrote.
+    """
+
+    def __init__(self, *args, trusted: bool = False, **kwargs):
         super().__init__(object_hook=self.object_hook, *args, **kwargs)
+        self.trusted = trusted
 
     def object_hook(self, dct):
         if '__type__' in dct:
-            type_name = dct.pop('__type__')
-            if type_name in utils.CLASS_REGISTRY:
-                target_cls = utils.CLASS_REGISTRY[type_name]
-                field_types = get_type_hints(target_cls)
-                for key, value in dct.items():
-                    if key in field_types:
-                        field_type = field_types[key]
-                        if isinstance(field_type, type) and issubclass(field_type, Enum):
-                            dct[key] = field_type[value]
-                        elif field_type is dt.date and isinstance(value, str):
-                            dct[key] = dt.date.fromisoformat(value)
-                        elif field_type is dt.datetime and isinstance(value, str):
-                            dct[key] = dt.datetime.fromisoformat(value)
-                return target_cls(**dct)
+            codec = get_codec(dct['__type__'])
+            if codec is not None:
+                del dct['__type__']
+                return codec.decode_trusted(dct) if self.trusted else codec.decode(dct)
         return dct
 
 
+def _ref(type_name: str, ref_id: int) -> dict:
+    return {'__ref__': type_name, 'id': ref_id}
+
+
+class GraphJSONEncoder(EnhancedJSONEncoder):
+    """Encodes every Course as a reference into the document's course table."""
+
+    def default(self, o):
+        if isinstance(o, Course):
+            return _ref('Course', o.course_id)
+        return super().default(o)
+
+
+class GraphJSONDecoder(EnhancedJSONDecoder):
+    """
+    Resolves Course/Teacher references against the tables decoded earlier in
+    the same document, so every grade of a course shares one Course object.
+    Equal time slots are interned as well.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._tables = {'Course': {}, 'Teacher': {}}
+        self._time_slots = {}
+
+    def object_hook(self, dct):
+        if '__ref__' in dct:
+            try:
+                return self._tables[dct['__ref__']][dct['id']]
+            except KeyError:
+                raise ValueError(f"Unresolved reference: {dct['__ref__']} {dct.get('id')}") from None
+        obj = super().object_hook(dct)
+        if isinstance(obj, Course):
+            return self._tables['Course'].setdefault(obj.course_id, obj)
+        if isinstance(obj, Teacher):
+            return self._tables['Teacher'].setdefault(obj.teacher_id, obj)
+        if isinstance(obj, TimeSlot):
+            return self._time_slots.setdefault(obj, obj)
+        return obj
+
+
 def student_from_json(json_string: str) -> Student:
     """
     Args:
@@ -77,3 +136,131 @@ def student_to_json(student: Student) -> str:
     if not isinstance(student, Student):
         raise TypeError('Input must be a Student object.')
     return json.dumps(student, cls=EnhancedJSONEncoder, indent=2)
+
+
+def students_to_graph_json(students: Iterable[Student]) -> str:
+    """
+    Encode a cohort with each Course and Teacher emitted once in a reference
+    table; grades and courses point into the tables by ``course_id`` and
+    ``teacher_id``. Courses sharing an id are assumed to be identical.
+    Args:
+        students: Student objects to encode.
+    Returns:
+        str: Compact JSON document with ``teachers``, ``courses`` and ``students``.
+    """
+    students = list(students)
+    courses = {}
+    for student in students:
+        if not isinstance(student, Student):
+            raise TypeError('Input must be Student objects.')
+        for grade in student.grades:
+            courses.setdefault(grade.course.course_id, grade.course)
+    teachers = {course.teacher.teacher_id: course.teacher for course in courses.values()}
+    course_codec = get_codec('Course')
+    course_table = []
+    for course in courses.values():
+        dct = course_codec.encode(course)
+        dct['teacher'] = _ref('Teacher', course.teacher.teacher_id)
+        course_table.append(dct)
+    # Table order matters: the decoder resolves references in document order.
+    document = {
+        '__graph__': GRAPH_FORMAT_VERSION,
+        'teachers': list(teachers.values()),
+        'courses': course_table,
+        'students': students,
+    }
+    return json.dumps(document, cls=GraphJSONEncoder, separators=(',', ':'))
+
+
+def students_from_graph_json(json_string: str, trusted: bool = False) -> list[Student]:
+    """
+    Args:
+        json_string: Document produced by `students_to_graph_json`.
+        trusted: Skip model validation; only for documents this service wrote.
+    Returns:
+        list[Student]: Decoded students; equal courses, teachers and time slots are shared objects.
+    Raises:
+        json.JSONDecodeError: If the string is not valid JSON.
+        ValueError: If the document is not a graph document or a reference cannot be resolved.
+    """
+    document = json.loads(json_string, cls=GraphJSONDecoder, trusted=trusted)
+    if not isinstance(document, dict) or document.get('__graph__') != GRAPH_FORMAT_VERSION:
+        raise ValueError('JSON did not represent a student graph document.')
+    students = document['students']
+    for student in students:
+        if not isinstance(student, Student):
+            raise ValueError(f"Decoded to type: {type(student).__name__}, expected Student.")
+    return students
+
+
+@contextmanager
+def _ndjson_stream(fileobj: IO, mode: str, compress: bool) -> Iterator[io.TextIOBase]:
+    """Yield a text stream over `fileobj` without closing the caller's file."""
+    if isinstance(fileobj, io.TextIOBase):
+        if compress:
+            raise ValueError('Compressed NDJSON requires a binary file object.')
+        try:
+            yield fileobj
+        finally:
+            if mode == 'w':
+                fileobj.flush()
+        return
+    raw = gzip.GzipFile(fileobj=fileobj, mode=mode + 'b') if compress else fileobj
+    stream = io.TextIOWrapper(raw, encoding='utf-8', newline='\n')
+    try:
+        yield stream
+    finally:
+        if mode == 'w':
+            stream.flush()
+        stream.detach()
+        if compress:
+            raw.close()
+
+
+def write_students_ndjson(students: Iterable[Student], fileobj: IO, compress: bool = False) -> int:
+    """
+    Write one compact JSON record per line, consuming `students` lazily.
+    Args:
+        students: Student objects to write; may be a generator.
+        fileobj: Text or binary file object. It is flushed but not closed.
+        compress: Write a gzip stream; requires a binary file object.
+    Returns:
+        int: The number of records written.
+    """
+    encoder = EnhancedJSONEncoder(separators=(',', ':'))
+    count = 0
+    with _ndjson_stream(fileobj, 'w', compress) as stream:
+        for student in students:
+            if not isinstance(student, Student):
+                raise TypeError('Input must be Student objects.')
+            stream.write(encoder.encode(student))
+            stream.write('\n')
+            count += 1
+    return count
+
+
+def iter_students_from_ndjson(fileobj: IO, compress: bool = False, trusted: bool = False) -> Iterator[Student]:
+    """
+    Lazily decode line-delimited student records; blank lines are skipped.
+    Args:
+        fileobj: Text or binary file object positioned at the first record.
+        compress: Read a gzip stream; requires a binary file object.
+        trusted: Skip model validation; only for files this service wrote.
+    Yields:
+        Student: One student per non-blank line.
+    Raises:
+        json.JSONDecodeError: If a line is not valid JSON.
+        ValueError: If a line does not decode to a Student.
+    """
+    decoder = EnhancedJSONDecoder(trusted=trusted)
+    with _ndjson_stream(fileobj, 'r', compress) as stream:
+        for line_no, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            student = decoder.decode(line)
+            if not isinstance(student, Student):
+                raise ValueError(
+                    f"Line {line_no} did not represent a Student object. "
+                    f"Decoded to type: {type(student).__name__}"
+                )
+            yield student
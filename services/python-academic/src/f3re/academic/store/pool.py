@@ -0,0 +1,62 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import queue
+import threading
+from typing import Callable, Generic, List, TypeVar
+
+S = TypeVar('S')
+T = TypeVar('T')
+
+
+class StorePool(Generic[S]):
+    """
+    Bounded pool of open stores for asyncio code.
+
+    Blocking store calls run on a dedicated thread pool with one worker per
+    store, so at most `size` queries run at once and the event loop never
+    waits on SQLite. Stores are opened lazily with
+    `factory` (a store class or any callable returning an un-entered store).
+    """
+
+    def __init__(self, factory: Callable[[], S], size: int = 4):
+        if size < 1:
+            raise ValueError('Pool size must be positive.')
+        self.size = size
+        self._factory = factory
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix='academic-store')
+        self._idle: 'queue.LifoQueue[S]' = queue.LifoQueue()
+        self._opened: List[S] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _acquire(self) -> S:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            store = self._factory()
+            store.__enter__()
+            with self._lock:
+                self._opened.append(store)
+            return store
+
+    def _call(self, fn: Callable[[S], T]) -> T:
+        store = self._acquire()
+        try:
+            return fn(store)
+        finally:
+            self._idle.put(store)
+
+    async def run(self, fn: Callable[[S], T]) -> T:
+        """Run `fn` with a pooled store on the pool's threads and await its result."""
+        if self._closed:
+            raise RuntimeError('Store pool is closed.')
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._call, fn)
+
+    def close(self):
+        """Wait for running calls, then close every store the pool opened."""
+        self._closed = True
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            stores, self._opened = self._opened, []
+        for store in stores:
+            store.__exit__(None, None, None)
@@ -0,0 +1,79 @@
+from dataclasses import dataclass, fields
+from enum import Enum
+from typing import List, NamedTuple, Optional, Tuple, Union
+
+from f3re.academic.model import Sex, Status, Student
+
+# Filter field -> indexed column of Students_Academic (a) or Students_Profile (p).
+_COLUMNS = {
+    'class_id': 'a.Class_Id',
+    'major': 'a.Major_Id',
+    'enroll_year': 'a.Enroll_Year',
+    'status': 'p.Status',
+    'province': 'p.Province',
+    'sex': 'p.Sex',
+}
+
+
+@dataclass(frozen=True)
+class StudentFilter:
+    """
+    Equality filters for `StudentStore.query`; fields left as None match any
+    student. `major` is a major id (a ``(id, name)`` tuple is accepted too),
+    `status` and `sex` are enum members or their names.
+    """
+    class_id: Optional[int] = None
+    major: Optional[Union[int, Tuple[int, str]]] = None
+    enroll_year: Optional[int] = None
+    status: Optional[Union[Status, str]] = None
+    province: Optional[str] = None
+    sex: Optional[Union[Sex, str]] = None
+
+    def __post_init__(self):
+        if isinstance(self.major, tuple):
+            object.__setattr__(self, 'major', self.major[0])
+        for name, enum in (('status', Status), ('sex', Sex)):
+            value = getattr(self, name)
+            if isinstance(value, str):
+                try:
+                    object.__setattr__(self, name, enum[value.upper()])
+                except KeyError:
+                    raise ValueError(f"Invalid {name}: {value}.") from None
+
+    def where(self) -> Tuple[List[str], list]:
+        """SQL conditions and their parameters, one per set field."""
+        conditions, params = [], []
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if value is not None:
+                conditions.append(f'{_COLUMNS[f.name]} = ?')
+                params.append(value.name if isinstance(value, Enum) else value)
+        return conditions, params
+
+
+def select_ids(where: StudentFilter, after: Optional[int], limit: int) -> Tuple[str, list]:
+    """
+    Keyset query for the ids of the next `limit` matching students after the
+    student id `after`. Every filter column has an index, which SQLite keeps
+    ordered by student id within each value, so a page is a range seek
+    whatever its position in the table, unlike ``offset`` which walks every
+    skipped row.
+    """
+    conditions, params = where.where()
+    # Drive the join from the table holding the filters, so its index supplies the order.
+    key = 'p.Student_Id' if conditions and all(c.startswith('p.') for c in conditions) else 'a.Student_Id'
+    if after is not None:
+        conditions.append(f'{key} > ?')
+        params.append(after)
+    sql = f'''
+        select {key} from Students_Academic a join Students_Profile p on p.Student_Id = a.Student_Id
+        {'where ' + ' and '.join(conditions) if conditions else ''}
+        order by {key} limit ?
+    '''
+    return sql, params + [limit]
+
+
+class StudentPage(NamedTuple):
+    """One page of query results; pass `next_after` back as `after` for the next page (None on the last)."""
+    students: List[Student]
+    next_after: Optional[int]
@@ -0,0 +1,93 @@
+import csv
+from functools import lru_cache
+import os
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .db_mapper import load_settings
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'static')
+
+
+class CourseInfo(NamedTuple):
+    course_id: int
+    name: str
+    credit: int
+
+
+def _read_rows(path: str) -> List[Dict[str, str]]:
+    # utf-8-sig: the files are usually exported from spreadsheets, which prepend a BOM.
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        return [row for row in csv.DictReader(f) if any(row.values())]
+
+
+class ReferenceData:
+    """
+    Majors and the course catalogue, indexed by id and by name.
+
+    Major lookups return the same ``(id, name)`` tuple used for `Student.major`.
+    Course names are not unique (several offerings may share one), so
+    `course_ids` returns every id with that name.
+    """
+
+    def __init__(self, majors: Dict[int, str], courses: Dict[int, CourseInfo]):
+        self._majors = {major_id: (major_id, name) for major_id, name in majors.items()}
+        self._major_ids = {name: major_id for major_id, name in majors.items()}
+        self._courses = courses
+        course_ids: Dict[str, List[int]] = {}
+        for info in courses.values():
+            course_ids.setdefault(info.name, []).append(info.course_id)
+        self._course_ids = {name: tuple(ids) for name, ids in course_ids.items()}
+
+    @classmethod
+    def from_csv(cls, major_path: str, course_path: str) -> 'ReferenceData':
+        """
+        Args:
+            major_path: CSV with the columns Major_Id, Major_Name.
+            course_path: CSV with the columns Course_Id, Course_Name, Credit.
+        """
+        majors = {int(row['Major_Id']): row['Major_Name'].strip() for row in _read_rows(major_path)}
+        courses = {}
+        for row in _read_rows(course_path):
+            info = CourseInfo(int(row['Course_Id']), row['Course_Name'].strip(), int(row['Credit']))
+            courses[info.course_id] = info
+        return cls(majors, courses)
+
+    def major(self, major_id: int) -> Optional[Tuple[int, str]]:
+        return self._majors.get(major_id)
+
+    def major_id(self, name: str) -> Optional[int]:
+        return self._major_ids.get(name)
+
+    def is_known_major(self, major: Tuple[int, str]) -> bool:
+        """Whether `major` (as in `Student.major`) matches the reference list."""
+        return self._majors.get(major[0]) == tuple(major)
+
+    def course(self, course_id: int) -> Optional[CourseInfo]:
+        return self._courses.get(course_id)
+
+    def course_name(self, course_id: int) -> Optional[str]:
+        info = self._courses.get(course_id)
+        return info.name if info is not None else None
+
+    def course_ids(self, name: str) -> Tuple[int, ...]:
+        return self._course_ids.get(name, ())
+
+    @property
+    def majors(self) -> List[Tuple[int, str]]:
+        return list(self._majors.values())
+
+    @property
+    def courses(self) -> List[CourseInfo]:
+        return list(self._courses.values())
+
+
+@lru_cache(maxsize=None)
+def get_reference_data() -> ReferenceData:
+    """
+    Load the reference CSVs on first use and return the same instance afterwards.
+    The MAJOR and COURSE settings override the files shipped in `static/`;
+    call `get_reference_data.cache_clear()` to reload after they change.
+    """
+    settings = load_settings()
+    return ReferenceData.from_csv(settings['MAJOR_TABLE'] or os.path.join(STATIC_DIR, 'major.csv'),
+                                  settings['COURSE_TABLE'] or os.path.join(STATIC_DIR, 'course.csv'))
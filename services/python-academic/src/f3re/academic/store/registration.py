@@ -0,0 +1,308 @@
+"""
+Course registration: seat counters, enrollments and waitlists in a
+`StudentStore` database.
+
+Every change runs in one ``begin immediate`` transaction on the writer
+connection, so the checks and the seat claim see the same state even with
+several processes on one database. A seat is claimed with a single
+conditional update that only succeeds while ``Enrolled < Capacity``, and a
+check constraint rejects any write that would overbook a course.
+"""
+from contextlib import contextmanager
+from enum import Enum
+import sqlite3 as sql
+import threading
+from typing import TYPE_CHECKING, FrozenSet, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from ..model.models import Course
+from ..schedule.conflicts import ScheduleIndex
+
+if TYPE_CHECKING:
+    from .db_mapper import StudentStore
+
+
+class RegistrationStatus(Enum):
+    ENROLLED = 1
+    WAITLISTED = 2
+    ALREADY_ENROLLED = 3
+    ALREADY_WAITLISTED = 4
+    FULL = 5
+    CONFLICT = 6
+
+
+class Registration(NamedTuple):
+    """Result of `Registrar.register`; `position` is set when waitlisted, `conflicts` on a CONFLICT."""
+    status: RegistrationStatus
+    course_id: int
+    position: Optional[int] = None
+    conflicts: FrozenSet[int] = frozenset()
+
+
+class Seats(NamedTuple):
+    course_id: int
+    capacity: int
+    enrolled: int
+    waitlisted: int
+
+    @property
+    def available(self) -> int:
+        return self.capacity - self.enrolled
+
+
+class Registrar:
+    """
+    Registers students for courses on the database of an open `StudentStore`.
+
+    A course is open for registration once `offer` gives it a capacity.
+    Students join the waitlist of a full course; whenever a seat frees up
+    (a drop or a larger capacity) the waitlist is promoted in order within
+    the same transaction, so a course never has both free seats and waiting
+    students. A registration that overlaps the student's enrolled courses
+    is refused; the course time slots are kept in a `ScheduleIndex`, which
+    `invalidate_course` must refresh when a course is saved.
+    """
+
+    def __init__(self, store: 'StudentStore'):
+        self._store = store
+        self._index = ScheduleIndex()
+        self._lock = threading.Lock()
+        # Bumped by every invalidation, so a course loaded before it is not indexed.
+        self._generation = 0
+
+    @contextmanager
+    def _transaction(self, action: str) -> Iterator[sql.Cursor]:
+        connections = self._store.connections
+        if connections is None:
+            raise ConnectionError(f'Cannot {action}')
+        with connections.writer() as conn, conn:
+            # Take the database write lock up front, not at the first write, so that no
+            # other process can change the seats or enrollments between check and claim.
+            conn.execute('begin immediate')
+            yield conn.cursor()
+
+    @contextmanager
+    def _reading(self, action: str) -> Iterator[sql.Cursor]:
+        connections = self._store.connections
+        if connections is None:
+            raise ConnectionError(f'Cannot {action}')
+        with connections.reader() as conn:
+            yield conn.cursor()
+
+    def create_table(self):
+        connections = self._store.connections
+        if connections is None:
+            raise ConnectionError('Cannot create table')
+        with connections.writer() as conn:
+            conn.executescript('''
+                create table if not exists Course_Seats (
+                    Course_Id integer primary key,
+                    Capacity  integer not null check (Capacity >= 0),
+                    Enrolled  integer not null default 0 check (Enrolled between 0 and Capacity),
+                    foreign key (Course_Id) references Courses (Course_Id)
+                );
+                create table if not exists Enrollments (
+                    Student_Id integer not null,
+                    Course_Id  integer not null,
+                    primary key (Student_Id, Course_Id),
+                    foreign key (Course_Id) references Course_Seats (Course_Id)
+                ) without rowid;
+                create index if not exists Idx_Enrollments_Course on Enrollments (Course_Id);
+                create table if not exists Waitlist (
+                    Entry_No   integer primary key autoincrement,
+                    Course_Id  integer not null,
+                    Student_Id integer not null,
+                    unique (Course_Id, Student_Id),
+                    foreign key (Course_Id) references Course_Seats (Course_Id)
+                );
+                create index if not exists Idx_Waitlist_Course on Waitlist (Course_Id, Entry_No);
+                create index if not exists Idx_Waitlist_Student on Waitlist (Student_Id);
+            ''')
+            conn.commit()
+
+    def _course(self, course_id: int) -> Course:
+        """The indexed course, loaded from the store on first use."""
+        with self._lock:
+            course = self._index.get(course_id)
+            generation = self._generation
+        if course is None:
+            course = self._store.find_course(course_id)
+            if course is None:
+                raise KeyError(f'Course {course_id} not found')
+            with self._lock:
+                if generation == self._generation:
+                    self._index.add(course)
+        return course
+
+    def _conflicts(self, c: sql.Cursor, student_id: int, course_id: int) -> Set[int]:
+        """Enrolled courses of the student whose time slots overlap the course."""
+        enrolled = [enrolled_id for (enrolled_id,) in c.execute(
+            'select Course_Id from Enrollments where Student_Id = ?', (student_id,))]
+        course = self._course(course_id)
+        courses = [self._course(enrolled_id) for enrolled_id in enrolled]
+        with self._lock:
+            if all(enrolled_id in self._index for enrolled_id in enrolled):
+                return self._index.conflicts_with(course, among=enrolled)
+        # A course was invalidated meanwhile: check against the versions just loaded.
+        return ScheduleIndex(courses).conflicts_with(course)
+
+    @staticmethod
+    def _claim(c: sql.Cursor, student_id: int, course_id: int) -> bool:
+        """Take a seat if one is free; the conditional update is the only check needed."""
+        c.execute('update Course_Seats set Enrolled = Enrolled + 1 where Course_Id = ? and Enrolled < Capacity',
+                  (course_id,))
+        if c.rowcount == 0:
+            return False
+        c.execute('insert into Enrollments (Student_Id, Course_Id) values (?, ?)', (student_id, course_id))
+        return True
+
+    def _release(self, c: sql.Cursor, course_id: int) -> List[int]:
+        c.execute('update Course_Seats set Enrolled = Enrolled - 1 where Course_Id = ?', (course_id,))
+        return self._promote(c, course_id)
+
+    def _promote(self, c: sql.Cursor, course_id: int) -> List[int]:
+        """
+        Move waitlisted students into the free seats of a course, in order.
+        A student who has since enrolled in an overlapping course loses their place.
+        """
+        promoted = []
+        while True:
+            head = c.execute('select Entry_No, Student_Id from Waitlist where Course_Id = ? order by Entry_No limit 1',
+                             (course_id,)).fetchone()
+            if head is None:
+                break
+            entry_no, student_id = head
+            if not self._conflicts(c, student_id, course_id):
+                if not self._claim(c, student_id, course_id):
+                    break
+                promoted.append(student_id)
+            c.execute('delete from Waitlist where Entry_No = ?', (entry_no,))
+        return promoted
+
+    def offer(self, course_id: int, capacity: int) -> List[int]:
+        """
+        Open a course for registration with `capacity` seats, or change its capacity.
+        Returns:
+            list: Ids of the waitlisted students enrolled into the new seats.
+        """
+        if capacity < 0:
+            raise ValueError('Capacity cannot be negative.')
+        with self._transaction('offer course') as c:
+            if c.execute('select 1 from Courses where Course_Id = ?', (course_id,)).fetchone() is None:
+                raise KeyError(f'Course {course_id} not found')
+            row = c.execute('select Enrolled from Course_Seats where Course_Id = ?', (course_id,)).fetchone()
+            if row is not None and capacity < row[0]:
+                raise ValueError(f'Course {course_id} already has {row[0]} students enrolled.')
+            c.execute('''
+                      insert into Course_Seats (Course_Id, Capacity) values (?, ?)
+                      on conflict (Course_Id) do update set Capacity = excluded.Capacity
+                      ''', (course_id, capacity))
+            return self._promote(c, course_id)
+
+    def register(self, student_id: int, course_id: int, waitlist: bool = True) -> Registration:
+        """
+        Enroll a student in a course, or put them on its waitlist when it is full.
+        Args:
+            waitlist: Join the waitlist of a full course; otherwise the result is FULL.
+        Raises:
+            KeyError: The student does not exist or the course is not offered.
+        """
+        with self._transaction('register') as c:
+            if c.execute('select 1 from Course_Seats where Course_Id = ?', (course_id,)).fetchone() is None:
+                raise KeyError(f'Course {course_id} is not offered')
+            if c.execute('select 1 from Students_Academic where Student_Id = ?', (student_id,)).fetchone() is None:
+                raise KeyError(f'Student {student_id} not found')
+            if c.execute('select 1 from Enrollments where Student_Id = ? and Course_Id = ?',
+                         (student_id, course_id)).fetchone() is not None:
+                return Registration(RegistrationStatus.ALREADY_ENROLLED, course_id)
+            conflicts = self._conflicts(c, student_id, course_id)
+            if conflicts:
+                return Registration(RegistrationStatus.CONFLICT, course_id, conflicts=frozenset(conflicts))
+            if self._claim(c, student_id, course_id):
+                return Registration(RegistrationStatus.ENROLLED, course_id)
+            if not waitlist:
+                return Registration(RegistrationStatus.FULL, course_id)
+            c.execute('insert into Waitlist (Course_Id, Student_Id) values (?, ?) on conflict do nothing',
+                      (course_id, student_id))
+            status = RegistrationStatus.WAITLISTED if c.rowcount else RegistrationStatus.ALREADY_WAITLISTED
+            (position,) = c.execute('''
+                                    select count(*) from Waitlist where Course_Id = ? and Entry_No <= (
+                                        select Entry_No from Waitlist where Course_Id = ? and Student_Id = ?)
+                                    ''', (course_id, course_id, student_id)).fetchone()
+            return Registration(status, course_id, position)
+
+    def drop(self, student_id: int, course_id: int) -> bool:
+        """
+        Drop a student's enrollment or waitlist place in a course; a freed seat
+        goes to the waitlist. Returns False if the student had neither.
+        """
+        with self._transaction('drop registration') as c:
+            c.execute('delete from Waitlist where Course_Id = ? and Student_Id = ?', (course_id, student_id))
+            if c.rowcount:
+                return True
+            c.execute('delete from Enrollments where Student_Id = ? and Course_Id = ?', (student_id, course_id))
+            if c.rowcount == 0:
+                return False
+            self._release(c, course_id)
+            return True
+
+    def withdraw_student(self, student_id: int) -> int:
+        """Drop every enrollment and waitlist place of a student (e.g. before deleting them)."""
+        with self._transaction('withdraw student') as c:
+            c.execute('delete from Waitlist where Student_Id = ?', (student_id,))
+            dropped = c.rowcount
+            courses = [course_id for (course_id,) in c.execute(
+                'select Course_Id from Enrollments where Student_Id = ?', (student_id,))]
+            c.execute('delete from Enrollments where Student_Id = ?', (student_id,))
+            for course_id in courses:
+                self._release(c, course_id)
+            return dropped + len(courses)
+
+    def invalidate_course(self, course_id: int):
+        """Forget the indexed time slots of a course, after it was saved with new ones."""
+        with self._lock:
+            self._generation += 1
+            self._index.remove(course_id)
+
+    def seats(self, course_id: int) -> Optional[Seats]:
+        with self._reading('find seats') as c:
+            row = c.execute('''
+                            select Course_Id, Capacity, Enrolled,
+                                   (select count(*) from Waitlist w where w.Course_Id = s.Course_Id)
+                            from Course_Seats s where Course_Id = ?
+                            ''', (course_id,)).fetchone()
+        return Seats(*row) if row else None
+
+    def enrolled_courses(self, student_id: int) -> List[int]:
+        with self._reading('find enrollments') as c:
+            return [course_id for (course_id,) in c.execute(
+                'select Course_Id from Enrollments where Student_Id = ? order by Course_Id', (student_id,))]
+
+    def waitlisted_courses(self, student_id: int) -> List[int]:
+        with self._reading('find waitlist') as c:
+            return [course_id for (course_id,) in c.execute(
+                'select Course_Id from Waitlist where Student_Id = ? order by Entry_No', (student_id,))]
+
+    def roster(self, course_id: int) -> List[int]:
+        """Ids of the students enrolled in a course, read through the Enrollments course index."""
+        with self._reading('find roster') as c:
+            return [student_id for (student_id,) in c.execute(
+                'select Student_Id from Enrollments where Course_Id = ? order by Student_Id', (course_id,))]
+
+    def waitlist(self, course_id: int) -> List[int]:
+        """Ids of the students waiting for a course, first in line first."""
+        with self._reading('find waitlist') as c:
+            return [student_id for (student_id,) in c.execute(
+                'select Student_Id from Waitlist where Course_Id = ? order by Entry_No', (course_id,))]
+
+    def check_seats(self) -> List[Tuple[int, int, int]]:
+        """
+        Count the enrollments of every offered course.
+        Returns:
+            list: (course_id, stored Enrolled, counted enrollments) of the courses whose counter is wrong.
+        """
+        with self._reading('check seats') as c:
+            return c.execute('''
+                             select s.Course_Id, s.Enrolled, count(e.Student_Id) from Course_Seats s
+                             left join Enrollments e on e.Course_Id = s.Course_Id
+                             group by s.Course_Id having s.Enrolled != count(e.Student_Id)
+                             ''').fetchall()
@@ -0,0 +1,249 @@
+from abc import ABC, abstractmethod
+from dataclasses import fields
+import datetime as dt
+from enum import Enum
+import json
+import marshal
+import sys
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple, Union, get_args, get_origin, get_type_hints
+
+from ..model.models import Course
+from . import utils
+from .json_mapper import EnhancedJSONDecoder, EnhancedJSONEncoder
+
+
+class Serializer(ABC):
+    """
+    Converts model values (registered dataclasses, lists of them, or plain
+    values) to a stored representation and back.
+    """
+    name: str
+
+    @abstractmethod
+    def dumps(self, obj: Any) -> Union[str, bytes]:
+        ...
+
+    @abstractmethod
+    def loads(self, data: Union[str, bytes], trusted: bool = False) -> Any:
+        """With ``trusted=True`` objects are built without validation; only use it for data this service wrote."""
+
+    def batch(self) -> Callable[[Any], Union[str, bytes]]:
+        """
+        A `dumps` function for encoding many values in one go, e.g. the rows of
+        one bulk insert. It may reuse the encoding of objects it has seen, so
+        drop it once the batch is written.
+        """
+        return self.dumps
+
+
+class JSONSerializer(Serializer):
+    """Tagged JSON text via `EnhancedJSONEncoder`/`EnhancedJSONDecoder`."""
+    name = 'json'
+
+    def dumps(self, obj: Any) -> str:
+        return json.dumps(obj, cls=EnhancedJSONEncoder)
+
+    def loads(self, data: str, trusted: bool = False) -> Any:
+        return json.loads(data, cls=EnhancedJSONDecoder, trusted=trusted)
+
+    def batch(self) -> Callable[[Any], str]:
+        return EnhancedJSONEncoder(memo={}).encode
+
+
+# Encoder and decoder of one declared type; None for values marshal stores as they are.
+_Converter = Optional[Tuple[Callable[[Any], Any], Callable[[Any], Any]]]
+# Version 2 adds the major and minor version of the Python that wrote the blob; version 1 blobs lack them.
+_BINARY_VERSION = b'\x02'
+_LEGACY_BINARY_VERSION = b'\x01'
+_PYTHON_VERSION = bytes(sys.version_info[:2])
+_MARSHAL_VERSION = 4
+
+
+def _time_to_micros(t: dt.time) -> int:
+    return ((t.hour * 60 + t.minute) * 60 + t.second) * 1_000_000 + t.microsecond
+
+
+def _micros_to_time(us: int) -> dt.time:
+    return dt.time(us // 3_600_000_000, us // 60_000_000 % 60, us // 1_000_000 % 60, us % 1_000_000)
+
+
+class BinarySerializer(Serializer):
+    """
+    Compact binary encoding of the model classes.
+
+    Objects are flattened to tuples of their field values in declaration
+    order, following the type hints, so no field names or type tags are
+    stored: enums become member indices, dates ordinals, (naive) times
+    microseconds since midnight. The resulting tree is written with `marshal`,
+    prefixed by a format version byte and the Python version. Like `pickle`,
+    `marshal` is not safe against maliciously constructed data; only load bytes
+    this service wrote.
+
+    The marshal format is only guaranteed to be readable by the Python version
+    that wrote it. Blobs from another version are still tried (the types used
+    here have not changed format since Python 3.4) but raise ValueError naming
+    the writer's version if they cannot be read; use the JSON serializer for
+    data that has to outlive an interpreter upgrade, or re-export it first.
+
+    Trusted loads share one Course object per distinct encoded course (up to
+    `max_shared`), as the graph JSON format does, instead of rebuilding the
+    same course, teacher and time slots for every grade. The shared cache is
+    guarded by a lock, so one serializer can be used from several threads.
+    """
+    name = 'binary'
+
+    def __init__(self, max_shared: int = 4096):
+        self._classes = {cls: name for name, cls in utils.CLASS_REGISTRY.items()}
+        self._codecs: Dict[Tuple[type, bool], Tuple[Callable, Callable]] = {}
+        self.max_shared = max_shared
+        self._shared: Dict[tuple, Any] = {}
+        self._shared_lock = threading.Lock()
+
+    def _converter(self, field_type, trusted: bool) -> _Converter:
+        if isinstance(field_type, type):
+            if field_type in self._classes:
+                return self._codec(field_type, trusted)
+            if issubclass(field_type, Enum):
+                members = tuple(field_type)
+                index = {member: i for i, member in enumerate(members)}
+                return index.__getitem__, members.__getitem__
+            if field_type is dt.datetime:
+                return dt.datetime.isoformat, dt.datetime.fromisoformat
+            if field_type is dt.date:
+                return dt.date.toordinal, dt.date.fromordinal
+            if field_type is dt.time:
+                return _time_to_micros, _micros_to_time
+            return None
+        origin, args = get_origin(field_type), get_args(field_type)
+        if origin in (list, set, frozenset) or (origin is tuple and len(args) == 2 and args[1] is Ellipsis):
+            item = self._converter(args[0], trusted) if args else None
+            if item is None:
+                return None
+            encode_item, decode_item = item
+            return (lambda values: tuple(encode_item(v) for v in values),
+                    lambda values: origin(decode_item(v) for v in values))
+        if origin is tuple:
+            items = [self._converter(arg, trusted) for arg in args]
+            if not any(items):
+                return None
+            encoders = [(i, c[0]) for i, c in enumerate(items) if c]
+            decoders = [(i, c[1]) for i, c in enumerate(items) if c]
+            return (lambda values: tuple(_apply(values, encoders)),
+                    lambda values: tuple(_apply(values, decoders)))
+        if origin is Union and len(args) == 2 and type(None) in args:
+            inner = self._converter(next(arg for arg in args if arg is not type(None)), trusted)
+            if inner is None:
+                return None
+            encode_inner, decode_inner = inner
+            return (lambda v: None if v is None else encode_inner(v),
+                    lambda v: None if v is None else decode_inner(v))
+        return None
+
+    def _codec(self, cls: type, trusted: bool = False) -> Tuple[Callable, Callable]:
+        """Encode and decode functions for one registered class, compiled once."""
+        codec = self._codecs.get((cls, trusted))
+        if codec is not None:
+            return codec
+        hints = get_type_hints(cls)
+        # compare=False fields (Teacher.courses) are back-references and are rebuilt from their default.
+        names = tuple(f.name for f in fields(cls) if f.compare)
+        converters = [self._converter(hints[name], trusted) for name in names]
+        encoders = [(i, c[0]) for i, c in enumerate(converters) if c]
+        decoders = [(i, c[1]) for i, c in enumerate(converters) if c]
+
+        def encode(obj) -> tuple:
+            return tuple(_apply([getattr(obj, name) for name in names], encoders))
+
+        if trusted and cls is Course:
+            shared, lock = self._shared, self._shared_lock
+
+            def decode(values: tuple):
+                with lock:
+                    obj = shared.get(values)
+                if obj is None:
+                    # Built outside the lock; if another thread won the race its course is kept.
+                    obj = cls.trusted(**dict(zip(names, _apply(values, decoders))))
+                    with lock:
+                        if len(shared) >= self.max_shared:
+                            shared.clear()
+                        obj = shared.setdefault(values, obj)
+                return obj
+        elif trusted:
+            # Looked up on each call: `trusted` is replaced by the compiled constructor on first use.
+            def decode(values: tuple):
+                return cls.trusted(**dict(zip(names, _apply(values, decoders))))
+        else:
+            def decode(values: tuple):
+                return cls(**dict(zip(names, _apply(values, decoders))))
+
+        codec = self._codecs[(cls, trusted)] = (encode, decode)
+        return codec
+
+    def dumps(self, obj: Any) -> bytes:
+        if type(obj) in self._classes:
+            tree = (self._classes[type(obj)], False, self._codec(type(obj))[0](obj))
+        elif isinstance(obj, (list, tuple)) and obj and type(obj[0]) in self._classes:
+            cls = type(obj[0])
+            if any(type(item) is not cls for item in obj):
+                raise TypeError('Lists must hold objects of a single class.')
+            encode = self._codec(cls)[0]
+            tree = (self._classes[cls], True, tuple(encode(item) for item in obj))
+        else:
+            tree = (None, False, obj)
+        try:
+            return _BINARY_VERSION + _PYTHON_VERSION + marshal.dumps(tree, _MARSHAL_VERSION)
+        except ValueError as e:
+            raise TypeError(f'Object of type {type(obj).__name__} is not serializable') from e
+
+    def loads(self, data: bytes, trusted: bool = False) -> Any:
+        if data[:1] == _BINARY_VERSION:
+            python_version, body = data[1:3], data[3:]
+        elif data[:1] == _LEGACY_BINARY_VERSION:
+            python_version, body = None, data[1:]
+        else:
+            raise ValueError('Unsupported binary format.')
+        try:
+            type_name, many, payload = marshal.loads(body)
+        except (ValueError, EOFError, TypeError) as e:
+            if python_version is not None and python_version != _PYTHON_VERSION:
+                raise ValueError(f'Binary data was written by Python {python_version[0]}.{python_version[1]} '
+                                 f'and cannot be read by this version; export it as JSON there.') from e
+            raise ValueError('Corrupt binary data.') from e
+        if type_name is None:
+            return payload
+        decode = self._codec(utils.CLASS_REGISTRY[type_name], trusted)[1]
+        return [decode(item) for item in payload] if many else decode(payload)
+
+
+def _apply(values, converters) -> list:
+    values = list(values)
+    for i, converter in converters:
+        values[i] = converter(values[i])
+    return values
+
+
+SERIALIZERS: Dict[str, Serializer] = {
+    'json': JSONSerializer(),
+    'binary': BinarySerializer(),
+}
+
+
+def get_serializer(serializer: Union[str, Serializer]) -> Serializer:
+    """
+    Args:
+        serializer: A registered name ('json' or 'binary') or a Serializer instance.
+    Returns:
+        Serializer: The matching serializer.
+    """
+    if isinstance(serializer, Serializer):
+        return serializer
+    try:
+        return SERIALIZERS[serializer]
+    except KeyError:
+        raise ValueError(f"Unknown serializer: {serializer}.") from None
+
+
+def load_value(data: Union[str, bytes], trusted: bool = False) -> Any:
+    """Decode a value written by either serializer: JSON is stored as text, the binary format as bytes."""
+    return (SERIALIZERS['binary'] if isinstance(data, bytes) else SERIALIZERS['json']).loads(data, trusted)
@@ -1,5 +1,4 @@
-from f3re.academic import models as ac
-from f3re.academic.model import contact
+from ..model import contact, models as ac
 
 CLASS_REGISTRY = {
     'Student': ac.Student,
@@ -0,0 +1,22 @@
+from typing import List
+
+import pytest
+
+from f3re.academic.model import Course, DayOfWeek, Grade, Student
+
+from factories import make_course, make_slot, make_student, make_teacher
+
+
+@pytest.fixture
+def courses() -> List[Course]:
+    teachers = [make_teacher(1), make_teacher(2)]
+    return [make_course(i, teachers[i % 2], credit=1 + i % 5, class_ids=(1, 2) if i % 2 else (1,),
+                        slots=(make_slot(DayOfWeek(1 + i % 5), 8 + i),))
+            for i in range(1, 6)]
+
+
+@pytest.fixture
+def students(courses) -> List[Student]:
+    return [make_student(2024000000 + i, [Grade(course=c, score=float(50 + 7 * i + c.course_id)) for c in courses[:i]],
+                         class_id=1 + i % 2)
+            for i in range(1, 5)]
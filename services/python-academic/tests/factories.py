@@ -0,0 +1,36 @@
+"""Model builders shared by the tests; the fixtures in conftest.py are built from them."""
+import datetime as dt
+from typing import List
+
+from f3re.academic.model import (
+    Address, Course, DayOfWeek, Email, FamilyMember, Grade, Phone, Repetition, Sex, Status, Student, Teacher,
+    TimeSlot,
+)
+
+
+def make_teacher(teacher_id: int = 1) -> Teacher:
+    return Teacher(teacher_id=teacher_id, name=f"Teacher {teacher_id}", sex=Sex.FEMALE,
+                   department="Mathematics", phone=Phone(f"138{teacher_id:08d}"),
+                   email=Email(f"teacher{teacher_id}@example.com"))
+
+
+def make_slot(day: DayOfWeek = DayOfWeek.MONDAY, hour: int = 8,
+              repetition: Repetition = Repetition.WEEKLY) -> TimeSlot:
+    return TimeSlot(day=day, start_time=dt.time(hour), end_time=dt.time(hour + 1, 45), repetition=repetition)
+
+
+def make_course(course_id: int = 1, teacher: Teacher = None, credit: int = 3, class_ids=(1,),
+                slots=None) -> Course:
+    return Course(course_id=course_id, name=f"Course {course_id}", teacher=teacher or make_teacher(),
+                  location=f"Room {100 + course_id}", credit=credit, class_id=frozenset(class_ids),
+                  time_slots=tuple(slots or (make_slot(hour=8 + course_id % 10),)))
+
+
+def make_student(student_id: int = 2024000001, grades: List[Grade] = (), class_id: int = 1,
+                 major=(1, "Mathematics")) -> Student:
+    return Student(student_id=student_id, name=f"Student {student_id}", sex=Sex.MALE,
+                   birthdate=dt.date(2004, 5, 17), enroll_year=2022, major=major, class_id=class_id,
+                   phone=Phone("13912345678"), email=Email(f"s{student_id}@example.com"),
+                   address=Address(province="Zhejiang", city="Hangzhou"),
+                   family_members=[FamilyMember(name="Parent", relationship="Mother", phone=Phone("13700000000"))],
+                   status=Status.ACTIVE, grades=list(grades))
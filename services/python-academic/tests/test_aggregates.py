@@ -0,0 +1,146 @@
+import dataclasses
+import sqlite3
+
+import pytest
+
+from f3re.academic.model import Grade
+from f3re.academic.model.models import quality_tenths
+from f3re.academic.store import aggregates
+from f3re.academic.store.db_mapper import StudentStore
+from f3re.academic.store.reference import CourseInfo, ReferenceData
+
+from factories import make_course, make_student
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'store.sqlite')
+
+
+@pytest.fixture
+def store(db_path, students):
+    with StudentStore(db_path) as store:
+        store.create_table()
+        for student in students:
+            store.create(student)
+        yield store
+
+
+def assert_consistent(store: StudentStore, student_id: int):
+    """The stored aggregates match the student's grades and a full recomputation."""
+    student = store.find_by_id(student_id)
+    summary = store.find_summary(student_id)
+    assert summary.gpa == student.gpa
+    assert summary.total_credits == sum(g.course.credit for g in student.grades)
+    assert summary.quality_points == pytest.approx(sum(g.quality_point for g in student.grades))
+    assert store.check_aggregates() == []
+
+
+def test_created_students_have_aggregates(store, students):
+    for student in students:
+        assert_consistent(store, student.student_id)
+    assert store.find_summary(1) is None
+
+
+def test_students_without_grades_have_zero_gpa(store):
+    store.create(make_student(2024000099))
+    assert store.find_summary(2024000099) == (2024000099, 0, 0.0, 0.0)
+
+
+def test_grade_changes_adjust_aggregates(store, students, courses):
+    student_id = students[0].student_id
+    store.add_grade(student_id, Grade(course=courses[3], score=88.0))
+    assert_consistent(store, student_id)
+    # A retake: update and remove act on the latest grade in the course.
+    store.add_grade(student_id, Grade(course=courses[0], score=40.0))
+    assert store.update_grade(student_id, Grade(course=courses[0], score=97.0))
+    assert_consistent(store, student_id)
+    assert [g.score for g in store.find_by_id(student_id).grades if g.course == courses[0]] == [58.0, 97.0]
+    assert store.remove_grade(student_id, courses[0].course_id)
+    assert_consistent(store, student_id)
+    assert [g.score for g in store.find_by_id(student_id).grades if g.course == courses[0]] == [58.0]
+
+
+def test_grade_changes_of_unknown_students_or_courses(store, students, courses):
+    with pytest.raises(KeyError):
+        store.add_grade(1, Grade(course=courses[0], score=80.0))
+    assert not store.update_grade(students[0].student_id, Grade(course=courses[4], score=80.0))
+    assert not store.remove_grade(students[0].student_id, courses[4].course_id)
+    assert store.check_aggregates() == []
+
+
+def test_new_grades_count_with_the_stored_credit(store, students, courses):
+    student_id = students[0].student_id
+    store.add_grade(student_id, Grade(course=dataclasses.replace(courses[1], credit=5), score=75.0))
+    assert store.find_by_id(student_id).grades[-1].course.credit == courses[1].credit
+    assert_consistent(store, student_id)
+
+
+def test_credit_changes_update_every_graded_student(store, students, courses):
+    before = {s.student_id: store.find_summary(s.student_id) for s in students}
+    store.save_course(dataclasses.replace(courses[1], credit=1))
+    for student in students:
+        assert_consistent(store, student.student_id)
+        graded = any(g.course.course_id == courses[1].course_id for g in student.grades)
+        assert store.find_summary(student.student_id).total_credits == (
+            before[student.student_id].total_credits - (courses[1].credit - 1 if graded else 0))
+
+
+def test_reference_credit_changes_update_aggregates(store, students, courses):
+    store.sync_reference_data(ReferenceData({}, {courses[0].course_id: CourseInfo(courses[0].course_id, 'Renamed', 5)}))
+    for student in students:
+        assert_consistent(store, student.student_id)
+    assert store.find_summary(students[0].student_id).total_credits == 5
+
+
+def test_rank_students(store, students):
+    store.create(make_student(2024000099, [students[-1].grades[0]], class_id=2))
+    store.create(make_student(2024000098, [students[-1].grades[0]], class_id=2))
+    ranking = store.rank_students()
+    gpas = [summary.gpa for _, summary in ranking]
+    assert gpas == sorted(gpas, reverse=True)
+    assert len(ranking) == len(students) + 2
+    tied = [rank for rank, summary in ranking if summary.student_id in (2024000098, 2024000099)]
+    assert tied[0] == tied[1]
+    assert [summary.student_id for _, summary in store.rank_students(class_id=1)] == sorted(
+        (s.student_id for s in students if s.class_id == 1), key=lambda i: -store.find_summary(i).gpa)
+    assert len(store.rank_students(limit=2)) == 2
+    assert store.rank_students(major=42) == []
+
+
+def test_check_aggregates_finds_and_repairs_drift(store, students, db_path):
+    student_id = students[2].student_id
+    with sqlite3.connect(db_path) as conn:
+        conn.execute('update Students_Academic set Total_Credits = 99, GPA = 4.9 where Student_Id = ?', (student_id,))
+    conn.close()
+    mismatches = store.check_aggregates()
+    assert [(stored.student_id, stored.total_credits) for stored, _ in mismatches] == [(student_id, 99)]
+    assert mismatches[0][1].total_credits == sum(g.course.credit for g in students[2].grades)
+    assert store.check_aggregates(repair=True) == mismatches
+    assert_consistent(store, student_id)
+
+
+def test_check_command_exits_non_zero_on_drift(store, students, db_path, capsys):
+    with sqlite3.connect(db_path) as conn:
+        conn.execute('update Students_Academic set GPA = 0 where Student_Id = ?', (students[0].student_id,))
+    conn.close()
+    with pytest.raises(SystemExit) as info:
+        aggregates.main([db_path])
+    assert info.value.code == 1
+    assert str(students[0].student_id) in capsys.readouterr().out
+    aggregates.main([db_path, '--repair'])
+    aggregates.main([db_path])
+
+
+def test_quality_points_are_summed_exactly(db_path):
+    # 0.1 steps of grade points summed as floats drift; the stored tenths do not.
+    course = make_course(1, credit=1)
+    grades = [Grade(course=course, score=s) for s in (61.0, 63.0, 65.0)] * 10
+    with StudentStore(db_path) as store:
+        store.create_table()
+        store.create(make_student(grades=grades))
+        for _ in range(20):
+            store.add_grade(2024000001, Grade(course=course, score=63.0))
+            store.remove_grade(2024000001, course.course_id)
+        assert store.find_summary(2024000001).quality_points == sum(quality_tenths(g.score, 1) for g in grades) / 10
+        assert store.check_aggregates() == []
@@ -0,0 +1,99 @@
+import random
+
+import numpy as np
+import pytest
+
+from f3re.academic.analytics import CohortGrades
+from f3re.academic.model import Grade
+from f3re.academic.store.db_mapper import StudentStore
+
+from factories import make_course, make_student
+
+# Scores whose grade point (score / 20) sits on a rounding boundary, or just below one.
+EDGE_SCORES = [0.0, 59.95, 61.0, 63.0, 65.0, 67.0, 69.95, 71.0, 89.0, 99.0, 99.95, 100.0]
+
+
+@pytest.fixture(scope='module')
+def cohort_students():
+    rng = random.Random(2024)
+    courses = [make_course(i, credit=rng.randint(1, 5)) for i in range(1, 9)]
+    students = []
+    for i in range(400):
+        grades = [Grade(course=rng.choice(courses),
+                        score=rng.choice(EDGE_SCORES) if rng.random() < 0.4 else round(rng.uniform(0, 100), 2))
+                  for _ in range(rng.randint(0, 12))]
+        students.append(make_student(2024000000 + i, grades, class_id=1 + i % 7, major=(1 + i % 3, 'Major')))
+    return students
+
+
+def test_gpa_matches_student_gpa_bit_for_bit(cohort_students):
+    gpa = CohortGrades.from_students(cohort_students).gpa()
+    assert gpa.tolist() == [s.gpa for s in cohort_students]
+
+
+@pytest.mark.parametrize('score', EDGE_SCORES)
+def test_gpa_on_rounding_edges(score):
+    students = [make_student(grades=[Grade(course=make_course(1, credit=credit), score=score)] * repeat)
+                for credit in range(1, 6) for repeat in (1, 3)]
+    assert CohortGrades.from_students(students).gpa().tolist() == [s.gpa for s in students]
+
+
+def test_gpa_matches_after_a_store_roundtrip(cohort_students, tmp_path):
+    with StudentStore(str(tmp_path / 'store.sqlite')) as store:
+        store.create_table()
+        for student in cohort_students[:100]:
+            store.create(student)
+        cohort = CohortGrades.from_store(store)
+    expected = {s.student_id: s.gpa for s in cohort_students[:100]}
+    assert dict(zip(cohort.student_id.tolist(), cohort.gpa().tolist())) == expected
+
+
+def cohort(class_id, major_id) -> CohortGrades:
+    return CohortGrades(np.arange(len(class_id)), class_id, major_id, [], [], [], [])
+
+
+def test_rank_uses_competition_ties_within_groups():
+    grades = cohort(class_id=[1, 1, 1, 1, 2, 2, 2], major_id=[5, 6, 5, 6, 5, 6, 5])
+    values = np.array([3.5, 4.0, 3.5, 2.0, 3.0, 3.0, 1.0])
+    assert grades.rank(values=values).tolist() == [2, 1, 2, 6, 4, 4, 7]
+    assert grades.rank('class', values).tolist() == [2, 1, 2, 4, 1, 1, 3]
+    assert grades.rank('major', values).tolist() == [1, 1, 1, 3, 3, 2, 4]
+
+
+def test_rank_defaults_to_gpa(cohort_students):
+    grades = CohortGrades.from_students(cohort_students)
+    gpas = [s.gpa for s in cohort_students]
+    expected = [1 + sum(other > gpa for other in gpas) for gpa in gpas]
+    assert grades.rank().tolist() == expected
+
+
+def test_course_stats_match_numpy(cohort_students):
+    grades = CohortGrades.from_students(cohort_students)
+    stats = grades.course_stats(percentiles=(10, 25, 50, 90))
+    for i, course_id in enumerate(stats['course_id'].tolist()):
+        scores = grades.score[grades.course_id == course_id]
+        assert stats['count'][i] == len(scores)
+        assert stats['mean'][i] == pytest.approx(scores.mean())
+        assert stats['std'][i] == pytest.approx(np.std(scores))
+        for q in (10, 25, 50, 90):
+            assert stats[f'p{q}'][i] == pytest.approx(np.percentile(scores, q))
+    assert sorted(stats['course_id'].tolist()) == sorted(set(grades.course_id.tolist()))
+
+
+def test_histogram_matches_numpy(cohort_students):
+    grades = CohortGrades.from_students(cohort_students)
+    bins = (0, 60, 70, 80, 90, 100)
+    courses, counts = grades.histogram(bins)
+    for course_id, row in zip(courses.tolist(), counts):
+        expected, _ = np.histogram(grades.score[grades.course_id == course_id], bins=bins)
+        assert row.tolist() == expected.tolist()
+    # The last bin is closed: a perfect score counts in 90-100.
+    assert CohortGrades([1], [1], [1], [0, 0], [1, 1], [3, 3], [100.0, 59.95]).histogram(bins)[1].tolist() == [
+        [1, 0, 0, 0, 1]]
+
+
+def test_mismatched_columns_are_rejected():
+    with pytest.raises(ValueError):
+        CohortGrades([1, 2], [1], [1], [], [], [], [])
+    with pytest.raises(ValueError):
+        CohortGrades([1], [1], [1], [0], [1], [3], [])
@@ -0,0 +1,90 @@
+import json
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+
+from f3re.academic import main
+from f3re.academic.model import Grade
+from f3re.academic.store.cache import CachedStudentStore
+from f3re.academic.store.json_mapper import EnhancedJSONEncoder
+
+from factories import make_course, make_student
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, 'DB_PATH', str(tmp_path / 'academic.sqlite'))
+    with TestClient(main.app) as client:
+        yield client
+
+
+def encode(obj) -> dict:
+    return json.loads(json.dumps(obj, cls=EnhancedJSONEncoder))
+
+
+def test_create_and_get_student(client, students):
+    body = encode(students[1])
+    assert client.post('/students', json=body).status_code == 201
+    response = client.get(f'/students/{students[1].student_id}')
+    assert response.status_code == 200
+    assert response.json()['grades'] == body['grades']
+
+
+def test_duplicate_student_is_a_conflict(client):
+    body = encode(make_student())
+    assert client.post('/students', json=body).status_code == 201
+    assert client.post('/students', json=body).status_code == 409
+
+
+@pytest.mark.parametrize('field, value', [
+    ('phone', '13912345678'),
+    ('grades', {'not': 'a list'}),
+    ('grades', [{'score': 90}]),
+    ('family_members', ['Parent']),
+    ('major', [1, 2]),
+    ('class_id', '1'),
+])
+def test_mistyped_nested_fields_are_rejected(client, field, value):
+    body = encode(make_student())
+    body[field] = value
+    response = client.post('/students', json=body)
+    assert response.status_code == 422
+    assert client.get('/students/2024000001').status_code == 404
+
+
+def test_other_constraint_failures_are_unprocessable(client, monkeypatch):
+    def create(self, stu):
+        raise sqlite3.IntegrityError('FOREIGN KEY constraint failed')
+    monkeypatch.setattr(CachedStudentStore, 'create', create)
+    response = client.post('/students', json=encode(make_student()))
+    assert response.status_code == 422
+    assert 'FOREIGN KEY' in response.json()['detail']
+
+
+def timetable_courses(client, path: str) -> list:
+    response = client.get(path, params={'week': 1})
+    assert response.status_code == 200
+    return [o['course_id'] for o in response.json()['occurrences']]
+
+
+def test_new_courses_of_a_created_student_reach_the_timetables(client):
+    assert timetable_courses(client, '/classes/1/timetable') == []
+    assert 'BEGIN:VEVENT' not in client.get('/classes/1/calendar.ics').text
+    student = make_student(grades=[Grade(course=make_course(7), score=90.0)])
+    assert client.post('/students', json=encode(student)).status_code == 201
+    assert timetable_courses(client, '/classes/1/timetable') == [7]
+    assert timetable_courses(client, '/teachers/1/timetable') == [7]
+    assert 'UID:course-7-slot-0@f3re' in client.get(f'/students/{student.student_id}/calendar.ics').text
+
+
+def test_new_courses_of_added_grades_and_updates_reach_the_timetables(client):
+    student = make_student(grades=[Grade(course=make_course(7), score=90.0)])
+    assert client.post('/students', json=encode(student)).status_code == 201
+    assert timetable_courses(client, f'/students/{student.student_id}/timetable') == [7]
+    grade = Grade(course=make_course(8), score=80.0)
+    assert client.post(f'/students/{student.student_id}/grades', json=encode(grade)).status_code == 201
+    assert timetable_courses(client, '/classes/1/timetable') == [7, 8]
+    student.grades.append(Grade(course=make_course(9), score=70.0))
+    assert client.put(f'/students/{student.student_id}', json=encode(student)).status_code == 200
+    assert timetable_courses(client, '/classes/1/timetable') == [7, 8, 9]
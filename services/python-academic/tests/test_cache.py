@@ -0,0 +1,86 @@
+import pytest
+
+from f3re.academic.store.cache import CachedStudentStore, StudentCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lru_eviction_and_stats(students):
+    cache = StudentCache(maxsize=2)
+    for student in students[:3]:
+        cache.put(student.student_id, student)
+    assert cache.get(students[0].student_id) is None
+    assert cache.get(students[2].student_id) is students[2]
+    stats = cache.stats()
+    assert (stats['size'], stats['evictions'], stats['hits'], stats['misses']) == (2, 1, 1, 1)
+
+
+def test_entries_expire_after_ttl(students):
+    clock = FakeClock()
+    cache = StudentCache(ttl=10, clock=clock)
+    cache.put(1, students[0])
+    clock.now = 10
+    assert cache.get(1) is students[0]
+    clock.now = 10.5
+    assert cache.get(1) is None
+    assert cache.stats()['expirations'] == 1
+
+
+def test_load_does_not_cache_a_value_read_before_an_invalidation(students):
+    cache = StudentCache()
+    old, new = students[0], students[1]
+
+    def stale_loader():
+        # A write lands while the loader is still reading the old row.
+        cache.invalidate(1)
+        return old
+
+    assert cache.load(1, stale_loader) is old
+    assert cache.get(1) is None
+    assert cache.load(1, lambda: new) is new
+    assert cache.get(1) is new
+
+
+def test_load_many_skips_stale_puts(students):
+    cache = StudentCache()
+
+    def loader(keys):
+        cache.clear()
+        return {key: students[0] for key in keys}
+
+    assert set(cache.load_many([1, 2], loader)) == {1, 2}
+    assert len(cache) == 0
+    assert cache.load_many([1, 2], lambda keys: {key: students[1] for key in keys}) == {1: students[1],
+                                                                                        2: students[1]}
+    assert len(cache) == 2
+
+
+def test_put_with_stale_generation_is_ignored(students):
+    cache = StudentCache()
+    generation = cache.generation
+    cache.invalidate(1)
+    cache.put(1, students[0], generation)
+    assert len(cache) == 0
+
+
+@pytest.fixture
+def cached_store():
+    with CachedStudentStore(':memory:') as store:
+        store.create_table()
+        yield store
+
+
+def test_cached_store_invalidates_on_write(cached_store, students):
+    student = students[1]
+    cached_store.create(student)
+    assert cached_store.find_by_id(student.student_id) is cached_store.find_by_id(student.student_id)
+    cached_store.remove_grade(student.student_id, student.grades[0].course.course_id)
+    assert cached_store.find_by_id(student.student_id).grades == student.grades[1:]
+    cached_store.delete(student.student_id)
+    assert cached_store.find_by_id(student.student_id) is None
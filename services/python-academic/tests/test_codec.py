@@ -0,0 +1,60 @@
+import datetime as dt
+import json
+
+import pytest
+
+from f3re.academic.model import Course, DayOfWeek, Phone, Repetition, Student, TimeSlot
+from f3re.academic.store.codec import get_codec
+from f3re.academic.store.json_mapper import EnhancedJSONDecoder, EnhancedJSONEncoder
+
+
+def roundtrip(obj, trusted: bool = False):
+    return json.loads(json.dumps(obj, cls=EnhancedJSONEncoder), cls=EnhancedJSONDecoder, trusted=trusted)
+
+
+def test_codec_is_compiled_once_per_class():
+    assert get_codec('Student') is get_codec('Student')
+    assert get_codec('NotRegistered') is None
+
+
+def test_encode_converts_enums_times_and_sets(courses):
+    dct = get_codec('TimeSlot').encode(courses[0].time_slots[0])
+    assert dct == {'day': 'TUESDAY', 'start_time': '09:00:00', 'end_time': '10:45:00',
+                   'repetition': 'WEEKLY', '__type__': 'TimeSlot'}
+    assert isinstance(get_codec('Course').encode(courses[0])['class_id'], list)
+
+
+def test_teacher_back_references_are_not_encoded(courses):
+    assert 'courses' not in get_codec('Teacher').encode(courses[0].teacher)
+
+
+@pytest.mark.parametrize('trusted', [False, True])
+def test_student_roundtrip(students, trusted):
+    student = students[-1]
+    decoded = roundtrip(student, trusted)
+    assert isinstance(decoded, Student)
+    assert decoded == student
+    assert decoded.grades == student.grades
+    assert isinstance(decoded.grades[0].course, Course)
+    assert decoded.grades[0].course.class_id == student.grades[0].course.class_id
+    assert isinstance(decoded.grades[0].course.time_slots, tuple)
+
+
+def test_decode_validates_unless_trusted():
+    data = json.dumps({'__type__': 'Phone', 'value': '123'})
+    with pytest.raises(ValueError):
+        json.loads(data, cls=EnhancedJSONDecoder)
+    assert json.loads(data, cls=EnhancedJSONDecoder, trusted=True) == Phone.trusted(value='123')
+
+
+def test_decode_rejects_unknown_enum_names():
+    data = json.dumps({'__type__': 'TimeSlot', 'day': 'FUNDAY', 'start_time': '08:00:00',
+                       'end_time': '09:00:00', 'repetition': 'WEEKLY'})
+    with pytest.raises(KeyError):
+        json.loads(data, cls=EnhancedJSONDecoder)
+
+
+def test_time_slot_roundtrip():
+    slot = TimeSlot.trusted(day=DayOfWeek.FRIDAY, start_time=dt.time(14),
+                            end_time=dt.time(15, 30), repetition=Repetition.BIWEEKLY_EVEN)
+    assert roundtrip(slot) == slot
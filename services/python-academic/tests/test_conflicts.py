@@ -0,0 +1,103 @@
+import dataclasses
+import datetime as dt
+
+import pytest
+
+from f3re.academic.model import DayOfWeek, Repetition, TimeSlot
+from f3re.academic.schedule import ScheduleIndex, slots_conflict
+
+from factories import make_course, make_slot, make_teacher
+
+ODD, EVEN, WEEKLY = Repetition.BIWEEKLY_ODD, Repetition.BIWEEKLY_EVEN, Repetition.WEEKLY
+
+
+def slot(start: int, end: int, repetition: Repetition = WEEKLY, day: DayOfWeek = DayOfWeek.MONDAY) -> TimeSlot:
+    """A slot from `start` to `end`, given in minutes after 8:00."""
+    def time(minutes):
+        return dt.time(8 + minutes // 60, minutes % 60)
+    return TimeSlot(day=day, start_time=time(start), end_time=time(end), repetition=repetition)
+
+
+@pytest.mark.parametrize('a, b, expected', [
+    (ODD, EVEN, False),
+    (ODD, ODD, True),
+    (WEEKLY, ODD, True),
+    (EVEN, WEEKLY, True),
+    (WEEKLY, WEEKLY, True),
+])
+def test_parity(a, b, expected):
+    assert slots_conflict(slot(0, 90, a), slot(30, 120, b)) is expected
+
+
+def test_touching_and_other_day_slots_do_not_conflict():
+    assert not slots_conflict(slot(0, 90), slot(90, 180))
+    assert not slots_conflict(slot(90, 180), slot(0, 90))
+    assert slots_conflict(slot(0, 91), slot(90, 180))
+    assert not slots_conflict(slot(0, 90), slot(0, 90, day=DayOfWeek.TUESDAY))
+
+
+def course(course_id, *slots, teacher_id=None, class_ids=(1,), location=None):
+    built = make_course(course_id, teacher=make_teacher(teacher_id or course_id), class_ids=class_ids, slots=slots)
+    return dataclasses.replace(built, location=location) if location else built
+
+
+def test_conflicts_with_respects_parity_and_touching():
+    index = ScheduleIndex([course(1, slot(0, 90, ODD)), course(2, slot(90, 180)), course(3, slot(0, 60, EVEN))])
+    assert index.conflicts_with(course(9, slot(30, 100, ODD))) == {1, 2}
+    assert index.conflicts_with(course(9, slot(30, 100, EVEN))) == {2, 3}
+    assert index.conflicts_with(course(9, slot(60, 90, EVEN))) == set()
+    assert index.conflicts_with(course(9, slot(0, 300)), among=[2, 7]) == {2}
+    # A course does not conflict with its own indexed version.
+    assert index.conflicts_with(course(2, slot(90, 180))) == set()
+
+
+def test_remove_then_conflicts_with():
+    index = ScheduleIndex([course(1, slot(0, 90)), course(2, slot(60, 120))])
+    assert index.remove(1).course_id == 1
+    assert 1 not in index and len(index) == 1
+    assert index.conflicts_with(course(9, slot(0, 30))) == set()
+    assert index.conflicts_with(course(9, slot(100, 110))) == {2}
+    assert index.remove(1) is None
+
+
+def test_add_replaces_a_course_with_the_same_id():
+    index = ScheduleIndex([course(1, slot(0, 90))])
+    index.add(course(1, slot(200, 260)))
+    assert index.conflicts_with(course(9, slot(0, 90))) == set()
+    assert index.conflicts_with(course(9, slot(210, 220))) == {1}
+
+
+def test_removing_the_longest_slot_narrows_the_scan():
+    index = ScheduleIndex([course(1, slot(0, 600)), course(2, slot(0, 60)), course(3, slot(300, 330))])
+    assert index._all._max_length == 600 * 60
+    index.remove(1)
+    assert index._all._max_length == 60 * 60
+    assert index.conflicts_with(course(9, slot(30, 40))) == {2}
+    assert index.conflicts_with(course(9, slot(310, 320))) == {3}
+    index.remove(2)
+    index.remove(3)
+    assert index._all._max_length == 0
+
+
+def test_double_booked():
+    index = ScheduleIndex([
+        course(1, slot(0, 90), teacher_id=1, class_ids=(1, 2), location='A'),
+        course(2, slot(60, 150), teacher_id=1, class_ids=(2,), location='B'),
+        course(3, slot(60, 150, ODD), teacher_id=3, class_ids=(3,), location='A'),
+        course(4, slot(0, 90, EVEN), teacher_id=4, class_ids=(3,), location='C'),
+        course(5, slot(90, 150), teacher_id=1, class_ids=(1,), location='A'),
+    ])
+    assert index.double_booked_classes() == [(2, 1, 2)]
+    assert index.double_booked_teachers() == [(1, 1, 2), (1, 2, 5)]
+    assert index.double_booked_rooms() == [('A', 1, 3), ('A', 3, 5)]
+
+
+def test_is_free():
+    index = ScheduleIndex([course(1, make_slot(hour=8), teacher_id=7, class_ids=(4,), location='Lab')])
+    assert not index.is_room_free('Lab', make_slot(hour=9))
+    assert index.is_room_free('Lab', make_slot(hour=9), exclude=1)
+    assert index.is_room_free('Hall', make_slot(hour=9))
+    assert not index.is_teacher_free(7, make_slot(hour=9))
+    assert index.is_teacher_free(7, make_slot(hour=10))
+    assert not index.is_class_free(4, make_slot(hour=8, repetition=ODD))
+    assert index.is_class_free(5, make_slot(hour=8))
@@ -0,0 +1,115 @@
+from contextlib import ExitStack
+import sqlite3
+import threading
+
+import pytest
+
+from f3re.academic.store.connection import DEFAULT_PROFILE, ROLLBACK_PROFILE, ConnectionManager, SQLiteProfile
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = ConnectionManager(str(tmp_path / 'db.sqlite'), readers=2)
+    with manager.writer() as conn, conn:
+        conn.execute('create table t (x integer)')
+        conn.execute('insert into t values (1)')
+    yield manager
+    manager.close()
+
+
+def pragma(conn: sqlite3.Connection, name: str):
+    return conn.execute(f'pragma {name}').fetchone()[0]
+
+
+def test_default_profile_is_applied(manager):
+    with manager.writer() as conn:
+        assert pragma(conn, 'journal_mode') == 'wal'
+        assert pragma(conn, 'synchronous') == 1
+        assert pragma(conn, 'busy_timeout') == DEFAULT_PROFILE.busy_timeout_ms
+        assert pragma(conn, 'cache_size') == -DEFAULT_PROFILE.cache_size_kib
+        assert pragma(conn, 'foreign_keys') == 1
+        assert pragma(conn, 'query_only') == 0
+    with manager.reader() as conn:
+        assert pragma(conn, 'journal_mode') == 'wal'
+        assert pragma(conn, 'synchronous') == 1
+        assert pragma(conn, 'query_only') == 1
+
+
+def test_rollback_profile_is_applied(tmp_path):
+    manager = ConnectionManager(str(tmp_path / 'db.sqlite'), ROLLBACK_PROFILE)
+    try:
+        with manager.writer() as conn:
+            assert pragma(conn, 'journal_mode') == 'delete'
+            assert pragma(conn, 'synchronous') == 2
+            assert pragma(conn, 'mmap_size') == 0
+    finally:
+        manager.close()
+
+
+def test_invalid_profiles_are_rejected():
+    with pytest.raises(ValueError):
+        SQLiteProfile(journal_mode='fast')
+    with pytest.raises(ValueError):
+        SQLiteProfile(synchronous='sometimes')
+    with pytest.raises(ValueError):
+        ConnectionManager(':memory:', readers=0)
+
+
+def test_readers_reject_writes(manager):
+    with manager.reader() as conn:
+        with pytest.raises(sqlite3.OperationalError, match='readonly'):
+            conn.execute('insert into t values (2)')
+    with manager.reader() as conn:
+        assert conn.execute('select count(*) from t').fetchone()[0] == 1
+
+
+def test_readers_see_one_snapshot(manager):
+    with manager.reader() as conn:
+        assert conn.execute('select count(*) from t').fetchone()[0] == 1
+        # WAL lets the writer commit while the read transaction is open.
+        with manager.writer() as writer, writer:
+            writer.execute('insert into t values (2)')
+        assert conn.execute('select count(*) from t').fetchone()[0] == 1
+    with manager.reader() as conn:
+        assert conn.execute('select count(*) from t').fetchone()[0] == 2
+
+
+def test_reader_pool_is_bounded(manager):
+    entered = threading.Event()
+
+    def read():
+        with manager.reader() as conn:
+            conn.execute('select 1')
+            entered.set()
+
+    with ExitStack() as stack:
+        held = {id(stack.enter_context(manager.reader())) for _ in range(2)}
+        assert len(held) == 2
+        thread = threading.Thread(target=read)
+        thread.start()
+        assert not entered.wait(0.2)
+    thread.join(5)
+    assert entered.is_set()
+    # The third reader reused an idle connection instead of opening another.
+    assert len(manager._opened) == 2
+
+
+def test_memory_databases_read_through_the_writer():
+    manager = ConnectionManager(':memory:')
+    try:
+        with manager.writer() as conn, conn:
+            conn.execute('create table t (x integer)')
+            writer = conn
+        with manager.reader() as conn:
+            assert conn is writer
+            assert conn.execute('select count(*) from t').fetchone()[0] == 0
+        assert manager._opened == []
+    finally:
+        manager.close()
+
+
+def test_closed_manager_refuses_connections(manager):
+    manager.close()
+    with pytest.raises(ConnectionError):
+        with manager.writer():
+            pass
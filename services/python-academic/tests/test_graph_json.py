@@ -0,0 +1,39 @@
+import json
+
+import pytest
+
+from f3re.academic.store.json_mapper import students_from_graph_json, students_to_graph_json
+
+
+@pytest.mark.parametrize('trusted', [False, True])
+def test_graph_roundtrip_shares_courses_and_teachers(students, trusted):
+    decoded = students_from_graph_json(students_to_graph_json(students), trusted=trusted)
+    assert decoded == students
+    assert [s.grades for s in decoded] == [s.grades for s in students]
+    first = {grade.course.course_id: grade.course for grade in decoded[-1].grades}
+    for student in decoded:
+        for grade in student.grades:
+            assert grade.course is first[grade.course.course_id]
+    teachers = {id(course.teacher) for course in first.values()}
+    assert len(teachers) == len({course.teacher.teacher_id for course in first.values()})
+
+
+def test_graph_emits_each_course_once(students):
+    document = json.loads(students_to_graph_json(students))
+    course_ids = [course['course_id'] for course in document['courses']]
+    assert len(course_ids) == len(set(course_ids))
+    assert all(set(grade['course']) == {'__ref__', 'id'} for s in document['students'] for grade in s['grades'])
+
+
+def test_graph_rejects_other_documents(students):
+    with pytest.raises(ValueError):
+        students_from_graph_json(json.dumps({'students': []}))
+    document = json.loads(students_to_graph_json(students))
+    document['courses'] = []
+    with pytest.raises(ValueError, match='Unresolved reference'):
+        students_from_graph_json(json.dumps(document))
+
+
+def test_graph_requires_students():
+    with pytest.raises(TypeError):
+        students_to_graph_json(['not a student'])
@@ -0,0 +1,117 @@
+import dataclasses
+import datetime as dt
+import io
+import zipfile
+
+import pytest
+
+from f3re.academic.model import DayOfWeek, Repetition
+from f3re.academic.schedule import Semester, TimetableCache, course_events, iter_calendar, write_student_calendars
+from f3re.academic.schedule.ical import _fold
+
+from factories import make_course, make_slot
+
+STAMP = dt.datetime(2024, 8, 1, 12, 0)
+# Starts on a Monday: every slot meets from week 1.
+SEMESTER = Semester(dt.date(2024, 9, 2), weeks=18)
+
+
+def unfold(text: str) -> str:
+    return text.replace('\r\n ', '')
+
+
+def event_lines(course, semester=SEMESTER):
+    (event,) = course_events([course], semester, STAMP)
+    return unfold(event).split('\r\n')[:-1]
+
+
+def prop(lines, name):
+    (value,) = [line.partition(':')[2] for line in lines if line.partition(':')[0] == name]
+    return value
+
+
+@pytest.mark.parametrize('line', [
+    'X' * 75,
+    'X' * 76,
+    'SUMMARY:' + 'X' * 200,
+    'SUMMARY:' + '线性代数' * 20,
+    'SUMMARY:' + 'é' * 100,
+    'SUMMARY:X' + '🙂' * 30,
+])
+def test_fold_keeps_lines_within_75_octets(line):
+    folded = _fold(line)
+    assert folded.endswith('\r\n')
+    physical = folded[:-2].split('\r\n')
+    assert all(len(part.encode('utf-8')) <= 75 for part in physical)
+    assert all(part.startswith(' ') for part in physical[1:])
+    assert unfold(folded) == line + '\r\n'
+    # Only the last line is short; the others are cut no more than a UTF-8 sequence before the limit.
+    assert all(len(part.encode('utf-8')) > 75 - 4 for part in physical[:-1])
+
+
+def test_fold_leaves_short_lines_alone():
+    assert _fold('X' * 75) == 'X' * 75 + '\r\n'
+    assert _fold('SUMMARY:' + '数' * 22) == 'SUMMARY:' + '数' * 22 + '\r\n'  # 74 octets
+    assert _fold('SUMMARY:' + '数' * 23).count('\r\n') == 2
+
+
+@pytest.mark.parametrize('repetition, start, rrule', [
+    (Repetition.WEEKLY, '20240902T090000', 'FREQ=WEEKLY;COUNT=18'),
+    (Repetition.BIWEEKLY_ODD, '20240902T090000', 'FREQ=WEEKLY;INTERVAL=2;COUNT=9'),
+    (Repetition.BIWEEKLY_EVEN, '20240909T090000', 'FREQ=WEEKLY;INTERVAL=2;COUNT=9'),
+])
+def test_rrules(repetition, start, rrule):
+    lines = event_lines(make_course(1, slots=(make_slot(DayOfWeek.MONDAY, 9, repetition),)))
+    assert prop(lines, 'DTSTART') == start
+    assert prop(lines, 'DTEND') == start[:9] + '104500'
+    assert prop(lines, 'RRULE') == rrule
+    assert prop(lines, 'DTSTAMP') == '20240801T120000Z'
+
+
+def test_rrule_counts_from_a_mid_week_start():
+    semester = Semester(dt.date(2024, 9, 4), weeks=18)
+    lines = event_lines(make_course(1, slots=(make_slot(DayOfWeek.MONDAY, 9, Repetition.BIWEEKLY_ODD),)), semester)
+    assert (prop(lines, 'DTSTART'), prop(lines, 'RRULE')) == ('20240916T090000', 'FREQ=WEEKLY;INTERVAL=2;COUNT=8')
+
+
+def test_single_meetings_and_empty_slots():
+    semester = Semester(dt.date(2024, 9, 4), weeks=2)
+    once = make_course(1, slots=(make_slot(DayOfWeek.WEDNESDAY, 9, Repetition.BIWEEKLY_ODD),))
+    never = make_course(2, slots=(make_slot(DayOfWeek.MONDAY, 9, Repetition.BIWEEKLY_ODD),))
+    assert not any(line.startswith('RRULE') for line in event_lines(once, semester))
+    assert list(course_events([never], semester, STAMP)) == []
+
+
+def test_text_is_escaped_and_every_slot_is_an_event():
+    course = make_course(3, slots=(make_slot(DayOfWeek.MONDAY, 9), make_slot(DayOfWeek.THURSDAY, 14)))
+    course = dataclasses.replace(course, name='Algebra; part 1, proofs', location='Room\\101', credit=2)
+    events = list(course_events([course], SEMESTER, STAMP))
+    assert len(events) == 2
+    lines = unfold(events[1]).split('\r\n')
+    assert prop(lines, 'UID') == 'course-3-slot-1@f3re'
+    assert prop(lines, 'SUMMARY') == r'Algebra\; part 1\, proofs'
+    assert prop(lines, 'LOCATION') == r'Room\\101'
+    assert prop(lines, 'DESCRIPTION') == r'Teacher 1\, 2 credits'
+    calendar = ''.join(iter_calendar(events, 'Class 1'))
+    assert calendar.startswith('BEGIN:VCALENDAR\r\n') and calendar.endswith('END:VCALENDAR\r\n')
+    assert calendar.count('BEGIN:VEVENT') == 2
+
+
+def test_write_student_calendars(students, courses):
+    timetables = TimetableCache(SEMESTER)
+    loads = []
+
+    def load_class(class_id):
+        loads.append(class_id)
+        return [course for course in courses if class_id in course.class_id]
+
+    out = io.BytesIO()
+    assert write_student_calendars(iter(students), timetables, load_class, out) == len(students)
+    assert sorted(loads) == [1, 2]
+    with zipfile.ZipFile(out) as archive:
+        assert archive.namelist() == [f'{s.student_id}.ics' for s in students]
+        for student in students:
+            calendar = unfold(archive.read(f'{student.student_id}.ics').decode('utf-8'))
+            assert f'X-WR-CALNAME:{student.name} ({student.student_id})' in calendar
+            expected = sum(len(c.time_slots) for c in courses if student.class_id in c.class_id)
+            assert calendar.count('BEGIN:VEVENT') == expected
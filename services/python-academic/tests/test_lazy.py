@@ -0,0 +1,46 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import f3re.academic
+from f3re.academic import store
+
+SRC = os.path.dirname(os.path.dirname(os.path.dirname(f3re.academic.__file__)))
+HEAVY = ('sqlite3', 'numpy', 'fastapi')
+
+
+def loaded_after(code: str) -> set:
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join(filter(None, (SRC, os.environ.get('PYTHONPATH'))))}
+    script = f'import sys\n{code}\nprint(" ".join(m for m in {HEAVY!r} if m in sys.modules))'
+    output = subprocess.run([sys.executable, '-c', script], env=env, capture_output=True, text=True, check=True)
+    return set(output.stdout.split())
+
+
+def test_importing_the_packages_loads_no_heavy_dependencies():
+    assert loaded_after('import f3re.academic, f3re.academic.store') == set()
+    assert 'sqlite3' in loaded_after('from f3re.academic.store import StudentStore')
+
+
+def test_lazy_names_resolve():
+    from f3re.academic.store.db_mapper import STUDENT_DB, StudentStore
+    assert store.StudentStore is StudentStore
+    assert store.STUDENT_DB == STUDENT_DB
+    # The first lookup binds the name, so later ones skip the hook.
+    assert vars(store)['StudentStore'] is StudentStore
+    assert f3re.academic.db_mapper is sys.modules['f3re.academic.store.db_mapper']
+
+
+def test_dir_lists_lazy_names():
+    assert {'StudentStore', 'STUDENT_DB', 'get_reference_data'} <= set(dir(store))
+    assert {'models', 'store', 'json_mapper'} <= set(dir(f3re.academic))
+    assert set(store.__all__) <= set(dir(store))
+
+
+def test_unknown_names_raise_attribute_error():
+    with pytest.raises(AttributeError, match="'f3re.academic.store' has no attribute 'Missing'"):
+        store.Missing
+    with pytest.raises(AttributeError):
+        f3re.academic.missing
+    assert not hasattr(store, 'Missing')
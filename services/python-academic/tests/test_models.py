@@ -0,0 +1,63 @@
+import copy
+import pickle
+
+import pytest
+
+from f3re.academic.model import Phone, StudentTable
+from f3re.academic.model.base import FrozenSlots
+
+
+def test_student_table_rows_roundtrip(students):
+    table = StudentTable(students)
+    assert len(table) == len(students)
+    for i, student in enumerate(students):
+        assert table[i] == student
+        assert table[i].grades == student.grades
+        assert table[i].family_members == student.family_members
+    assert table[-1] == students[-1]
+    assert list(table) == students
+    with pytest.raises(IndexError):
+        table[len(students)]
+
+
+def test_student_table_lookup_by_id(students):
+    table = StudentTable(students)
+    student = students[2]
+    assert student.student_id in table
+    assert table.row_of(student.student_id) == 2
+    assert table.get(student.student_id) == student
+    assert table.row_of(1) is None and table.get(1) is None
+    assert 1 not in table
+
+
+def test_student_table_interns_courses(students, courses):
+    table = StudentTable(students)
+    assert table.courses == courses[:len(students)]
+    assert table[3].grades[0].course is table[2].grades[0].course
+
+
+def test_student_table_rejects_duplicates(students):
+    table = StudentTable(students[:2])
+    with pytest.raises(ValueError):
+        table.append(students[0])
+    assert len(table) == 2
+    with pytest.raises(ValueError):
+        StudentTable([students[0], students[0]])
+
+
+@pytest.mark.parametrize('copier', [lambda obj: pickle.loads(pickle.dumps(obj)), copy.deepcopy],
+                         ids=['pickle', 'deepcopy'])
+def test_slotted_models_copy(students, copier):
+    grade = students[-1].grades[0]
+    for obj in (grade, grade.course, grade.course.teacher, grade.course.time_slots[0], Phone('13912345678'),
+                students[-1]):
+        copied = copier(obj)
+        assert copied == obj and copied is not obj
+        assert type(copied) is type(obj)
+        if isinstance(obj, FrozenSlots):
+            assert not hasattr(copied, '__dict__')
+    copied = copier(grade)
+    assert copied.course.course_id == grade.course.course_id
+    assert copied.course.class_id == grade.course.class_id
+    with pytest.raises(AttributeError):
+        copied.score = 0.0
@@ -0,0 +1,53 @@
+import io
+import json
+
+import pytest
+
+from f3re.academic.store.json_mapper import iter_students_from_ndjson, write_students_ndjson
+
+
+@pytest.mark.parametrize('compress', [False, True])
+def test_ndjson_roundtrip_binary(students, compress):
+    buffer = io.BytesIO()
+    assert write_students_ndjson(iter(students), buffer, compress=compress) == len(students)
+    assert not buffer.closed
+    buffer.seek(0)
+    decoded = list(iter_students_from_ndjson(buffer, compress=compress, trusted=True))
+    assert decoded == students
+    assert [s.grades for s in decoded] == [s.grades for s in students]
+
+
+def test_ndjson_text_stream_one_record_per_line(students):
+    stream = io.StringIO()
+    write_students_ndjson(students, stream)
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == len(students)
+    assert json.loads(lines[0])['student_id'] == students[0].student_id
+    stream = io.StringIO('\n' + stream.getvalue() + '\n\n')
+    assert list(iter_students_from_ndjson(stream)) == students
+
+
+def test_ndjson_reader_is_lazy(students):
+    stream = io.StringIO()
+    write_students_ndjson(students[:1], stream)
+    stream = io.StringIO(stream.getvalue() + '{"not": "a student"}\n')
+    records = iter_students_from_ndjson(stream)
+    assert next(records) == students[0]
+    with pytest.raises(ValueError, match='Line 2'):
+        next(records)
+
+
+def test_compressed_ndjson_needs_binary_file(students):
+    with pytest.raises(ValueError):
+        write_students_ndjson(students, io.StringIO(), compress=True)
+    with pytest.raises(TypeError):
+        write_students_ndjson(['x'], io.StringIO())
+
+
+def test_ndjson_text_file_is_flushed(students, tmp_path):
+    path = tmp_path / 'students.ndjson'
+    with open(path, 'w', encoding='utf-8') as f:
+        write_students_ndjson(students, f)
+        assert not f.closed
+        # Read through another handle while the writer is still open.
+        assert len(path.read_text(encoding='utf-8').splitlines()) == len(students)
@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+from f3re.academic.model import Grade, StudentTable
+from f3re.academic.store.class_based_demo import StudentRepository, student_from_row
+from f3re.academic.store.parallel import iter_student_tables_parallel, iter_students_parallel
+
+from factories import make_course, make_student
+
+
+@pytest.fixture(scope='module', params=['json', 'binary'])
+def db(request, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp(request.param) / 'repo.sqlite')
+    rng = random.Random(7)
+    courses = [make_course(i, credit=1 + i % 5) for i in range(1, 6)]
+    ids = rng.sample(range(2024000000, 2024001000), 23)
+    students = [make_student(student_id, [Grade(course=course, score=rng.randint(0, 100))
+                                          for course in rng.sample(courses, rng.randint(0, len(courses)))],
+                             class_id=1 + i % 3)
+                for i, student_id in enumerate(ids)]
+    with StudentRepository(path, serializer=request.param) as repo:
+        repo.create_tables()
+        repo.add_many(students)
+        expected = repo.get_many(ids)
+    return path, [expected[student_id] for student_id in sorted(expected)]
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+@pytest.mark.parametrize('chunk_size', [1, 4, 100])
+def test_students_match_get_many_in_id_order(db, workers, chunk_size):
+    path, expected = db
+    students = list(iter_students_parallel(path, workers=workers, chunk_size=chunk_size))
+    assert students == expected
+    assert [s.grades for s in students] == [s.grades for s in expected]
+
+
+def test_tables_cover_the_students_in_chunks(db):
+    path, expected = db
+    tables = list(iter_student_tables_parallel(path, workers=2, chunk_size=5))
+    assert all(isinstance(table, StudentTable) for table in tables)
+    assert [len(table) for table in tables] == [5, 5, 5, 5, 3]
+    assert [student for table in tables for student in table] == expected
+
+
+def test_empty_table_and_bad_chunk_size(tmp_path):
+    path = str(tmp_path / 'empty.sqlite')
+    with StudentRepository(path) as repo:
+        repo.create_tables()
+    assert list(iter_students_parallel(path, workers=2)) == []
+    with pytest.raises(ValueError):
+        list(iter_students_parallel(path, chunk_size=0))
+
+
+def test_student_from_row_reads_both_formats(tmp_path, students):
+    for serializer in ('json', 'binary'):
+        repo = StudentRepository(str(tmp_path / f'{serializer}.sqlite'), serializer=serializer)
+        student = student_from_row(repo._to_row(students[-1]))
+        assert student == students[-1] and student.grades == students[-1].grades
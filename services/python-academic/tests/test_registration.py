@@ -0,0 +1,165 @@
+from concurrent.futures import ThreadPoolExecutor
+import dataclasses
+
+import pytest
+
+from f3re.academic.model import DayOfWeek
+from f3re.academic.store.db_mapper import StudentStore
+from f3re.academic.store.registration import Registrar, RegistrationStatus
+
+from factories import make_course, make_slot, make_student
+
+STUDENTS = [2024000001 + i for i in range(6)]
+# Courses 1 and 2 overlap on Monday morning; course 3 is on Tuesday.
+MONDAY_9, MONDAY_10, TUESDAY_9 = 1, 2, 3
+
+
+@pytest.fixture
+def store(tmp_path):
+    with StudentStore(str(tmp_path / 'store.sqlite')) as store:
+        store.create_table()
+        for course_id, day, hour in ((MONDAY_9, DayOfWeek.MONDAY, 9), (MONDAY_10, DayOfWeek.MONDAY, 10),
+                                     (TUESDAY_9, DayOfWeek.TUESDAY, 9)):
+            store.save_course(make_course(course_id, slots=(make_slot(day, hour),)))
+        for student_id in STUDENTS:
+            store.create(make_student(student_id))
+        yield store
+
+
+@pytest.fixture
+def registrar(store):
+    registrar = Registrar(store)
+    registrar.create_table()
+    return registrar
+
+
+def statuses(results):
+    return [result.status for result in results]
+
+
+def test_offer_requires_a_stored_course(registrar):
+    assert registrar.offer(MONDAY_9, 2) == []
+    assert registrar.seats(MONDAY_9) == (MONDAY_9, 2, 0, 0)
+    assert registrar.seats(TUESDAY_9) is None
+    with pytest.raises(KeyError):
+        registrar.offer(99, 2)
+    with pytest.raises(ValueError):
+        registrar.offer(MONDAY_9, -1)
+
+
+def test_register_until_full_then_waitlist(registrar):
+    registrar.offer(TUESDAY_9, 2)
+    results = [registrar.register(student_id, TUESDAY_9) for student_id in STUDENTS[:4]]
+    assert statuses(results) == [RegistrationStatus.ENROLLED] * 2 + [RegistrationStatus.WAITLISTED] * 2
+    assert [r.position for r in results[2:]] == [1, 2]
+    assert registrar.register(STUDENTS[0], TUESDAY_9).status is RegistrationStatus.ALREADY_ENROLLED
+    again = registrar.register(STUDENTS[3], TUESDAY_9)
+    assert (again.status, again.position) == (RegistrationStatus.ALREADY_WAITLISTED, 2)
+    assert registrar.register(STUDENTS[4], TUESDAY_9, waitlist=False).status is RegistrationStatus.FULL
+    seats = registrar.seats(TUESDAY_9)
+    assert (seats.enrolled, seats.waitlisted, seats.available) == (2, 2, 0)
+    assert registrar.roster(TUESDAY_9) == STUDENTS[:2]
+    assert registrar.waitlist(TUESDAY_9) == STUDENTS[2:4]
+
+
+def test_register_unknown_student_or_course(registrar):
+    registrar.offer(MONDAY_9, 1)
+    with pytest.raises(KeyError):
+        registrar.register(1, MONDAY_9)
+    with pytest.raises(KeyError):
+        registrar.register(STUDENTS[0], TUESDAY_9)
+
+
+def test_overlapping_courses_conflict(registrar):
+    for course_id in (MONDAY_9, MONDAY_10, TUESDAY_9):
+        registrar.offer(course_id, 5)
+    assert registrar.register(STUDENTS[0], MONDAY_9).status is RegistrationStatus.ENROLLED
+    result = registrar.register(STUDENTS[0], MONDAY_10)
+    assert (result.status, result.conflicts) == (RegistrationStatus.CONFLICT, frozenset({MONDAY_9}))
+    assert registrar.register(STUDENTS[0], TUESDAY_9).status is RegistrationStatus.ENROLLED
+    assert registrar.enrolled_courses(STUDENTS[0]) == [MONDAY_9, TUESDAY_9]
+    assert registrar.seats(MONDAY_10).enrolled == 0
+
+
+def test_drop_promotes_the_waitlist_in_order(registrar):
+    registrar.offer(TUESDAY_9, 1)
+    for student_id in STUDENTS[:3]:
+        registrar.register(student_id, TUESDAY_9)
+    assert registrar.drop(STUDENTS[0], TUESDAY_9)
+    assert registrar.roster(TUESDAY_9) == [STUDENTS[1]]
+    assert registrar.waitlist(TUESDAY_9) == [STUDENTS[2]]
+    # Leaving the waitlist frees no seat.
+    assert registrar.drop(STUDENTS[2], TUESDAY_9)
+    assert registrar.seats(TUESDAY_9) == (TUESDAY_9, 1, 1, 0)
+    assert not registrar.drop(STUDENTS[2], TUESDAY_9)
+    assert registrar.check_seats() == []
+
+
+def test_promotion_skips_students_with_new_conflicts(registrar):
+    registrar.offer(MONDAY_9, 1)
+    registrar.offer(MONDAY_10, 5)
+    registrar.register(STUDENTS[0], MONDAY_9)
+    registrar.register(STUDENTS[1], MONDAY_9)
+    registrar.register(STUDENTS[2], MONDAY_9)
+    # The first in line meanwhile enrolled in an overlapping course and loses their place.
+    registrar.register(STUDENTS[1], MONDAY_10)
+    registrar.drop(STUDENTS[0], MONDAY_9)
+    assert registrar.roster(MONDAY_9) == [STUDENTS[2]]
+    assert registrar.waitlisted_courses(STUDENTS[1]) == []
+
+
+def test_raising_capacity_promotes(registrar):
+    registrar.offer(TUESDAY_9, 1)
+    for student_id in STUDENTS[:4]:
+        registrar.register(student_id, TUESDAY_9)
+    assert registrar.offer(TUESDAY_9, 3) == STUDENTS[1:3]
+    assert registrar.waitlist(TUESDAY_9) == [STUDENTS[3]]
+    with pytest.raises(ValueError):
+        registrar.offer(TUESDAY_9, 2)
+    assert registrar.seats(TUESDAY_9).capacity == 3
+
+
+def test_withdraw_student_frees_every_place(registrar):
+    registrar.offer(MONDAY_9, 1)
+    registrar.offer(TUESDAY_9, 1)
+    registrar.register(STUDENTS[0], MONDAY_9)
+    registrar.register(STUDENTS[0], TUESDAY_9)
+    registrar.register(STUDENTS[1], TUESDAY_9)
+    registrar.register(STUDENTS[2], MONDAY_9)
+    assert registrar.withdraw_student(STUDENTS[0]) == 2
+    assert registrar.roster(MONDAY_9) == [STUDENTS[2]]
+    assert registrar.roster(TUESDAY_9) == [STUDENTS[1]]
+    assert registrar.enrolled_courses(STUDENTS[0]) == []
+    assert registrar.withdraw_student(STUDENTS[0]) == 0
+    assert registrar.check_seats() == []
+
+
+def test_check_seats_reports_wrong_counters(registrar, store):
+    registrar.offer(TUESDAY_9, 3)
+    registrar.register(STUDENTS[0], TUESDAY_9)
+    with store.connections.writer() as conn, conn:
+        conn.execute('update Course_Seats set Enrolled = 2 where Course_Id = ?', (TUESDAY_9,))
+    assert registrar.check_seats() == [(TUESDAY_9, 2, 1)]
+
+
+def test_invalidated_course_is_reloaded(registrar, store):
+    registrar.offer(MONDAY_9, 5)
+    registrar.offer(TUESDAY_9, 5)
+    registrar.register(STUDENTS[0], MONDAY_9)
+    # Indexes the Tuesday slot, which would otherwise be used for the check below.
+    assert registrar.register(STUDENTS[0], TUESDAY_9).status is RegistrationStatus.ENROLLED
+    registrar.drop(STUDENTS[0], TUESDAY_9)
+    moved = dataclasses.replace(store.find_course(TUESDAY_9), time_slots=(make_slot(DayOfWeek.MONDAY, 9),))
+    store.save_course(moved)
+    registrar.invalidate_course(TUESDAY_9)
+    assert registrar.register(STUDENTS[0], TUESDAY_9).status is RegistrationStatus.CONFLICT
+
+
+def test_concurrent_registrations_never_overbook(registrar):
+    registrar.offer(TUESDAY_9, 2)
+    with ThreadPoolExecutor(len(STUDENTS)) as pool:
+        results = list(pool.map(lambda student_id: registrar.register(student_id, TUESDAY_9), STUDENTS))
+    assert statuses(results).count(RegistrationStatus.ENROLLED) == 2
+    assert sorted(r.position for r in results if r.position) == [1, 2, 3, 4]
+    assert registrar.seats(TUESDAY_9) == (TUESDAY_9, 2, 2, 4)
+    assert registrar.check_seats() == []
@@ -0,0 +1,50 @@
+import json
+import sqlite3
+
+import pytest
+
+from f3re.academic.store import demo
+from f3re.academic.store.class_based_demo import StudentRepository
+from f3re.academic.store.json_mapper import EnhancedJSONEncoder
+
+
+@pytest.fixture(params=['json', 'binary'])
+def repo(request, tmp_path):
+    with StudentRepository(str(tmp_path / 'repo.sqlite'), serializer=request.param) as repo:
+        repo.create_tables()
+        yield repo
+
+
+def test_add_many_roundtrip(repo, students):
+    assert repo.add_many(students, chunk_size=3) == len(students)
+    ids = [s.student_id for s in students]
+    assert repo.get_many(ids + [1], batch_size=2) == {s.student_id: s for s in students}
+    assert repo.get_by_id(ids[-1]).grades == students[-1].grades
+
+
+def test_add_many_is_one_transaction(repo, students):
+    repo.add(students[2])
+    with pytest.raises(sqlite3.IntegrityError):
+        repo.add_many(students, chunk_size=2)
+    assert list(repo.get_many(s.student_id for s in students)) == [students[2].student_id]
+
+
+def test_add_many_rejects_bad_chunk_size(repo):
+    with pytest.raises(ValueError):
+        repo.add_many([], chunk_size=0)
+
+
+def test_memo_encoder_matches_plain_encoding(students):
+    encoder = EnhancedJSONEncoder(memo={})
+    for student in students:
+        assert encoder.encode(student.grades) == json.dumps(student.grades, cls=EnhancedJSONEncoder)
+
+
+def test_demo_insert_students(students):
+    conn = sqlite3.connect(':memory:')
+    demo.create_tables(conn)
+    assert demo.insert_students(conn, students, chunk_size=3) == len(students)
+    assert [demo.get_student_by_id(conn, s.student_id) for s in students] == students
+    with pytest.raises(sqlite3.IntegrityError):
+        demo.insert_students(conn, students[:1])
+    assert conn.execute('select count(*) from students').fetchone() == (len(students),)
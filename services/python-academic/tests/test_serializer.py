@@ -0,0 +1,77 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from f3re.academic.store.serializer import (
+    BinarySerializer, JSONSerializer, Serializer, get_serializer, load_value,
+)
+
+
+def test_serializer_is_abstract():
+    with pytest.raises(TypeError):
+        Serializer()
+
+    class DumpsOnly(Serializer):
+        name = 'partial'
+
+        def dumps(self, obj):
+            return ''
+
+    with pytest.raises(TypeError):
+        DumpsOnly()
+
+
+def test_get_serializer():
+    assert isinstance(get_serializer('binary'), BinarySerializer)
+    serializer = JSONSerializer()
+    assert get_serializer(serializer) is serializer
+    with pytest.raises(ValueError):
+        get_serializer('xml')
+
+
+@pytest.mark.parametrize('serializer', [JSONSerializer(), BinarySerializer()], ids=['json', 'binary'])
+@pytest.mark.parametrize('trusted', [False, True])
+def test_roundtrip(serializer, students, trusted):
+    for value in (students[-1], students[-1].grades, students[-1].phone, [1, 'Mathematics']):
+        data = serializer.dumps(value)
+        assert serializer.loads(data, trusted=trusted) == value
+        assert load_value(data, trusted=trusted) == value
+
+
+def test_binary_trusted_loads_share_courses(students):
+    serializer = BinarySerializer()
+    first, second = (serializer.loads(serializer.dumps(s.grades), trusted=True) for s in students[-2:])
+    assert first[0].course is second[0].course
+    assert serializer.loads(serializer.dumps(students[-1].grades))[0].course is not first[0].course
+
+
+def test_binary_shared_courses_are_bounded(students):
+    serializer = BinarySerializer(max_shared=2)
+    serializer.loads(serializer.dumps(students[-1].grades), trusted=True)
+    assert len(serializer._shared) <= 2
+
+
+def test_binary_shared_courses_across_threads(students):
+    serializer = BinarySerializer(max_shared=3)
+    blobs = [serializer.dumps(s.grades) for s in students] * 50
+    with ThreadPoolExecutor(8) as pool:
+        loaded = list(pool.map(lambda blob: serializer.loads(blob, trusted=True), blobs))
+    assert loaded == [s.grades for s in students] * 50
+    assert len(serializer._shared) <= 3
+
+
+def test_binary_blobs_record_the_python_version(students):
+    serializer = BinarySerializer()
+    data = serializer.dumps(students[0])
+    assert data[:1] == b'\x02'
+    # Version 1 blobs, without the Python version, are still read.
+    assert serializer.loads(b'\x01' + data[3:]) == students[0]
+
+
+def test_unreadable_blob_from_another_python_names_it():
+    with pytest.raises(ValueError, match='Python 2.7'):
+        BinarySerializer().loads(b'\x02\x02\x07' + b'\xff garbage')
+    with pytest.raises(ValueError, match='Corrupt'):
+        BinarySerializer().loads(BinarySerializer().dumps(1)[:3])
+    with pytest.raises(ValueError, match='Unsupported'):
+        BinarySerializer().loads(b'\x09')
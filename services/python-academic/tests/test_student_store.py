@@ -0,0 +1,117 @@
+import dataclasses
+
+import pytest
+
+from f3re.academic.model import Grade
+from f3re.academic.store.db_mapper import StudentStore
+from f3re.academic.store.reference import CourseInfo, ReferenceData
+
+from factories import make_student
+
+
+@pytest.fixture(params=['memory', 'file'])
+def store(request, tmp_path):
+    path = ':memory:' if request.param == 'memory' else str(tmp_path / 'store.sqlite')
+    with StudentStore(path) as store:
+        store.create_table()
+        yield store
+
+
+def test_create_and_find_roundtrip(store, students):
+    for student in students:
+        store.create(student)
+    assert store.find_by_id(students[-1].student_id) == students[-1]
+    found = store.find_many([s.student_id for s in students] + [1])
+    assert found == {s.student_id: s for s in students}
+    assert [s.grades for s in found.values()] == [s.grades for s in students]
+    assert store.find_by_id(1) is None
+
+
+def test_loaded_students_share_courses(store, students):
+    for student in students:
+        store.create(student)
+    found = store.find_many(s.student_id for s in students)
+    course_ids = {}
+    for student in found.values():
+        for grade in student.grades:
+            assert course_ids.setdefault(grade.course.course_id, grade.course) is grade.course
+
+
+def test_update_and_delete(store, students):
+    student = students[1]
+    store.create(student)
+    changed = dataclasses.replace(student, name='Renamed', grades=student.grades[:1])
+    store.update(changed)
+    assert store.find_by_id(student.student_id) == changed
+    assert store.find_by_id(student.student_id).grades == changed.grades
+    assert store.delete(student.student_id)
+    assert not store.delete(student.student_id)
+    with pytest.raises(KeyError):
+        store.update(changed)
+
+
+def test_writes_report_the_courses_they_add(store, students, courses):
+    assert store.create(students[0]) == courses[:1]
+    assert store.create(students[2]) == courses[1:3]
+    assert store.update(dataclasses.replace(students[0], grades=students[1].grades)) == []
+    assert store.add_grade(students[0].student_id, students[2].grades[2]) == []
+    assert store.add_grade(students[0].student_id, Grade(course=courses[4], score=80.0)) == [courses[4]]
+
+
+def test_save_course_replaces_the_stored_course(store, students):
+    student = students[0]
+    store.create(student)
+    course = dataclasses.replace(student.grades[0].course, name='Renamed', class_id=frozenset({7}))
+    store.save_course(course)
+    assert store.find_course(course.course_id) == course
+    assert store.find_courses_by_class(7) == [course]
+    assert store.find_by_id(student.student_id).grades[0].course.name == 'Renamed'
+
+
+def test_create_keeps_reference_major_names(store, students):
+    store.sync_reference_data(ReferenceData({1: 'Mathematics'}, {}))
+    store.create(make_student(2024000100, major=(1, 'Stale name')))
+    store.create(make_student(2024000101, major=(9, 'New major')))
+    assert store.find_by_id(2024000100).major == (1, 'Mathematics')
+    assert store.find_by_id(2024000101).major == (9, 'New major')
+
+
+def test_find_grades_by_course(store, students):
+    for student in students:
+        store.create(student)
+    course = students[0].grades[0].course
+    grades = store.find_grades_by_course(course.course_id)
+    expected = [(s.student_id, g) for s in students for g in s.grades if g.course.course_id == course.course_id]
+    assert grades == expected
+    assert store.find_grades_by_course(999) == []
+
+
+def test_sync_reference_data_updates_existing_courses(store, students):
+    store.create(students[0])
+    course = students[0].grades[0].course
+    majors, courses = store.sync_reference_data(ReferenceData(
+        {}, {course.course_id: CourseInfo(course.course_id, 'Catalogue name', course.credit),
+             999: CourseInfo(999, 'Unknown', 2)}))
+    assert courses == 1
+    assert store.find_course(course.course_id).name == 'Catalogue name'
+
+
+def test_closed_store_raises():
+    store = StudentStore(':memory:')
+    with pytest.raises(ConnectionError):
+        store.find_by_id(1)
+    with pytest.raises(ConnectionError):
+        store.create(make_student(grades=[]))
+
+
+def test_query_pages_follow_the_cursor(store):
+    for i in range(7):
+        store.create(make_student(2024000001 + i, class_id=1 + i % 2))
+    page = store.query_page(limit=2, class_id=1)
+    assert [s.student_id for s in page.students] == [2024000001, 2024000003]
+    page = store.query_page(page.next_after, limit=2, class_id=1)
+    assert [s.student_id for s in page.students] == [2024000005, 2024000007]
+    assert page.next_after is None
+    assert [s.student_id for s in store.query(page_size=3, class_id=2)] == [2024000002, 2024000004, 2024000006]
+    with pytest.raises(ValueError):
+        store.query_page(limit=0)
@@ -0,0 +1,139 @@
+import datetime as dt
+
+import pytest
+
+from f3re.academic.model import DayOfWeek, Repetition
+from f3re.academic.schedule import Semester, TimetableCache
+
+from factories import make_course, make_slot, make_teacher
+
+ODD, EVEN = Repetition.BIWEEKLY_ODD, Repetition.BIWEEKLY_EVEN
+# A Wednesday: the Monday and Tuesday of week 1 have no classes.
+START = dt.date(2024, 9, 4)
+
+
+@pytest.fixture
+def semester():
+    return Semester(START, weeks=4)
+
+
+def test_week_of_counts_from_the_first_monday(semester):
+    assert semester.first_monday == dt.date(2024, 9, 2)
+    assert semester.end == dt.date(2024, 9, 29)
+    assert semester.week_of(dt.date(2024, 9, 3)) is None
+    assert semester.week_of(START) == 1
+    assert semester.week_of(dt.date(2024, 9, 8)) == 1
+    assert semester.week_of(dt.date(2024, 9, 9)) == 2
+    assert semester.week_of(semester.end) == 4
+    assert semester.week_of(dt.date(2024, 9, 30)) is None
+
+
+def test_occurrence_skips_days_before_the_start(semester):
+    course = make_course(1)
+    monday, wednesday = make_slot(DayOfWeek.MONDAY, 9), make_slot(DayOfWeek.WEDNESDAY, 9)
+    assert semester.occurrence(course, monday, 1) is None
+    occurrence = semester.occurrence(course, wednesday, 1)
+    assert (occurrence.start, occurrence.end) == (dt.datetime(2024, 9, 4, 9), dt.datetime(2024, 9, 4, 10, 45))
+    assert (occurrence.week, occurrence.course, occurrence.date) == (1, course, START)
+    assert semester.occurrence(course, monday, 2).date == dt.date(2024, 9, 9)
+
+
+@pytest.mark.parametrize('repetition, weeks', [(ODD, [1, 3]), (EVEN, [2, 4]), (Repetition.WEEKLY, [1, 2, 3, 4])])
+def test_biweekly_parity(semester, repetition, weeks):
+    slot = make_slot(DayOfWeek.FRIDAY, 9, repetition)
+    assert [week for week in range(1, 5) if semester.occurrence(make_course(1), slot, week)] == weeks
+    assert semester.occurrences_of(slot) == (weeks[0], len(weeks))
+
+
+def test_occurrences_of_a_slot_before_the_start(semester):
+    assert semester.occurrences_of(make_slot(DayOfWeek.MONDAY, 9, ODD)) == (3, 1)
+    assert semester.occurrences_of(make_slot(DayOfWeek.MONDAY, 9)) == (2, 3)
+    assert Semester(START, weeks=1).occurrences_of(make_slot(DayOfWeek.MONDAY, 9)) == (None, 0)
+
+
+def test_week_is_chronological(semester):
+    late = make_course(1, slots=(make_slot(DayOfWeek.THURSDAY, 8), make_slot(DayOfWeek.FRIDAY, 8)))
+    early = make_course(2, slots=(make_slot(DayOfWeek.THURSDAY, 7),))
+    timetable = semester.week([late, early], 2)
+    assert [(o.course.course_id, o.date.day) for o in timetable] == [(2, 12), (1, 12), (1, 13)]
+    assert list(semester.expand([late], weeks=[2])) == [o for o in timetable if o.course is late]
+    with pytest.raises(ValueError):
+        semester.week([late], 5)
+
+
+class Loader:
+    def __init__(self, *courses):
+        self.courses = list(courses)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.courses
+
+
+def test_timetables_are_cached_until_invalidated(semester):
+    cache = TimetableCache(semester)
+    load = Loader(make_course(1, slots=(make_slot(DayOfWeek.FRIDAY, 9),)))
+    assert cache.class_week(1, 1, load) is cache.class_week(1, 1, load)
+    assert load.calls == 1
+    cache.invalidate_course(1)
+    assert len(cache.class_week(1, 1, load)) == 1
+    assert load.calls == 2
+    assert cache.stats()['invalidations'] == 1
+
+
+def test_stale_generation_is_not_cached(semester):
+    cache = TimetableCache(semester)
+    value, generation = cache._get((('class', 1), None))
+    assert value is None
+    cache.invalidate_course(9)
+    cache._put((('class', 1), None), (make_course(1),), generation)
+    assert len(cache) == 0
+
+
+def test_courses_loaded_during_an_invalidation_are_not_cached(semester):
+    cache = TimetableCache(semester)
+    course = make_course(1)
+
+    def load():
+        # The course is saved while its old version is being loaded.
+        cache.invalidate_course(course.course_id, course)
+        return [course]
+
+    assert cache.class_courses(1, load) == (course,)
+    assert len(cache) == 0
+
+
+def test_invalidate_course_drops_its_classes_and_teacher(semester):
+    cache = TimetableCache(semester)
+    shared = make_course(1, make_teacher(1), class_ids=(1, 2))
+    other = make_course(2, make_teacher(2), class_ids=(3,))
+    loads = {owner: Loader(*courses) for owner, courses in {
+        ('class', 1): [shared], ('class', 2): [shared], ('class', 3): [other],
+        ('teacher', 1): [shared], ('teacher', 2): [other]}.items()}
+
+    def lookup_all():
+        for (kind, owner_id), load in loads.items():
+            lookup = cache.class_week if kind == 'class' else cache.teacher_week
+            lookup(owner_id, 1, load)
+
+    lookup_all()
+    cache.invalidate_course(shared.course_id)
+    lookup_all()
+    assert {owner: load.calls for owner, load in loads.items()} == {
+        ('class', 1): 2, ('class', 2): 2, ('class', 3): 1, ('teacher', 1): 2, ('teacher', 2): 1}
+    # The saved version's new class and teacher are dropped as well.
+    cache.invalidate_course(shared.course_id, make_course(1, make_teacher(2), class_ids=(3,)))
+    lookup_all()
+    assert [load.calls for load in loads.values()] == [3, 3, 2, 3, 2]
+
+
+def test_lru_eviction_drops_the_weeks_with_their_courses(semester):
+    cache = TimetableCache(semester, maxsize=3)
+    load = Loader(make_course(1))
+    cache.class_week(1, 1, load)
+    cache.class_week(2, 1, load)
+    # Class 1's courses were least recently used, so its week went with them.
+    assert len(cache) == 2 and cache.stats()['evictions'] == 1
+    cache.class_week(1, 1, load)
+    assert load.calls == 3
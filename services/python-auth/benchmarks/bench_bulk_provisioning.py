@@ -0,0 +1,57 @@
+"""
+Users/sec for provisioning accounts: one ORM add and commit per user with
+inline hashing, versus provision_users with batched INSERTs and hashing in
+worker processes.
+
+Run from the service root: ``PYTHONPATH=src python benchmarks/bench_bulk_provisioning.py``.
+"""
+import os
+import tempfile
+import time
+
+from f3re.auth.core import Database, hash_password
+from f3re.auth.user import User, UserType
+from f3re.auth.user.provisioning import provision_users
+
+ROUNDS = 6
+
+
+def make_accounts(n: int):
+    return [{'id': f'2024{i:06d}', 'name': f'Student {i}', 'user_type': 'student', 'password': f'pw-{i}'}
+            for i in range(n)]
+
+
+def orm_row_by_row(db: Database, accounts):
+    with db.sessions() as session:
+        for account in accounts:
+            user = User(id=account['id'], name=account['name'], user_type=UserType(account['user_type']),
+                        password_hash=hash_password(account['password'], ROUNDS))
+            session.add(user)
+            session.commit()
+
+
+def bulk(db: Database, accounts):
+    provision_users(db.engine, accounts, batch_size=500, rounds=ROUNDS)
+
+
+def run(label: str, load, accounts):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(f"sqlite:///{os.path.join(tmp, 'auth.db')}")
+        db.create_all()
+        start = time.perf_counter()
+        load(db, accounts)
+        elapsed = time.perf_counter() - start
+        with db.sessions() as session:
+            assert session.query(User).count() == len(accounts)
+        db.dispose()
+    print(f"{label:<40} {len(accounts) / elapsed:>10.0f} users/sec")
+
+
+def main(n: int = 2000):
+    accounts = make_accounts(n)
+    run('ORM add + commit per user', orm_row_by_row, accounts)
+    run(f'provision_users ({os.cpu_count()} processes)', bulk, accounts)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Logins/sec and event-loop stalls for concurrent password checks, verified
+inline on the event loop versus through PasswordHasher's process pool.
+
+Run from the service root: ``PYTHONPATH=src python benchmarks/bench_login_concurrency.py``.
+"""
+import asyncio
+import time
+
+from f3re.auth.core import PasswordHasher, hash_password, verify_password
+
+ROUNDS = 10
+
+
+async def watch_loop(stop: asyncio.Event, interval: float = 0.005) -> float:
+    """Return the longest time the loop was unable to run a 5 ms heartbeat."""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+async def run(label: str, verify, logins: int):
+    password_hash = hash_password('correct horse', ROUNDS)
+    stop = asyncio.Event()
+    watcher = asyncio.ensure_future(watch_loop(stop))
+    start = time.perf_counter()
+    results = await asyncio.gather(*(verify('correct horse', password_hash) for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    stall = await watcher
+    assert all(results)
+    print(f"{label:<40} {logins / elapsed:>10.1f} logins/sec  max loop stall {stall * 1000:>7.1f} ms")
+
+
+async def main(logins: int = 100):
+    async def inline(password, password_hash):
+        return verify_password(password, password_hash)
+
+    await run('inline on the event loop', inline, logins)
+    hasher = PasswordHasher(rounds=ROUNDS)
+    try:
+        await run(f'PasswordHasher ({hasher.max_workers} processes)', hasher.verify, logins)
+        print(hasher.stats())
+    finally:
+        hasher.shutdown()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,38 @@
+"""
+Cost of authorizing one request: a bcrypt password check, a full token
+signature check, and a TokenVerifier cache hit.
+
+Run from the service root: ``PYTHONPATH=src python benchmarks/bench_token_verify.py``.
+"""
+import secrets
+import time
+
+from f3re.auth.core import TokenSigner, TokenVerifier, hash_password, verify_password
+
+ROUNDS = 10
+
+
+def measure(label: str, fn, n: int):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    per_call = (time.perf_counter() - start) / n
+    print(f"{label:<32} {per_call * 1e6:>12.2f} us/check  {1 / per_call:>12.0f} checks/sec")
+
+
+def main():
+    claims = {'id': '2024000123', 'name': 'Student', 'user_type': 'student'}
+    password_hash = hash_password('correct horse', ROUNDS)
+    signer = TokenSigner(secrets.token_bytes(32))
+    verifier = TokenVerifier(signer)
+    token = signer.issue(claims)
+    verifier.verify(token)
+
+    measure(f'bcrypt check (cost {ROUNDS})', lambda: verify_password('correct horse', password_hash), 20)
+    measure('token signature check', lambda: signer.decode(token), 50_000)
+    measure('TokenVerifier cache hit', lambda: verifier.verify(token), 200_000)
+    print(verifier.stats())
+
+
+if __name__ == '__main__':
+    main()
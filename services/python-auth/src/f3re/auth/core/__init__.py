@@ -1 +1,39 @@
+"""
+Shared services of the authentication service.
+"""
 
+from .database import Database
+from .hashing import (
+    HasherOverloaded,
+    PasswordHasher,
+    calibrate_rounds,
+    get_work_factor,
+    hash_password,
+    needs_rehash,
+    set_work_factor,
+    verify_and_update,
+    verify_password,
+)
+from .tokens import (
+    TokenError,
+    TokenSigner,
+    TokenVerifier,
+    load_secret,
+)
+
+__all__ = [
+    "Database",
+    "HasherOverloaded",
+    "PasswordHasher",
+    "TokenError",
+    "TokenSigner",
+    "TokenVerifier",
+    "calibrate_rounds",
+    "get_work_factor",
+    "hash_password",
+    "load_secret",
+    "needs_rehash",
+    "set_work_factor",
+    "verify_and_update",
+    "verify_password",
+]
@@ -0,0 +1,59 @@
+import os
+from typing import Iterator
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session, sessionmaker
+
+DEFAULT_URL = 'sqlite:///./auth.db'
+
+
+class Database:
+    """
+    Engine and session factory of the auth service.
+
+    Connections come from a QueuePool holding `pool_size` connections plus up
+    to `max_overflow` temporary ones; callers wait at most `pool_timeout`
+    seconds for one. Connections older than `pool_recycle` seconds are
+    replaced and every checkout is pinged, so restarts of the database server
+    do not surface as request errors.
+    """
+
+    def __init__(self, url: str = DEFAULT_URL, pool_size: int = 5, max_overflow: int = 10,
+                 pool_timeout: float = 30, pool_recycle: int = 1800, echo: bool = False):
+        url = make_url(url)
+        kwargs = {}
+        if url.get_backend_name() == 'sqlite':
+            kwargs['connect_args'] = {'check_same_thread': False}
+        if url.get_backend_name() != 'sqlite' or url.database not in (None, '', ':memory:'):
+            # In-memory SQLite keeps one connection per thread and takes no pool sizing.
+            kwargs.update(pool_size=pool_size, max_overflow=max_overflow,
+                          pool_timeout=pool_timeout, pool_recycle=pool_recycle)
+        self.engine: Engine = create_engine(url, pool_pre_ping=True, echo=echo, **kwargs)
+        self.sessions = sessionmaker(self.engine)
+
+    @classmethod
+    def from_env(cls) -> 'Database':
+        """
+        Configure from AUTH_DATABASE_URL, AUTH_DB_POOL_SIZE, AUTH_DB_MAX_OVERFLOW,
+        AUTH_DB_POOL_TIMEOUT and AUTH_DB_POOL_RECYCLE.
+        """
+        return cls(
+            os.getenv('AUTH_DATABASE_URL', DEFAULT_URL),
+            pool_size=int(os.getenv('AUTH_DB_POOL_SIZE', '5')),
+            max_overflow=int(os.getenv('AUTH_DB_MAX_OVERFLOW', '10')),
+            pool_timeout=float(os.getenv('AUTH_DB_POOL_TIMEOUT', '30')),
+            pool_recycle=int(os.getenv('AUTH_DB_POOL_RECYCLE', '1800')),
+        )
+
+    def create_all(self):
+        from ..user.model import Base
+        Base.metadata.create_all(self.engine)
+
+    def session(self) -> Iterator[Session]:
+        """One session per unit of work, closed afterwards; usable as a FastAPI dependency."""
+        with self.sessions() as session:
+            yield session
+
+    def dispose(self):
+        self.engine.dispose()
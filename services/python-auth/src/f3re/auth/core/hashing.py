@@ -0,0 +1,179 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+import bcrypt
+from passlib.context import CryptContext
+
+DEFAULT_ROUNDS = 12
+MIN_ROUNDS = 10
+MAX_ROUNDS = 16
+
+# Hashes from earlier deployments that are still accepted once and then upgraded to bcrypt.
+_legacy_context = CryptContext(schemes=['pbkdf2_sha256', 'sha512_crypt', 'sha256_crypt', 'md5_crypt'])
+
+_work_factor = DEFAULT_ROUNDS
+
+
+def get_work_factor() -> int:
+    return _work_factor
+
+
+def set_work_factor(rounds: int):
+    """Set the bcrypt cost used for new hashes when no explicit `rounds` is given."""
+    global _work_factor
+    if not 4 <= rounds <= 31:
+        raise ValueError("bcrypt rounds must be between 4 and 31.")
+    _work_factor = rounds
+
+
+def calibrate_rounds(target_seconds: float = 0.25, min_rounds: int = MIN_ROUNDS, max_rounds: int = MAX_ROUNDS) -> int:
+    """
+    Largest bcrypt cost whose hashing time stays within `target_seconds` on this machine.
+    Each extra round doubles the work, so only the cheapest cost is measured.
+    """
+    start = time.perf_counter()
+    bcrypt.hashpw(b'calibration', bcrypt.gensalt(min_rounds))
+    elapsed = time.perf_counter() - start
+    rounds = min_rounds
+    while rounds < max_rounds and elapsed * 2 <= target_seconds:
+        rounds += 1
+        elapsed *= 2
+    return rounds
+
+
+def _is_bcrypt(password_hash: str) -> bool:
+    return password_hash.startswith(('$2a$', '$2b$', '$2y$'))
+
+
+def bcrypt_rounds(password_hash: str) -> Optional[int]:
+    """Cost factor of a bcrypt hash, or None for other schemes and malformed bcrypt hashes."""
+    if not _is_bcrypt(password_hash):
+        return None
+    cost = password_hash[4:6]
+    if len(password_hash) != 60 or password_hash[6:7] != '$' or not cost.isdigit():
+        return None
+    return int(cost)
+
+
+def hash_password(password: str, rounds: Optional[int] = None) -> str:
+    salt = bcrypt.gensalt(rounds if rounds is not None else _work_factor)
+    return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+
+
+def verify_password(password: str, password_hash: str) -> bool:
+    if _is_bcrypt(password_hash):
+        # A corrupted hash fails the login instead of raising; bcrypt panics on truncated ones.
+        if bcrypt_rounds(password_hash) is None:
+            return False
+        try:
+            return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+        except ValueError:
+            return False
+    if _legacy_context.identify(password_hash, required=False) is None:
+        return False
+    try:
+        return _legacy_context.verify(password, password_hash)
+    except ValueError:
+        return False
+
+
+def needs_rehash(password_hash: str, rounds: Optional[int] = None) -> bool:
+    """
+    Whether a hash uses a legacy scheme or a bcrypt cost below the configured one.
+    Stronger hashes are kept: a calibrated work factor can be lower than the cost
+    they were made with, and rehashing them would weaken the stored password.
+    """
+    cost = bcrypt_rounds(password_hash)
+    return cost is None or cost < (rounds if rounds is not None else _work_factor)
+
+
+def verify_and_update(password: str, password_hash: str, rounds: Optional[int] = None) -> Tuple[bool, Optional[str]]:
+    """
+    Returns:
+        tuple: (valid, new_hash); `new_hash` is a fresh bcrypt hash at the configured cost
+        when the password is valid but `password_hash` is legacy or weaker, otherwise None.
+    """
+    if not verify_password(password, password_hash):
+        return False, None
+    if needs_rehash(password_hash, rounds):
+        return True, hash_password(password, rounds)
+    return True, None
+
+
+class HasherOverloaded(RuntimeError):
+    """Raised when more requests are waiting for the hasher than it is allowed to queue."""
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt off the event loop in a process pool.
+
+    At most `max_concurrency` operations are submitted to the pool at once; the
+    rest wait on a semaphore. When `max_queue` requests are already waiting,
+    new ones fail fast with `HasherOverloaded` so callers can shed load.
+    `rounds` defaults to the process-wide work factor (see `set_work_factor`).
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_concurrency: Optional[int] = None,
+                 max_queue: Optional[int] = None, rounds: Optional[int] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_concurrency = max_concurrency or self.max_workers
+        self.max_queue = max_queue
+        self.rounds = rounds if rounds is not None else _work_factor
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.waiting = self.running = 0
+        self.completed = self.rejected = 0
+        self.wait_seconds = self.run_seconds = 0.0
+
+    async def _submit(self, fn, *args):
+        if self.max_queue is not None and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise HasherOverloaded(f"{self.waiting} password operations are already queued.")
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        started_at = time.perf_counter()
+        self.wait_seconds += started_at - queued_at
+        self.running += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self.running -= 1
+            self.completed += 1
+            self.run_seconds += time.perf_counter() - started_at
+            self._semaphore.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(hash_password, password, self.rounds)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        return await self._submit(verify_password, password, password_hash)
+
+    async def verify_and_update(self, password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+        return await self._submit(verify_and_update, password, password_hash, self.rounds)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            'waiting': self.waiting,
+            'running': self.running,
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'wait_seconds_total': self.wait_seconds,
+            'run_seconds_total': self.run_seconds,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+            self._semaphore = None
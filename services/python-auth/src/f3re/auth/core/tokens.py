@@ -0,0 +1,190 @@
+import base64
+import binascii
+from collections import OrderedDict
+import hashlib
+import heapq
+import hmac
+import json
+import secrets
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+import warnings
+
+DEFAULT_TTL = 3600
+DEFAULT_ISSUER = 'f3re-auth'
+
+
+class TokenError(ValueError):
+    """Raised when a token is malformed, forged, expired or revoked."""
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b'=')
+
+
+def _b64decode(segment: bytes) -> bytes:
+    return base64.urlsafe_b64decode(segment + b'=' * (-len(segment) % 4))
+
+
+# Only HS256 is issued or accepted, so the header segment is a constant.
+_HEADER = _b64encode(b'{"alg":"HS256","typ":"JWT"}')
+
+
+class TokenSigner:
+    """
+    Issues and checks stateless HS256 JWTs.
+
+    Every service holding the shared `secret` can verify a token without
+    calling the auth service; tokens carry the user's public claims.
+    """
+
+    def __init__(self, secret: bytes, ttl: int = DEFAULT_TTL, issuer: str = DEFAULT_ISSUER,
+                 clock: Callable[[], float] = time.time):
+        if len(secret) < 32:
+            raise ValueError('Token secret must be at least 32 bytes.')
+        self.ttl = ttl
+        self.issuer = issuer
+        self._secret = secret
+        self._clock = clock
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        return hmac.new(self._secret, signing_input, hashlib.sha256).digest()
+
+    def issue(self, claims: dict) -> str:
+        """
+        Args:
+            claims: Public claims of the subject; must contain 'id'.
+        Returns:
+            str: A signed token expiring `ttl` seconds from now.
+        """
+        now = int(self._clock())
+        payload = {**claims, 'sub': claims['id'], 'iss': self.issuer,
+                   'iat': now, 'exp': now + self.ttl, 'jti': secrets.token_urlsafe(12)}
+        signing_input = _HEADER + b'.' + _b64encode(json.dumps(payload, separators=(',', ':')).encode('utf-8'))
+        return (signing_input + b'.' + _b64encode(self._sign(signing_input))).decode('ascii')
+
+    def decode(self, token: str) -> dict:
+        """Check the signature, issuer and expiry of `token` and return its claims."""
+        try:
+            header, payload, signature = token.encode('ascii').split(b'.')
+            signature = _b64decode(signature)
+        except (UnicodeError, ValueError, binascii.Error) as e:
+            raise TokenError('Malformed token.') from e
+        if header != _HEADER:
+            raise TokenError('Unsupported token header.')
+        if not hmac.compare_digest(signature, self._sign(header + b'.' + payload)):
+            raise TokenError('Invalid token signature.')
+        try:
+            claims = json.loads(_b64decode(payload))
+        except (ValueError, binascii.Error) as e:
+            raise TokenError('Malformed token.') from e
+        if not isinstance(claims, dict) or claims.get('iss') != self.issuer or 'jti' not in claims:
+            raise TokenError('Token was not issued by this service.')
+        if not isinstance(claims.get('exp'), int) or claims['exp'] <= self._clock():
+            raise TokenError('Token has expired.')
+        return claims
+
+
+class TokenVerifier:
+    """
+    In-process verification of tokens issued by a `TokenSigner`.
+
+    Tokens that passed the signature check once are kept in an LRU cache until
+    they expire, so repeated checks are a dict lookup. Revoked token ids are
+    remembered only until the token would have expired anyway.
+
+    Revocations live in this process only: other workers, other services and
+    restarts still accept a revoked token until it expires.
+
+    Cached claims are returned as-is; callers must not mutate them.
+    """
+
+    def __init__(self, signer: TokenSigner, maxsize: int = 100_000,
+                 clock: Callable[[], float] = time.time):
+        if maxsize < 1:
+            raise ValueError('Maxsize must be positive.')
+        self.signer = signer
+        self.maxsize = maxsize
+        self._clock = clock
+        self._entries: 'OrderedDict[str, dict]' = OrderedDict()
+        self._revoked: Dict[str, int] = {}
+        self._revoked_expiry: List[Tuple[int, str]] = []
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.rejected = 0
+
+    def verify(self, token: str) -> dict:
+        """
+        Returns:
+            dict: The claims of `token`.
+        Raises:
+            TokenError: If the token is invalid, expired or revoked.
+        """
+        now = self._clock()
+        with self._lock:
+            claims = self._entries.get(token)
+            if claims is not None:
+                if claims['exp'] > now and claims['jti'] not in self._revoked:
+                    self._entries.move_to_end(token)
+                    self.hits += 1
+                    return claims
+                del self._entries[token]
+            self.misses += 1
+        try:
+            claims = self.signer.decode(token)
+        except TokenError:
+            with self._lock:
+                self.rejected += 1
+            raise
+        with self._lock:
+            if claims['jti'] in self._revoked:
+                self.rejected += 1
+                raise TokenError('Token has been revoked.')
+            self._entries[token] = claims
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return claims
+
+    def revoke(self, claims: dict):
+        """Reject the token with these claims from now on, e.g. after logout."""
+        now = self._clock()
+        with self._lock:
+            expiry = self._revoked_expiry
+            while expiry and expiry[0][0] <= now:
+                self._revoked.pop(heapq.heappop(expiry)[1], None)
+            if claims['exp'] > now and claims['jti'] not in self._revoked:
+                self._revoked[claims['jti']] = claims['exp']
+                heapq.heappush(expiry, (claims['exp'], claims['jti']))
+
+    def is_revoked(self, jti: str) -> bool:
+        with self._lock:
+            return jti in self._revoked
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'rejected': self.rejected,
+                'revoked': len(self._revoked),
+            }
+
+
+def load_secret(value: Optional[str], allow_ephemeral: bool = False) -> bytes:
+    """
+    Token secret from configuration. Without one, a random secret is returned
+    only if `allow_ephemeral` is set (for development), with a warning: tokens
+    it signs verify in this process alone, not in other workers or after a restart.
+    Raises:
+        ValueError: If no secret is configured and `allow_ephemeral` is not set.
+    """
+    if value:
+        return value.encode('utf-8')
+    if not allow_ephemeral:
+        raise ValueError('No token secret is configured; set AUTH_TOKEN_SECRET.')
+    warnings.warn('No token secret is configured; using a random one that only this process accepts.',
+                  RuntimeWarning, stacklevel=2)
+    return secrets.token_bytes(32)
@@ -1,16 +1,141 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+import os
+import secrets
+from typing import Iterator
+
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from .core import (
+    Database,
+    HasherOverloaded,
+    PasswordHasher,
+    TokenError,
+    TokenSigner,
+    TokenVerifier,
+    calibrate_rounds,
+    hash_password,
+    load_secret,
+    set_work_factor,
+)
+from .user import User
+
+TOKEN_TTL = int(os.getenv('AUTH_TOKEN_TTL', '3600'))
+TOKEN_CACHE_SIZE = int(os.getenv('AUTH_TOKEN_CACHE_SIZE', '100000'))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Every worker must sign with the same AUTH_TOKEN_SECRET, so startup fails without one.
+    # AUTH_EPHEMERAL_SECRET=1 allows a random per-process secret for local development.
+    secret = load_secret(os.getenv('AUTH_TOKEN_SECRET'), allow_ephemeral=os.getenv('AUTH_EPHEMERAL_SECRET') == '1')
+    # A fixed AUTH_BCRYPT_ROUNDS wins; otherwise pick the cost that hashes in about AUTH_HASH_TARGET_MS here.
+    rounds = os.getenv('AUTH_BCRYPT_ROUNDS')
+    set_work_factor(int(rounds) if rounds else
+                    calibrate_rounds(float(os.getenv('AUTH_HASH_TARGET_MS', '250')) / 1000))
+    # bcrypt takes 100-300 ms per call; run it in worker processes so logins never block the event loop.
+    queue_limit = os.getenv('AUTH_HASH_QUEUE')
+    hasher = PasswordHasher(
+        max_workers=int(os.getenv('AUTH_HASH_WORKERS', '0')) or None,
+        max_concurrency=int(os.getenv('AUTH_HASH_CONCURRENCY', '0')) or None,
+        max_queue=int(queue_limit) if queue_limit else None,
+    )
+    app.state.hasher = hasher
+    db = Database.from_env()
+    db.create_all()
+    app.state.db = db
+    signer = TokenSigner(secret, ttl=TOKEN_TTL)
+    # Logouts are revoked in this worker only; see TokenVerifier.
+    app.state.signer, app.state.verifier = signer, TokenVerifier(signer, maxsize=TOKEN_CACHE_SIZE)
+    # Checked against for unknown ids so that they take as long to reject as wrong passwords.
+    app.state.dummy_hash = hash_password(secrets.token_hex(16))
+    try:
+        yield
+    finally:
+        hasher.shutdown()
+        db.dispose()
+
 
 app = FastAPI(
     title="F3re Authentication Service",
     description="Handles user creation, authentication, and authorization.",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan,
 )
 
 @app.get("/")
 def read_root():
     return {"message": "F3re Authentication Service is running"}
 
-# In a real application, you would add endpoints for user registration, login, etc.
+
+@app.get("/metrics/hasher")
+def hasher_metrics(request: Request):
+    return request.app.state.hasher.stats()
+
+
+@app.get("/metrics/tokens")
+def token_metrics(request: Request):
+    return request.app.state.verifier.stats()
+
+
+class LoginRequest(BaseModel):
+    id: str
+    password: str
+
+
+def get_session(request: Request) -> Iterator[Session]:
+    """A session for the duration of one request."""
+    yield from request.app.state.db.session()
+
+
+def _bearer_claims(request: Request) -> dict:
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() != 'bearer' or not token:
+        raise HTTPException(status_code=401, detail="Missing bearer token",
+                            headers={'WWW-Authenticate': 'Bearer'})
+    try:
+        return request.app.state.verifier.verify(token)
+    except TokenError as e:
+        raise HTTPException(status_code=401, detail=str(e), headers={'WWW-Authenticate': 'Bearer'})
+
+
+@app.post("/login")
+async def login(body: LoginRequest, request: Request, session: Session = Depends(get_session)):
+    state = request.app.state
+    user = await run_in_threadpool(session.get, User, body.id)
+    try:
+        valid, new_hash = await state.hasher.verify_and_update(
+            body.password, user.password_hash if user is not None else state.dummy_hash)
+    except HasherOverloaded:
+        raise HTTPException(status_code=503, detail="Too many logins in progress", headers={'Retry-After': '1'})
+    if user is None or not valid:
+        raise HTTPException(status_code=401, detail="Invalid id or password")
+    if new_hash is not None:
+        user.password_hash = new_hash
+        await run_in_threadpool(session.commit)
+    claims = user.to_public_dict()
+    return {
+        "access_token": state.signer.issue(claims),
+        "token_type": "bearer",
+        "expires_in": state.signer.ttl,
+        "user": claims,
+    }
+
+
+@app.post("/logout", status_code=204)
+def logout(request: Request):
+    request.app.state.verifier.revoke(_bearer_claims(request))
+    return Response(status_code=204)
+
+
+@app.get("/tokens/verify")
+def verify_token(request: Request):
+    """For services that cannot verify tokens locally with `TokenVerifier`."""
+    return _bearer_claims(request)
+
+# In a real application, you would add endpoints for user registration, etc.
 # For example:
 #
 # from .user import User
@@ -1,8 +1,9 @@
-import bcrypt
 from enum import Enum
 from sqlalchemy import Column, String, Enum as SAEnum
 from sqlalchemy.orm import declarative_base
 
+from ..core.hashing import hash_password, verify_and_update
+
 
 Base = declarative_base()
 
@@ -22,13 +23,20 @@ class User(Base):
     password_hash = Column(String, nullable=False)
     user_type = Column(SAEnum(UserType), nullable=False)
 
+    # Both block for the duration of a bcrypt round; request handlers should use
+    # core.PasswordHasher and assign password_hash themselves instead.
     def set_password(self, password: str):
-        salt = bcrypt.gensalt()
-        hashed_bytes = bcrypt.hashpw(password.encode('utf-8'), salt)
-        self.password_hash = hashed_bytes.decode('utf-8')
+        self.password_hash = hash_password(password)
 
     def check_password(self, password: str) -> bool:
-        return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
+        """
+        On success, a hash with an outdated bcrypt cost or a legacy scheme is
+        replaced; the new hash is persisted when the session commits.
+        """
+        valid, new_hash = verify_and_update(password, self.password_hash)
+        if new_hash is not None:
+            self.password_hash = new_hash
+        return valid
 
     def to_public_dict(self) -> dict:
         return {
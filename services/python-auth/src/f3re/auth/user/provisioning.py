@@ -0,0 +1,194 @@
+"""
+Bulk creation of user accounts, e.g. each semester's incoming students.
+
+    python -m f3re.auth.user.provisioning accounts.csv --skip-existing
+
+The CSV needs the columns id, name, user_type and password. Every row is
+checked before anything is hashed or written; invalid rows fail the import
+unless --skip-invalid is given.
+"""
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import csv
+from itertools import islice
+import os
+import sys
+import time
+from typing import Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.engine import Engine
+
+from ..core.database import Database
+from ..core.hashing import get_work_factor, hash_password
+from .model import User, UserType
+
+
+class InvalidAccounts(ValueError):
+    """Raised before any user is written when accounts fail validation."""
+
+    def __init__(self, errors: List[Tuple[int, str]]):
+        super().__init__(f"{len(errors)} invalid account(s); first: row {errors[0][0]}: {errors[0][1]}")
+        self.errors = errors
+
+
+class ProvisioningResult(NamedTuple):
+    inserted: int
+    existing: int
+    # (row, reason) of skipped invalid accounts; rows count from 1.
+    invalid: List[Tuple[int, str]]
+
+
+_REQUIRED = ('id', 'name', 'user_type', 'password')
+_USER_TYPES = {t.value for t in UserType}
+
+
+def validate_accounts(accounts: Iterable[Mapping[str, str]]
+                      ) -> Tuple[List[Tuple[int, Mapping[str, str]]], List[Tuple[int, str]]]:
+    """
+    Check accounts without touching the database.
+    Returns:
+        tuple: ([(row, account), ...] of the valid accounts, [(row, reason), ...]);
+        rows count from 1 and the first occurrence of a duplicated id is kept.
+    """
+    columns = User.__table__.c
+    limits = {'id': columns.id.type.length, 'name': columns.name.type.length}
+    valid, errors = [], []
+    first_row: Dict[str, int] = {}
+    for row, account in enumerate(accounts, start=1):
+        missing = [key for key in _REQUIRED if not account.get(key)]
+        if missing:
+            errors.append((row, f"missing {', '.join(missing)}"))
+            continue
+        if account['user_type'] not in _USER_TYPES:
+            errors.append((row, f"unknown user_type {account['user_type']!r}"))
+            continue
+        too_long = [key for key, limit in limits.items() if len(account[key]) > limit]
+        if too_long:
+            errors.append((row, f"{', '.join(too_long)} too long"))
+            continue
+        if account['id'] in first_row:
+            errors.append((row, f"duplicate id {account['id']!r} (first on row {first_row[account['id']]})"))
+            continue
+        first_row[account['id']] = row
+        valid.append((row, account))
+    return valid, errors
+
+
+def _existing_ids(engine: Engine, ids: List[str], batch_size: int) -> set:
+    existing = set()
+    with engine.connect() as conn:
+        for start in range(0, len(ids), batch_size):
+            existing.update(conn.scalars(select(User.id).where(User.id.in_(ids[start:start + batch_size]))))
+    return existing
+
+
+def _hash_batch(passwords: List[str], rounds: int) -> List[str]:
+    return [hash_password(password, rounds) for password in passwords]
+
+
+def _batches(accounts: Iterable[Mapping[str, str]], batch_size: int) -> Iterator[List[Mapping[str, str]]]:
+    it = iter(accounts)
+    while batch := list(islice(it, batch_size)):
+        yield batch
+
+
+def provision_users(engine: Engine, accounts: Iterable[Mapping[str, str]], batch_size: int = 1000,
+                    workers: Optional[int] = None, rounds: Optional[int] = None,
+                    skip_existing: bool = False, skip_invalid: bool = False) -> ProvisioningResult:
+    """
+    Insert users in batches within one transaction, hashing passwords on all cores.
+
+    All accounts are validated (see `validate_accounts`) and checked against
+    the ids already stored before any password is hashed, so a bad row fails
+    the import up front instead of rolling back a finished one.
+    Batches are hashed in worker processes, at most two per worker ahead of
+    the batch being inserted, and each batch is written with a single
+    executemany INSERT.
+
+    Args:
+        engine: Engine of the auth database.
+        accounts: Mappings with the keys 'id', 'name', 'user_type' and 'password'.
+        batch_size: Users per hashing task and INSERT.
+        workers: Hashing processes; defaults to the number of CPUs.
+        rounds: bcrypt cost; defaults to the current work factor.
+        skip_existing: Leave accounts whose id already exists untouched instead of failing.
+        skip_invalid: Leave out invalid accounts and report them instead of failing.
+    Returns:
+        ProvisioningResult: Users inserted, existing ids skipped and invalid rows skipped.
+    Raises:
+        InvalidAccounts: If an account is invalid and `skip_invalid` is not set, or its id
+            already exists and neither flag is set. Nothing is written then.
+    """
+    rows, errors = validate_accounts(accounts)
+    existing = _existing_ids(engine, [account['id'] for _, account in rows], batch_size)
+    if not skip_existing:
+        errors.extend((row, f"id {account['id']!r} already exists") for row, account in rows
+                      if account['id'] in existing)
+    if errors and not skip_invalid:
+        raise InvalidAccounts(sorted(errors))
+    accounts = [account for _, account in rows if account['id'] not in existing]
+    rounds = rounds if rounds is not None else get_work_factor()
+    workers = workers or os.cpu_count() or 1
+    table = User.__table__
+    inserted = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor, engine.begin() as conn:
+        pending = deque()
+
+        def flush_one():
+            nonlocal inserted
+            batch, future = pending.popleft()
+            conn.execute(insert(table), [
+                {'id': account['id'], 'name': account['name'],
+                 'user_type': UserType(account['user_type']), 'password_hash': password_hash}
+                for account, password_hash in zip(batch, future.result())
+            ])
+            inserted += len(batch)
+
+        for batch in _batches(accounts, batch_size):
+            pending.append((batch, executor.submit(_hash_batch, [a['password'] for a in batch], rounds)))
+            if len(pending) >= workers * 2:
+                flush_one()
+        while pending:
+            flush_one()
+    return ProvisioningResult(inserted, len(existing) if skip_existing else 0, sorted(errors))
+
+
+def _print_errors(errors: List[Tuple[int, str]]):
+    for row, reason in errors:
+        # Rows count the records after the CSV header.
+        print(f"row {row}: {reason}", file=sys.stderr)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Create user accounts from a CSV file.')
+    parser.add_argument('csv_file', help='CSV with the columns id, name, user_type, password')
+    parser.add_argument('--database-url', default=None, help='Defaults to AUTH_DATABASE_URL')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--rounds', type=int, default=None, help='bcrypt cost; defaults to the work factor')
+    parser.add_argument('--skip-existing', action='store_true')
+    parser.add_argument('--skip-invalid', action='store_true', help='Import the valid rows and list the others')
+    args = parser.parse_args(argv)
+
+    db = Database(args.database_url) if args.database_url else Database.from_env()
+    db.create_all()
+    start = time.perf_counter()
+    try:
+        with open(args.csv_file, newline='', encoding='utf-8') as f:
+            result = provision_users(db.engine, csv.DictReader(f), batch_size=args.batch_size,
+                                     workers=args.workers, rounds=args.rounds,
+                                     skip_existing=args.skip_existing, skip_invalid=args.skip_invalid)
+    except InvalidAccounts as e:
+        _print_errors(e.errors)
+        sys.exit("Nothing was imported; fix the rows above or pass --skip-invalid.")
+    finally:
+        db.dispose()
+    _print_errors(result.invalid)
+    print(f"Provisioned {result.inserted} users in {time.perf_counter() - start:.1f}s "
+          f"({result.existing} existing, {len(result.invalid)} invalid skipped)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+from fastapi.testclient import TestClient
+from passlib.hash import pbkdf2_sha256
+import pytest
+
+from f3re.auth import main
+from f3re.auth.core import hashing
+from f3re.auth.core.hashing import HasherOverloaded, bcrypt_rounds, hash_password, verify_password
+from f3re.auth.user import User
+from f3re.auth.user.model import UserType
+
+SECRET = '0123456789abcdef0123456789abcdef'
+ROUNDS = 4
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setenv('AUTH_TOKEN_SECRET', SECRET)
+    monkeypatch.setenv('AUTH_BCRYPT_ROUNDS', str(ROUNDS))
+    monkeypatch.setenv('AUTH_DATABASE_URL', f"sqlite:///{tmp_path / 'auth.db'}")
+    # The lifespan sets the process-wide work factor; restore it for the other tests.
+    monkeypatch.setattr(hashing, '_work_factor', hashing.get_work_factor())
+    with TestClient(main.app) as client:
+        yield client
+
+
+def add_user(client, password_hash: str, user_id: str = '2024000001') -> str:
+    with client.app.state.db.sessions() as session:
+        session.add(User(id=user_id, name='Student 1', password_hash=password_hash, user_type=UserType.STUDENT))
+        session.commit()
+    return user_id
+
+
+def stored_hash(client, user_id: str) -> str:
+    with client.app.state.db.sessions() as session:
+        return session.get(User, user_id).password_hash
+
+
+def login(client, user_id: str, password: str = 'correct horse'):
+    return client.post('/login', json={'id': user_id, 'password': password})
+
+
+def test_login_upgrades_a_legacy_hash(client):
+    user_id = add_user(client, pbkdf2_sha256.hash('correct horse'))
+    assert login(client, user_id).status_code == 200
+    new_hash = stored_hash(client, user_id)
+    assert bcrypt_rounds(new_hash) == ROUNDS
+    assert verify_password('correct horse', new_hash)
+
+
+def test_login_upgrades_a_weaker_bcrypt_hash(client):
+    user_id = add_user(client, hash_password('correct horse', rounds=ROUNDS))
+    # 4 is bcrypt's minimum cost, so raise the configured one instead of storing a weaker hash.
+    client.app.state.hasher.rounds = ROUNDS + 1
+    assert login(client, user_id).status_code == 200
+    assert bcrypt_rounds(stored_hash(client, user_id)) == ROUNDS + 1
+    # A hash at the configured cost is left alone.
+    upgraded = stored_hash(client, user_id)
+    assert login(client, user_id).status_code == 200
+    assert stored_hash(client, user_id) == upgraded
+
+
+def test_wrong_password_keeps_the_legacy_hash(client):
+    legacy = pbkdf2_sha256.hash('correct horse')
+    user_id = add_user(client, legacy)
+    assert login(client, user_id, 'wrong').status_code == 401
+    assert stored_hash(client, user_id) == legacy
+
+
+def bearer(token: str) -> dict:
+    return {'Authorization': f'Bearer {token}'}
+
+
+def test_login_verify_and_logout(client):
+    user_id = add_user(client, hash_password('correct horse', rounds=ROUNDS))
+    response = login(client, user_id)
+    assert response.status_code == 200
+    body = response.json()
+    expected = {'id': user_id, 'name': 'Student 1', 'user_type': 'student'}
+    assert body['user'] == expected
+    assert (body['token_type'], body['expires_in']) == ('bearer', main.TOKEN_TTL)
+    verified = client.get('/tokens/verify', headers=bearer(body['access_token']))
+    assert verified.status_code == 200
+    assert {key: verified.json()[key] for key in expected} == expected
+    assert client.post('/logout', headers=bearer(body['access_token'])).status_code == 204
+    revoked = client.get('/tokens/verify', headers=bearer(body['access_token']))
+    assert revoked.status_code == 401
+    assert 'revoked' in revoked.json()['detail']
+
+
+@pytest.mark.parametrize('user_id, password', [('2024999999', 'correct horse'), ('2024000001', 'wrong')],
+                         ids=['unknown-id', 'wrong-password'])
+def test_bad_credentials_are_unauthorized(client, user_id, password):
+    add_user(client, hash_password('correct horse', rounds=ROUNDS))
+    response = login(client, user_id, password)
+    assert response.status_code == 401
+    assert response.json()['detail'] == 'Invalid id or password'
+
+
+@pytest.mark.parametrize('headers', [{}, {'Authorization': 'Basic abc'}, bearer('not.a.token')])
+def test_verify_requires_a_valid_bearer_token(client, headers):
+    response = client.get('/tokens/verify', headers=headers)
+    assert response.status_code == 401
+    assert response.headers['WWW-Authenticate'] == 'Bearer'
+
+
+def test_overloaded_hasher_is_unavailable(client, monkeypatch):
+    async def verify_and_update(password, password_hash):
+        raise HasherOverloaded('1 password operations are already queued.')
+    monkeypatch.setattr(client.app.state.hasher, 'verify_and_update', verify_and_update)
+    user_id = add_user(client, hash_password('correct horse', rounds=ROUNDS))
+    response = login(client, user_id)
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
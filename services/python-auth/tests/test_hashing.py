@@ -0,0 +1,95 @@
+import asyncio
+
+from passlib.hash import pbkdf2_sha256
+import pytest
+
+from f3re.auth.core.hashing import (
+    HasherOverloaded,
+    PasswordHasher,
+    MAX_ROUNDS,
+    MIN_ROUNDS,
+    bcrypt_rounds,
+    calibrate_rounds,
+    hash_password,
+    needs_rehash,
+    verify_and_update,
+    verify_password,
+)
+
+
+@pytest.fixture(scope='module')
+def cost5():
+    return hash_password('correct horse', rounds=5)
+
+
+def test_bcrypt_rounds(cost5):
+    assert bcrypt_rounds(cost5) == 5
+    assert bcrypt_rounds(pbkdf2_sha256.hash('correct horse')) is None
+
+
+def test_weaker_bcrypt_hashes_are_rehashed(cost5):
+    assert needs_rehash(cost5, rounds=6)
+    assert not needs_rehash(cost5, rounds=5)
+
+
+def test_stronger_bcrypt_hashes_are_kept(cost5):
+    assert not needs_rehash(cost5, rounds=4)
+    assert verify_and_update('correct horse', cost5, rounds=4) == (True, None)
+
+
+def test_legacy_hashes_are_upgraded_on_login():
+    legacy = pbkdf2_sha256.hash('correct horse')
+    assert needs_rehash(legacy, rounds=4)
+    valid, new_hash = verify_and_update('correct horse', legacy, rounds=4)
+    assert valid and bcrypt_rounds(new_hash) == 4
+    assert verify_password('correct horse', new_hash)
+
+
+def test_wrong_password_is_not_rehashed():
+    assert verify_and_update('wrong', pbkdf2_sha256.hash('correct horse'), rounds=4) == (False, None)
+
+
+@pytest.mark.parametrize('password_hash', [
+    '$2b$12$truncated',
+    '$2b$xx$' + 'a' * 53,
+    '$2b$12$' + '!' * 53,
+    '$pbkdf2-sha256$29000$broken',
+    'plaintext',
+    '',
+])
+def test_unparseable_hashes_fail_verification(password_hash):
+    assert not verify_password('correct horse', password_hash)
+    assert verify_and_update('correct horse', password_hash) == (False, None)
+
+
+def test_calibrate_rounds_is_clamped():
+    assert calibrate_rounds(0, min_rounds=4, max_rounds=6) == 4
+    assert calibrate_rounds(1e9, min_rounds=4, max_rounds=6) == 6
+    assert MIN_ROUNDS <= calibrate_rounds(0.05) <= MAX_ROUNDS
+
+
+def test_hasher_sheds_load_past_its_queue():
+    hasher = PasswordHasher(max_workers=1, max_concurrency=1, max_queue=1, rounds=4)
+
+    async def main():
+        # The first call runs, the second waits for the semaphore and the third finds the queue full.
+        results = await asyncio.gather(*(hasher.hash('correct horse') for _ in range(3)), return_exceptions=True)
+        assert [bcrypt_rounds(r) for r in results[:2]] == [4, 4]
+        assert isinstance(results[2], HasherOverloaded)
+        assert await hasher.verify('correct horse', results[0])
+
+    try:
+        asyncio.run(main())
+        stats = hasher.stats()
+        assert (stats['waiting'], stats['running'], stats['completed'], stats['rejected']) == (0, 0, 3, 1)
+        assert stats['run_seconds_total'] > 0
+    finally:
+        hasher.shutdown()
+    assert hasher._executor is None and hasher._semaphore is None
+    # The pool is created again on the next call.
+    try:
+        assert asyncio.run(hasher.verify('correct horse', hash_password('correct horse', rounds=4)))
+        assert hasher._executor is not None
+    finally:
+        hasher.shutdown()
+    assert hasher._executor is None
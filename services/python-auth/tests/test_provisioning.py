@@ -0,0 +1,67 @@
+from sqlalchemy import func, select
+import pytest
+
+from f3re.auth.core import Database, verify_password
+from f3re.auth.user import User
+from f3re.auth.user.provisioning import InvalidAccounts, provision_users, validate_accounts
+
+
+def account(i: int, **overrides) -> dict:
+    return {'id': f'2024{i:06d}', 'name': f'Student {i}', 'user_type': 'student', 'password': f'pw-{i}', **overrides}
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(f"sqlite:///{tmp_path / 'auth.db'}")
+    db.create_all()
+    yield db
+    db.dispose()
+
+
+def provision(db, accounts, **kwargs):
+    return provision_users(db.engine, accounts, batch_size=2, workers=1, rounds=4, **kwargs)
+
+
+def user_count(db) -> int:
+    with db.engine.connect() as conn:
+        return conn.scalar(select(func.count()).select_from(User))
+
+
+def test_provision_users(db):
+    result = provision(db, [account(i) for i in range(5)])
+    assert result == (5, 0, [])
+    with db.sessions() as session:
+        user = session.get(User, '2024000003')
+        assert user.name == 'Student 3' and verify_password('pw-3', user.password_hash)
+
+
+def test_validate_accounts_reports_every_bad_row():
+    rows, errors = validate_accounts([
+        account(1), account(2, user_type='alien'), account(1), account(3, password=''), account(4, id='x' * 51),
+    ])
+    assert [row for row, _ in rows] == [1]
+    assert errors == [(2, "unknown user_type 'alien'"), (3, "duplicate id '2024000001' (first on row 1)"),
+                      (4, 'missing password'), (5, 'id too long')]
+
+
+def test_bad_rows_fail_before_anything_is_written(db):
+    with pytest.raises(InvalidAccounts) as info:
+        provision(db, [account(1), account(2), account(3, user_type='alien'), account(2)])
+    assert [row for row, _ in info.value.errors] == [3, 4]
+    assert user_count(db) == 0
+
+
+def test_bad_rows_can_be_skipped(db):
+    result = provision(db, [account(1), account(2, user_type='alien'), account(3), account(1)], skip_invalid=True)
+    assert result.inserted == 2
+    assert [row for row, _ in result.invalid] == [2, 4]
+    assert user_count(db) == 2
+
+
+def test_existing_ids_fail_unless_skipped(db):
+    provision(db, [account(1), account(2)])
+    with pytest.raises(InvalidAccounts, match='already exists'):
+        provision(db, [account(2), account(3)])
+    assert user_count(db) == 2
+    assert provision(db, [account(2), account(3)], skip_existing=True) == (1, 1, [])
+    assert user_count(db) == 3
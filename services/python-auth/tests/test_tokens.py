@@ -0,0 +1,128 @@
+from fastapi.testclient import TestClient
+import pytest
+
+from f3re.auth import main
+from f3re.auth.core.tokens import TokenError, TokenSigner, TokenVerifier, load_secret
+
+SECRET = b'0123456789abcdef0123456789abcdef'
+CLAIMS = {'id': '2024000123', 'name': 'Student', 'user_type': 'student'}
+
+
+class Clock:
+    def __init__(self, now: float = 1_700_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def signer(clock):
+    return TokenSigner(SECRET, ttl=60, clock=clock)
+
+
+def test_issue_and_decode(signer):
+    claims = signer.decode(signer.issue(CLAIMS))
+    assert claims['sub'] == claims['id'] == '2024000123'
+    assert claims['exp'] - claims['iat'] == 60
+    assert signer.issue(CLAIMS) != signer.issue(CLAIMS)
+
+
+def test_short_secrets_are_refused():
+    with pytest.raises(ValueError):
+        TokenSigner(b'short')
+
+
+def test_tokens_from_another_secret_are_rejected(signer, clock):
+    token = TokenSigner(SECRET[::-1], clock=clock).issue(CLAIMS)
+    with pytest.raises(TokenError, match='signature'):
+        signer.decode(token)
+
+
+@pytest.mark.parametrize('token', ['', 'a.b', 'a.b.c', 'not ascii é.b.c'])
+def test_malformed_tokens_are_rejected(signer, token):
+    with pytest.raises(TokenError):
+        signer.decode(token)
+
+
+def test_tampered_payload_is_rejected(signer):
+    header, payload, signature = signer.issue(CLAIMS).split('.')
+    with pytest.raises(TokenError, match='signature'):
+        signer.decode('.'.join((header, payload[:-2] + 'xx', signature)))
+
+
+def test_expired_tokens_are_rejected(signer, clock):
+    token = signer.issue(CLAIMS)
+    clock.now += 60
+    with pytest.raises(TokenError, match='expired'):
+        signer.decode(token)
+
+
+def test_verifier_caches_until_expiry(signer, clock):
+    verifier = TokenVerifier(signer, clock=clock)
+    token = signer.issue(CLAIMS)
+    assert verifier.verify(token) is verifier.verify(token)
+    assert verifier.stats()['hits'] == 1
+    clock.now += 61
+    with pytest.raises(TokenError):
+        verifier.verify(token)
+    assert verifier.stats()['size'] == 0
+
+
+def test_revoked_tokens_are_rejected_cached_or_not(signer, clock):
+    verifier = TokenVerifier(signer, clock=clock)
+    cached, fresh = signer.issue(CLAIMS), signer.issue(CLAIMS)
+    verifier.revoke(verifier.verify(cached))
+    verifier.revoke(signer.decode(fresh))
+    for token in (cached, fresh):
+        with pytest.raises(TokenError, match='revoked'):
+            verifier.verify(token)
+    assert verifier.stats()['rejected'] == 2
+    assert verifier.verify(signer.issue(CLAIMS))['id'] == '2024000123'
+
+
+def test_revocations_are_forgotten_after_expiry(signer, clock):
+    verifier = TokenVerifier(signer, clock=clock)
+    claims = signer.decode(signer.issue(CLAIMS))
+    verifier.revoke(claims)
+    assert verifier.is_revoked(claims['jti'])
+    clock.now += 61
+    verifier.revoke(signer.decode(signer.issue(CLAIMS)))
+    assert not verifier.is_revoked(claims['jti'])
+    assert verifier.stats()['revoked'] == 1
+
+
+def test_verifier_is_size_bounded(signer, clock):
+    verifier = TokenVerifier(signer, maxsize=2, clock=clock)
+    for _ in range(3):
+        verifier.verify(signer.issue(CLAIMS))
+    assert verifier.stats()['size'] == 2
+
+
+def test_load_secret_requires_configuration():
+    assert load_secret('x' * 32) == b'x' * 32
+    with pytest.raises(ValueError, match='AUTH_TOKEN_SECRET'):
+        load_secret(None)
+    with pytest.raises(ValueError):
+        load_secret('')
+
+
+def test_ephemeral_secret_is_opt_in_and_warns():
+    with pytest.warns(RuntimeWarning):
+        first = load_secret(None, allow_ephemeral=True)
+    with pytest.warns(RuntimeWarning):
+        assert load_secret(None, allow_ephemeral=True) != first
+    assert len(first) == 32
+
+
+def test_service_does_not_start_without_a_secret(monkeypatch):
+    monkeypatch.delenv('AUTH_TOKEN_SECRET', raising=False)
+    monkeypatch.delenv('AUTH_EPHEMERAL_SECRET', raising=False)
+    with pytest.raises(ValueError, match='AUTH_TOKEN_SECRET'):
+        with TestClient(main.app):
+            pass